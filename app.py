@@ -2,23 +2,49 @@ from tkinter.filedialog import asksaveasfilename
 import customtkinter
 import tkinter as tk
 from tkinter import ttk
-from exceptions import ParseError
 from ui.sidebar import Sidebar
 from ui.output import Output
-from input_parser import Parser
-from chart_generator import ChartGenerator
+from ui.customization_frame import COLORMAPS
+from chart_generator import ChartGenerator, load_chart_modules
+from chart_worker import ChartWorker
+from hierarchy_cache import HierarchyCache
+from result_cache import ResultCache
 from ui.message_handler import MessageHandler
 import sys
+import threading
 import webbrowser
 
+# limit of the layout cache. The cached charts keep their figures alive, and bench_soak measured them to take
+# about 1.6 times their LAYOUT_BYTES_PER_NODE estimate, so the limit is kept small
+LAYOUT_CACHE_BYTES = 32 << 20
+
+def preload_charts():
+    """
+    Loads what the first chart needs: the chart modules with matplotlib, the Tk backend of matplotlib, the
+    fonts and the colors of the offered colormaps. Runs in a background thread and touches no widget.
+    """
+    load_chart_modules()
+    import matplotlib.backends.backend_tkagg
+    from matplotlib import font_manager
+    from chart import color_scale
+    font_manager.findfont(font_manager.FontProperties())
+    color_scale.preload(COLORMAPS)
+
 class App:
     def __init__(self, root):
-        self.parser = Parser()
-        self.chart_generator = ChartGenerator()
+        self.hierarchy_cache = HierarchyCache()
+        # switching back to an earlier chart type or file reuses its layout instead of building it again
+        self.layout_cache = ResultCache(LAYOUT_CACHE_BYTES)
+        self.chart_generator = ChartGenerator(self.layout_cache)
+        self.chart_worker = ChartWorker(root, self.hierarchy_cache, self.layout_cache)
         self.message_handler = MessageHandler(root)
         self.data = None
         self.chart_properties = {}
         self.figure = None
+        # names of the nodes from the root to the node shown as the root of the chart
+        self.focus = []
+        # progress of the chart generation running in the background
+        self.status = tk.StringVar(root, "")
 
         root.title("PyCharts++")
         # below line throws an exception in linux 
@@ -42,7 +68,7 @@ class App:
         main_frame.grid(column=0, row=0, sticky=(tk.N, tk.W, tk.E, tk.S), padx=3, pady=12)
 
         self.sidebar = Sidebar(main_frame, self)
-        self.output = Output(main_frame)
+        self.output = Output(main_frame, on_node_click=self.__drill_down, on_breadcrumb=self.__drill_up)
 
         root.rowconfigure(0, weight=1)
         root.columnconfigure(0, weight=1)
@@ -50,6 +76,9 @@ class App:
         main_frame.columnconfigure(0, weight=3, minsize=800)
         main_frame.columnconfigure(1, weight=1, minsize=300)
 
+        # the window opens without matplotlib, which is loaded in the background once the window is shown
+        root.after_idle(lambda: threading.Thread(target=preload_charts, name="preload-charts", daemon=True).start())
+
     def menu_action(self):
         print("Menu itme clicked")
 
@@ -59,15 +88,46 @@ class App:
         elif file_obj.closed:
             self.message_handler.show_message("File is closed. Please reselect the file.", "Error")
         else:
-            try:
-                self.data = { "chart_type": chart_type.get(), "nodes": self.parser.parse(file_obj) }
-                self.parser.clear_nodes()
-                self.figure = self.chart_generator.generate_chart(self.data["chart_type"], self.data["nodes"], self.chart_properties)
-                self.output.show_chart(self.figure)
-                file_obj.close()
-            except ParseError as e:
-                self.parser.clear_nodes()
-                self.message_handler.show_message(e.message, "Error")
+            # parsing, layout and drawing run in a worker thread, only the canvas swap happens here
+            chart_type = chart_type.get()
+            self.chart_worker.start(
+                chart_type,
+                file_obj.name,
+                self.chart_properties,
+                on_progress=self.status.set,
+                on_done=lambda nodes, chart_generator, figure: self.__chart_generated(chart_type, file_obj, nodes, chart_generator, figure),
+                on_error=self.__chart_failed
+            )
+
+    def cancel_generation(self):
+        """
+        Cancels the chart generation running in the background, if any.
+        """
+        if self.chart_worker.is_running():
+            self.chart_worker.cancel()
+            self.status.set("Cancelled.")
+
+    def __chart_generated(self, chart_type, file_obj, nodes, chart_generator, figure):
+        self.data = { "chart_type": chart_type, "nodes": nodes }
+        self.__chart_drawn([nodes.root_key()], chart_generator, figure)
+        file_obj.close()
+
+    def __chart_drawn(self, focus, chart_generator, figure):
+        """
+        Shows a chart drawn by the worker.
+        """
+        self.status.set("")
+        self.chart_generator = chart_generator
+        self.figure = figure
+        # the worker leaves a chart from the layout cache in the style it was cached with
+        if chart_generator.chart is not None and chart_generator.chart.chart_properties != self.chart_properties:
+            self.figure = chart_generator.restyle_chart(dict(self.chart_properties))
+        self.focus = focus
+        self.__show_chart()
+
+    def __chart_failed(self, message):
+        self.status.set("")
+        self.message_handler.show_message(message, "Error")
 
     def update_chart(self):
         if self.figure == None:
@@ -77,8 +137,53 @@ class App:
             self.message_handler.show_message("No data has been read.", "Error")
             return
 
-        self.figure = self.chart_generator.generate_chart(self.data["chart_type"], self.data["nodes"], self.chart_properties)
-        self.output.show_chart(self.figure)
+        # only the style changes on an update, the chart keeps its type and its layout
+        self.figure = self.chart_generator.restyle_chart(self.chart_properties)
+        self.__show_chart()
+
+    def __drill_down(self, name):
+        """
+        Shows the subtree of a clicked node, or of its parent for a leaf.
+        Nodes outside of the shown subtree, like the merged "Other" nodes, are ignored.
+        """
+        if self.data == None:
+            return
+        nodes = self.data["nodes"]
+        node = nodes.index.get(name)
+        if node is None:
+            return
+        path = nodes.ancestors(node)
+        _, offsets = nodes.children()
+        if offsets[node + 1] == offsets[node]:
+            path = path[:-1]
+        focus = [nodes.names[i] for i in path]
+        if len(focus) > len(self.focus) and focus[:len(self.focus)] == self.focus:
+            self.__focus_on(focus)
+
+    def __drill_up(self, index):
+        """
+        Shows the subtree of the node of a clicked breadcrumb.
+        """
+        if index < len(self.focus) - 1:
+            self.__focus_on(self.focus[:index + 1])
+
+    def __focus_on(self, focus):
+        """
+        Lays out the subtree of the last node of the focus in the worker thread, the layout of a large
+        hierarchy would block the Tk main loop. The focus changes once the chart is drawn.
+        """
+        self.chart_worker.start_focus(
+            self.data["chart_type"],
+            self.data["nodes"],
+            self.chart_properties,
+            focus[-1] if len(focus) > 1 else None,
+            on_progress=self.status.set,
+            on_done=lambda nodes, chart_generator, figure: self.__chart_drawn(focus, chart_generator, figure),
+            on_error=self.__chart_failed
+        )
+
+    def __show_chart(self):
+        self.output.show_chart(self.figure, self.chart_generator.chart, self.focus)
 
     def __save_as(self):
         if not self.figure:
@@ -93,6 +198,7 @@ class App:
     
     def reset_chart(self):
         self.figure = None
+        self.focus = []
         self.output.reset()
 
     def __open_documentation(self):
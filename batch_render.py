@@ -0,0 +1,207 @@
+"""
+Renders many hierarchy files to images without a display.
+
+Every input file is parsed once and drawn as each of the requested chart types with the Agg backend. The
+files are spread over a pool of processes. A per file and chart type summary of the timings and the status
+is written as CSV next to the images.
+
+Usage: python batch_render.py INPUT [INPUT ...] [-c Treemap Sunburst Icicle] [-f png|svg] [-o OUTPUT_DIR]
+                              [-w WORKERS] [--summary SUMMARY_CSV]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")
+
+from chart import color_scale
+from chart_generator import ChartGenerator
+from exceptions import ParseError
+from input_parser import Parser
+from result_cache import ResultCache
+from utils.node_table import NodeTable
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+FORMATS = ("png", "svg")
+SUMMARY_COLUMNS = ("input", "chart_type", "output", "status", "nodes", "parse_seconds", "render_seconds", "error")
+# size of the image cache of every worker process, files with equal content are rendered once
+IMAGE_CACHE_BYTES = 64 << 20
+
+# the chart generator of the worker process, created by the first file
+_chart_generator = None
+
+def output_path(input_path, chart_type, output_dir, image_format):
+    """
+    Returns the path of the image of a chart, named after the input file and the chart type.
+    """
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, "{}.{}.{}".format(name, chart_type.lower(), image_format))
+
+def error_rows(input_path, chart_types, error=""):
+    """
+    Returns one summary row per chart type of a file which was not rendered.
+    """
+    return [
+        {"input": input_path, "chart_type": chart_type, "output": "", "status": "error", "nodes": "",
+         "parse_seconds": "", "render_seconds": "", "error": error}
+        for chart_type in chart_types
+    ]
+
+def describe_error(e):
+    """
+    Returns the message of an unexpected error together with its type, which some messages need to make sense.
+    """
+    return "{}: {}".format(type(e).__name__, e)
+
+def render_file(input_path, chart_types, output_dir, image_format, chart_properties):
+    """
+    Parses one file and saves it as every chart type. Runs in a worker process.
+
+    Parameters
+    ----------
+    input_path: path of the CSV file
+    chart_types: list of "Treemap" | "Sunburst" | "Icicle"
+    output_dir: directory of the images
+    image_format: "png" | "svg"
+    chart_properties: dictionary of title, fonts and colormap
+
+    Returns
+    -------
+    list[dict] with one summary row per chart type
+    """
+    global _chart_generator
+    if _chart_generator is None:
+        _chart_generator = ChartGenerator(image_cache=ResultCache(IMAGE_CACHE_BYTES))
+    rows = error_rows(input_path, chart_types)
+    start = time.perf_counter()
+    try:
+        with open(input_path, "r") as file_obj:
+            nodes = NodeTable.from_dict(Parser().parse_stream(file_obj))
+    except ParseError as e:
+        error = e.message
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        error = str(e)
+    except Exception as e:
+        error = describe_error(e)
+    else:
+        error = None
+    parse_seconds = time.perf_counter() - start
+
+    for row in rows:
+        row["parse_seconds"] = "{:.4f}".format(parse_seconds)
+        if error is not None:
+            row["error"] = error
+            continue
+        row["nodes"] = len(nodes)
+        path = output_path(input_path, row["chart_type"], output_dir, image_format)
+        start = time.perf_counter()
+        try:
+            image = _chart_generator.render_image(row["chart_type"], nodes, chart_properties, image_format)
+            with open(path, "wb") as image_file:
+                image_file.write(image)
+        except (OSError, ValueError) as e:
+            row["error"] = str(e)
+        except Exception as e:
+            # a degenerate hierarchy fails only its own charts, not the whole batch
+            row["error"] = describe_error(e)
+        else:
+            row["output"] = path
+            row["status"] = "ok"
+        row["render_seconds"] = "{:.4f}".format(time.perf_counter() - start)
+    return rows
+
+def collect_inputs(paths):
+    """
+    Expands directories into the CSV files they contain, keeping the order of the arguments.
+    """
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputs.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".csv")
+            ))
+        else:
+            inputs.append(path)
+    return inputs
+
+def parse_args(argv):
+    arg_parser = argparse.ArgumentParser(description="Render hierarchy CSV files to images without a display.")
+    arg_parser.add_argument("inputs", nargs="+", help="CSV files or directories of CSV files")
+    arg_parser.add_argument("-c", "--chart-type", nargs="+", choices=CHART_TYPES, default=["Treemap"], dest="chart_types",
+                            help="chart types to render every file as (default: Treemap)")
+    arg_parser.add_argument("-f", "--format", choices=FORMATS, default="png", help="image format (default: png)")
+    arg_parser.add_argument("-o", "--output-dir", default="charts", help="directory of the images (default: charts)")
+    arg_parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                            help="number of worker processes (default: number of CPUs)")
+    arg_parser.add_argument("--summary", help="path of the summary CSV (default: OUTPUT_DIR/summary.csv)")
+    arg_parser.add_argument("--title", default="", help="title of every chart")
+    arg_parser.add_argument("--font-family", default="DejaVu Sans", help="font family of the charts")
+    arg_parser.add_argument("--font-size", type=int, default=8, help="font size of the labels")
+    arg_parser.add_argument("--colormap", default="Blues", help="matplotlib colormap")
+    arg_parser.add_argument("--color-scale", choices=color_scale.NORMALIZATIONS, default="linear",
+                            help="scale of the node values on the colormap (default: linear)")
+    args = arg_parser.parse_args(argv)
+    if args.workers < 1:
+        arg_parser.error("--workers must be at least 1")
+
+    args.inputs = collect_inputs(args.inputs)
+    outputs = {}
+    for input_path in args.inputs:
+        path = output_path(input_path, args.chart_types[0], args.output_dir, args.format)
+        if path in outputs:
+            arg_parser.error("{} and {} would write the same images".format(outputs[path], input_path))
+        outputs[path] = input_path
+    return args
+
+def main(argv):
+    args = parse_args(argv)
+    chart_properties = {
+        "title": args.title,
+        "title_font_family": args.font_family,
+        "title_font_size": 20,
+        "chart_font_family": args.font_family,
+        "chart_font_size": args.font_size,
+        "colormap": args.colormap,
+        "color_scale": args.color_scale
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    task_args = (args.chart_types, args.output_dir, args.format, chart_properties)
+
+    start = time.perf_counter()
+    results = {}
+    if args.workers == 1:
+        for input_path in args.inputs:
+            results[input_path] = render_file(input_path, *task_args)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(render_file, input_path, *task_args): input_path for input_path in args.inputs}
+            for future in as_completed(futures):
+                input_path = futures[future]
+                try:
+                    results[input_path] = future.result()
+                except Exception as e:
+                    # the worker process died, like on a crash or when it ran out of memory
+                    results[input_path] = error_rows(input_path, args.chart_types, describe_error(e))
+    seconds = time.perf_counter() - start
+
+    rows = [row for input_path in args.inputs for row in results[input_path]]
+    summary_path = args.summary or os.path.join(args.output_dir, "summary.csv")
+    with open(summary_path, "w", newline="") as summary_file:
+        writer = csv.DictWriter(summary_file, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    failed = [row for row in rows if row["status"] != "ok"]
+    for row in failed:
+        print("{} ({}): {}".format(row["input"], row["chart_type"], row["error"]), file=sys.stderr)
+    print("{} charts from {} files in {:.2f}s with {} workers, {} failed. Summary: {}".format(
+        len(rows) - len(failed), len(args.inputs), seconds, args.workers, len(failed), summary_path
+    ))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""
+Shows how the throughput of batch_render scales with the number of worker processes.
+
+Usage: python -m benchmarks.bench_batch_render [file_count [node_count]]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import batch_render
+from benchmarks.synthetic import write_csv
+
+
+def main(argv):
+    file_count = int(argv[0]) if len(argv) > 0 else 32
+    node_count = int(argv[1]) if len(argv) > 1 else 2000
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print("{:>10} {:>10} {:>10} {:>12}".format("files", "workers", "seconds", "charts/s"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_dir = os.path.join(tmp_dir, "inputs")
+        os.makedirs(input_dir)
+        for i in range(file_count):
+            write_csv(os.path.join(input_dir, "data_{}.csv".format(i)), node_count)
+        for workers in worker_counts:
+            output_dir = os.path.join(tmp_dir, "out_{}".format(workers))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                batch_render.main([input_dir, "-o", output_dir, "-w", str(workers)])
+            seconds = time.perf_counter() - start
+            print("{:>10} {:>10} {:>10.2f} {:>12.1f}".format(file_count, workers, seconds, file_count / seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,40 @@
+"""
+Compares parsing a file with loading its hierarchy from the HierarchyCache.
+
+Usage: python -m benchmarks.bench_cache [node_count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_csv
+from hierarchy_cache import HierarchyCache
+from input_parser import Parser
+from utils.node_table import NodeTable
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [100000, 1000000]
+    print("{:>10} {:>12} {:>12} {:>12}".format("nodes", "file MB", "parse s", "cache hit s"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = HierarchyCache(os.path.join(tmp_dir, "cache"))
+        for size in sizes:
+            path = os.path.join(tmp_dir, "data_{}.csv".format(size))
+            write_csv(path, size)
+            start = time.perf_counter()
+            with open(path, "r") as file_obj:
+                table = NodeTable.from_dict(Parser().parse_stream(file_obj))
+            parse_seconds = time.perf_counter() - start
+            cache.store(path, table)
+
+            start = time.perf_counter()
+            cached = cache.load(path)
+            hit_seconds = time.perf_counter() - start
+            assert len(cached) == len(table)
+            print("{:>10} {:>12.1f} {:>12.3f} {:>12.4f}".format(
+                size, os.path.getsize(path) / 1e6, parse_seconds, hit_seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,57 @@
+"""
+Measures coloring the nodes of a hierarchy with the color scale of the charts against calling the colormap
+once per node, for every normalization, and checks that the linear scale gives the colors of the colormap.
+
+Usage: python -m benchmarks.bench_color_scale [node_count ...]
+"""
+import sys
+import time
+
+import matplotlib as mpl
+import numpy as np
+
+from benchmarks.synthetic import make_nodes
+from chart import color_scale
+from utils.node_table import NodeTable
+
+COLORMAP = "Blues"
+
+
+def per_node(values, vmin, vmax):
+    """
+    Colors the nodes one at a time, like the charts did before the color scale.
+    """
+    colormap = mpl.colormaps[COLORMAP]
+    return np.array([colormap((value - vmin) / (vmax - vmin)) for value in values.tolist()])
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10000, 100000, 1000000]
+    start = time.perf_counter()
+    color_scale.lookup_table(COLORMAP)
+    print("lookup table: {:.2f} ms".format((time.perf_counter() - start) * 1e3))
+    print("{:>10} {:>14} {:>12} {:>12} {:>12}".format("nodes", "per node ms", "linear ms", "log ms", "quantile ms"))
+    for size in sizes:
+        values = NodeTable.from_dict(make_nodes(size)).subtree_sums()
+        vmin, vmax = float(values.min()), float(values.max())
+
+        per_node_seconds = float("nan")
+        if size <= 100000:
+            start = time.perf_counter()
+            expected = per_node(values, vmin, vmax)
+            per_node_seconds = time.perf_counter() - start
+            assert (color_scale.colors(values, COLORMAP, vmin=vmin, vmax=vmax) == expected).all(), \
+                "the color scale and the colormap give different colors"
+
+        seconds = []
+        for normalization in color_scale.NORMALIZATIONS:
+            start = time.perf_counter()
+            color_scale.colors(values, COLORMAP, normalization, vmin=vmin, vmax=vmax)
+            seconds.append(time.perf_counter() - start)
+        print("{:>10} {:>14.1f} {:>12.2f} {:>12.2f} {:>12.2f}".format(
+            size, per_node_seconds * 1e3, *(second * 1e3 for second in seconds)
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
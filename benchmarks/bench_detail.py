@@ -0,0 +1,47 @@
+"""
+Compares generating charts of a long tailed hierarchy with every node and with the detail limits of
+ChartGenerator, which merge the invisible leaves into "Other" nodes before the layout.
+
+Usage: python -m benchmarks.bench_detail [node_count ...]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.synthetic import make_long_tail
+from chart_generator import ChartGenerator
+from utils.node_table import NodeTable
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CHART_PROPERTIES = {
+    "title": "Detail",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10000, 50000]
+    print("{:>10} {:>10} {:>12} {:>12} {:>12}".format("nodes", "chart", "shown", "all s", "limited s"))
+    for size in sizes:
+        nodes = NodeTable.from_dict(make_long_tail(size))
+        for chart_type in CHART_TYPES:
+            start = time.perf_counter()
+            ChartGenerator(detail_limits=None).generate_chart(chart_type, nodes, CHART_PROPERTIES)
+            all_seconds = time.perf_counter() - start
+            chart_generator = ChartGenerator()
+            start = time.perf_counter()
+            chart_generator.generate_chart(chart_type, nodes, CHART_PROPERTIES)
+            limited_seconds = time.perf_counter() - start
+            print("{:>10} {:>10} {:>12} {:>12.3f} {:>12.3f}".format(
+                size, chart_type, len(chart_generator.chart.table), all_seconds, limited_seconds
+            ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
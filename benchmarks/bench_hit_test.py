@@ -0,0 +1,95 @@
+"""
+Measures finding the node under the mouse pointer on charts of every node, with the spatial indexes used by
+node_at against scanning all the shapes, and checks that both find the same nodes.
+
+Usage: python -m benchmarks.bench_hit_test [node_count ...]
+"""
+import math
+import random
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+from benchmarks.synthetic import make_nodes
+from chart_generator import ChartGenerator
+from utils.node_table import NodeTable
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CHART_PROPERTIES = {
+    "title": "",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+QUERY_COUNT = 2000
+
+
+def scan(chart_type, chart, x, y):
+    """
+    Finds the node under the point by testing every shape of the chart.
+    """
+    if chart_type == "Sunburst":
+        geometry = chart._geometry
+        radius = math.hypot(x, y)
+        theta = math.degrees(math.atan2(y, x)) % 360
+        hits = np.flatnonzero(
+            (geometry.inner_radius <= radius) & (radius <= geometry.outer_radius)
+            & (geometry.theta1 <= theta) & (theta < geometry.theta2)
+        )
+        # the deepest ring wins
+        return chart.wedge_paths[hits[np.argmax(geometry.depth[hits])]].name if len(hits) else None
+    if chart_type == "Treemap":
+        names, (x0, y0, width, height) = chart._names, chart._geometry.T
+    else:
+        names, (x0, y0, width, height) = list(chart.data_set.keys()), chart.rectangles.T
+    hits = np.flatnonzero(
+        (width >= 0) & (height >= 0) & (x0 <= x) & (x <= x0 + width) & (y0 <= y) & (y <= y0 + height)
+    )
+    return names[hits[-1]] if len(hits) else None
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [100000]
+    random.seed(1)
+    print("{:>10} {:>10} {:>10} {:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "nodes", "chart", "shapes", "index ms", "mean us", "p99 us", "max us", "scan us"
+    ))
+    for size in sizes:
+        nodes = NodeTable.from_dict(make_nodes(size))
+        for chart_type in CHART_TYPES:
+            chart_generator = ChartGenerator(detail_limits=None)
+            figure = chart_generator.generate_chart(chart_type, nodes, CHART_PROPERTIES)
+            chart = chart_generator.chart
+            ax = figure.axes[0]
+            (left, right), (bottom, top) = ax.get_xlim(), ax.get_ylim()
+            points = [(random.uniform(left, right), random.uniform(bottom, top)) for _ in range(QUERY_COUNT)]
+
+            start = time.perf_counter()
+            chart.node_at(*points[0])
+            index_seconds = time.perf_counter() - start
+
+            timings = []
+            found = []
+            for x, y in points:
+                start = time.perf_counter()
+                found.append(chart.node_at(x, y))
+                timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            scanned = [scan(chart_type, chart, x, y) for x, y in points[:200]]
+            scan_seconds = (time.perf_counter() - start) / 200
+            assert scanned == found[:200], "the index and the scan found different nodes"
+
+            timings = np.array(timings) * 1e6
+            print("{:>10} {:>10} {:>10} {:>10.1f} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+                size, chart_type, len(chart.table), index_seconds * 1e3,
+                timings.mean(), np.percentile(timings, 99), timings.max(), scan_seconds * 1e6
+            ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
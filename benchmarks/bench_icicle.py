@@ -0,0 +1,37 @@
+"""
+Shows how the icicle aggregation and layout scale with the number of nodes.
+
+Usage: python -m benchmarks.bench_icicle [node_count ...]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import make_nodes
+from chart.chart import BaseChart
+from chart.icicle import Icicle
+
+
+def measure(nodes):
+    # skip the drawing done by Icicle.__init__, only the aggregation and the layout are measured
+    icicle = Icicle.__new__(Icicle)
+    BaseChart.__init__(icicle, nodes)
+    icicle.data_set = dict(nodes)
+    icicle._Icicle__configure_chart()
+    start = time.perf_counter()
+    icicle._Icicle__convert_data()
+    convert_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    icicle._Icicle__calculate_rectangles()
+    return convert_seconds, time.perf_counter() - start
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000, 1000000]
+    print("{:>10} {:>14} {:>12}".format("nodes", "aggregate s", "layout s"))
+    for size in sizes:
+        convert_seconds, layout_seconds = measure(make_nodes(size))
+        print("{:>10} {:>14.4f} {:>12.4f}".format(size, convert_seconds, layout_seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,58 @@
+"""
+Measures parse throughput and peak memory of Parser.parse and Parser.parse_stream,
+and the throughput of Parser.parse_parallel.
+
+Usage: python -m benchmarks.bench_parser [node_count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_csv
+from input_parser import Parser
+
+
+def measure_parse(path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, "r") as file_obj:
+        nodes = Parser().parse(file_obj)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(nodes), seconds, peak
+
+
+def measure_parse_stream(path):
+    parser = Parser()
+    with open(path, "r") as file_obj:
+        parser.parse_stream(file_obj, measure_memory=True)
+    return parser.stats
+
+
+def measure_parse_parallel(path):
+    parser = Parser()
+    parser.parse_parallel(path)
+    return parser.stats
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10000, 100000, 1000000]
+    print("{:>10} {:>8} {:>12} {:>14} {:>12} {:>14} {:>14}".format(
+        "nodes", "fanout", "parse r/s", "parse peak", "stream r/s", "stream peak", "parallel r/s"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, "data_{}.csv".format(size))
+            write_csv(path, size)
+            rows, seconds, peak = measure_parse(path)
+            stats = measure_parse_stream(path)
+            parallel_stats = measure_parse_parallel(path)
+            print("{:>10} {:>8} {:>12.0f} {:>14} {:>12.0f} {:>14} {:>14.0f}".format(
+                size, 10, rows / seconds, peak, stats.rows_per_second, stats.peak_bytes,
+                parallel_stats.rows_per_second))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,60 @@
+"""
+Measures the latency and throughput of the local render service under concurrent requests.
+
+Usage: python -m benchmarks.bench_render_server [request_count [node_count [client_count]]]
+"""
+import http.client
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import write_csv
+from render_server import RenderService
+
+
+def main(argv):
+    request_count = int(argv[0]) if len(argv) > 0 else 40
+    node_count = int(argv[1]) if len(argv) > 1 else 2000
+    client_count = int(argv[2]) if len(argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "data.csv")
+        write_csv(path, node_count)
+        with open(path, "rb") as file_obj:
+            body = file_obj.read()
+    service = RenderService(port=0, workers=2, queue_size=request_count)
+    start = time.perf_counter()
+    service.start()
+    warmup_seconds = time.perf_counter() - start
+
+    def send(_):
+        connection = http.client.HTTPConnection("127.0.0.1", service.port, timeout=120)
+        started = time.perf_counter()
+        connection.request("POST", "/render?chart_type=Treemap", body=body, headers={"Content-Type": "text/csv"})
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        return response.status, time.perf_counter() - started
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=client_count) as executor:
+            results = list(executor.map(send, range(request_count)))
+        seconds = time.perf_counter() - start
+    finally:
+        service.stop()
+
+    latencies = sorted(latency for _, latency in results)
+    failed = sum(1 for status, _ in results if status != 200)
+    print("{:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "requests", "failed", "warmup s", "req/s", "p50 s", "p95 s", "max s"))
+    print("{:>10} {:>10} {:>10.2f} {:>10.1f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+        request_count, failed, warmup_seconds, request_count / seconds, statistics.median(latencies),
+        latencies[int(0.95 * (len(latencies) - 1))], latencies[-1]
+    ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
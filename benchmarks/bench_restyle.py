@@ -0,0 +1,44 @@
+"""
+Compares generating a chart with restyling it through ChartGenerator.restyle_chart, which keeps the layout.
+
+Usage: python -m benchmarks.bench_restyle [node_count ...]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.synthetic import make_nodes
+from chart_generator import ChartGenerator
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CHART_PROPERTIES = {
+    "title": "Before",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+RESTYLED_PROPERTIES = dict(CHART_PROPERTIES, title="After", chart_font_size=10, colormap="Greens")
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [5000, 50000]
+    print("{:>10} {:>10} {:>12} {:>12}".format("nodes", "chart", "generate s", "restyle s"))
+    for size in sizes:
+        nodes = make_nodes(size)
+        for chart_type in CHART_TYPES:
+            chart_generator = ChartGenerator()
+            start = time.perf_counter()
+            chart_generator.generate_chart(chart_type, nodes, CHART_PROPERTIES)
+            generate_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            chart_generator.restyle_chart(RESTYLED_PROPERTIES)
+            restyle_seconds = time.perf_counter() - start
+            print("{:>10} {:>10} {:>12.3f} {:>12.3f}".format(size, chart_type, generate_seconds, restyle_seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
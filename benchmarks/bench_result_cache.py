@@ -0,0 +1,59 @@
+"""
+Switches between the chart types of one hierarchy twice, like a user comparing charts, with and without the
+layout cache of ChartGenerator, then renders the same image again through the image cache.
+
+Usage: python -m benchmarks.bench_result_cache [node_count ...]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.synthetic import make_nodes
+from chart_generator import ChartGenerator
+from result_cache import ResultCache
+from utils.node_table import NodeTable
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CHART_PROPERTIES = {
+    "title": "Cache",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+
+
+def switch_chart_types(chart_generator, nodes):
+    start = time.perf_counter()
+    for chart_type in CHART_TYPES + CHART_TYPES:
+        chart_generator.generate_chart(chart_type, nodes, CHART_PROPERTIES)
+    return time.perf_counter() - start
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [5000, 20000]
+    print("{:>10} {:>14} {:>14} {:>14} {:>14}".format("nodes", "uncached s", "cached s", "image miss s", "image hit s"))
+    for size in sizes:
+        nodes = NodeTable.from_dict(make_nodes(size))
+        uncached_seconds = switch_chart_types(ChartGenerator(), nodes)
+        layout_cache = ResultCache(1 << 30)
+        cached_seconds = switch_chart_types(ChartGenerator(layout_cache), nodes)
+
+        chart_generator = ChartGenerator(image_cache=ResultCache())
+        start = time.perf_counter()
+        chart_generator.render_image("Treemap", nodes, CHART_PROPERTIES)
+        miss_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        chart_generator.render_image("Treemap", nodes, CHART_PROPERTIES)
+        hit_seconds = time.perf_counter() - start
+        print("{:>10} {:>14.3f} {:>14.3f} {:>14.3f} {:>14.5f}".format(
+            size, uncached_seconds, cached_seconds, miss_seconds, hit_seconds
+        ))
+        print("{:>10} layout cache {}".format("", layout_cache.stats()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
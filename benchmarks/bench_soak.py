@@ -0,0 +1,169 @@
+"""
+Runs repeated chart updates through the output panel and checks that the resident memory stays flat once the
+first cycles have warmed up the caches.
+Every cycle clicks Update like App.update_chart: the shown chart is restyled with the next chart properties and
+shown again. With --generate every cycle generates the next chart instead, like the Generate button, going
+through the chart types and --files different hierarchies with an optional layout cache.
+The output panel needs a display for its Tk widgets. With --headless the figures go through the same
+ui.output.Output, whose canvas is an Agg canvas as in tests/test_output.py, which measures the figure handling
+of the output panel without the widgets. --new-canvas shows every update on a new canvas and keeps the old one
+alive, like the stacked canvas widgets did before the output panel reused its canvas.
+
+Usage: python -m benchmarks.bench_soak [cycle_count [node_count]] [--headless [--new-canvas]]
+                                       [--chart-type TYPE] [--generate [--files FILE_COUNT]
+                                       [--layout-cache-bytes BYTES]]
+"""
+import argparse
+import itertools
+import os
+import resource
+import sys
+import time
+import tkinter as tk
+
+from benchmarks.synthetic import make_nodes
+from chart_generator import ChartGenerator
+from result_cache import ResultCache
+from ui.output import Output
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CHART_PROPERTIES = {
+    "title": "Soak",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+# the chart properties applied by the Updates, one after the other
+UPDATE_PROPERTIES = [
+    CHART_PROPERTIES,
+    dict(CHART_PROPERTIES, title="Soak 2", chart_font_size=10, colormap="Reds"),
+    dict(CHART_PROPERTIES, title="", chart_font_size=6, colormap="Greens")
+]
+WARMUP_CYCLES = 50
+# allowed growth of the resident memory after the warmup
+MAX_GROWTH_BYTES = 32 << 20
+
+
+def resident_bytes():
+    """
+    Returns the current resident set size, or the peak one where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def headless_output():
+    """
+    Returns an output panel without its Tk widgets, showing the figures on an Agg canvas.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    output = Output.__new__(Output)
+    output.on_node_click = None
+    output.on_breadcrumb = None
+    output.chart = None
+    output._connections = []
+    output.figure_canvas = FigureCanvasAgg(Figure(figsize=(8, 6), dpi=100))
+    output._Output__connect_events()
+    return output
+
+
+def show(output, figure, chart, headless, kept_canvases=None):
+    """
+    Shows the figure in the output panel, with --headless by swapping it onto the canvas like show_chart does.
+    With kept_canvases, the figure is shown on a new canvas and the earlier canvas is kept in the list.
+    """
+    if not headless:
+        output.show_chart(figure, chart)
+        return
+    if kept_canvases is not None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        kept_canvases.append(output.figure_canvas)
+        output.figure_canvas = FigureCanvasAgg(Figure(figsize=(8, 6), dpi=100))
+        output._connections = []
+    output.chart = chart
+    output._Output__replace_figure(figure)
+
+
+def parse_args(argv):
+    arg_parser = argparse.ArgumentParser(description="Checks that repeated chart updates do not leak memory.")
+    arg_parser.add_argument("cycles", nargs="?", type=int, default=1000, help="number of updates (default: 1000)")
+    arg_parser.add_argument("node_count", nargs="?", type=int, default=200, help="nodes per hierarchy (default: 200)")
+    arg_parser.add_argument("--headless", action="store_true", help="show the figures on an Agg canvas instead of the Tk canvas")
+    arg_parser.add_argument("--new-canvas", action="store_true", help="with --headless, keep a new canvas for every update")
+    arg_parser.add_argument("--chart-type", choices=CHART_TYPES, default="Treemap", help="chart type updated (default: Treemap)")
+    arg_parser.add_argument("--generate", action="store_true", help="generate the next chart on every cycle instead of updating")
+    arg_parser.add_argument("--files", type=int, default=1, help="with --generate, number of different hierarchies (default: 1)")
+    arg_parser.add_argument("--layout-cache-bytes", type=int, default=0,
+                            help="with --generate, limit of a layout cache like the one of the app, 0 for no cache (default: 0)")
+    args = arg_parser.parse_args(argv)
+    if args.new_canvas and not args.headless:
+        arg_parser.error("--new-canvas needs --headless")
+    return args
+
+
+def main(argv):
+    args = parse_args(argv)
+    root = None
+    if args.headless:
+        output = headless_output()
+    else:
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            print("A display is needed for the soak benchmark, --headless runs without one: {}".format(e))
+            return 1
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+        output = Output(root)
+    kept_canvases = [] if args.new_canvas else None
+    layout_cache = ResultCache(args.layout_cache_bytes) if args.layout_cache_bytes else None
+    chart_generator = ChartGenerator(layout_cache)
+    hierarchies = [make_nodes(args.node_count + i) for i in range(args.files if args.generate else 1)]
+
+    if args.generate:
+        updates = zip(range(args.cycles), itertools.cycle(CHART_TYPES), itertools.cycle(hierarchies))
+    else:
+        figure = chart_generator.generate_chart(args.chart_type, hierarchies[0], dict(CHART_PROPERTIES))
+        show(output, figure, chart_generator.chart, args.headless)
+        updates = zip(range(args.cycles), itertools.cycle(UPDATE_PROPERTIES))
+
+    baseline = None
+    start = time.perf_counter()
+    for cycle, *update in updates:
+        if args.generate:
+            chart_type, nodes = update
+            figure = chart_generator.generate_chart(chart_type, nodes, CHART_PROPERTIES)
+        else:
+            figure = chart_generator.restyle_chart(dict(update[0]))
+        show(output, figure, chart_generator.chart, args.headless, kept_canvases)
+        if root is not None:
+            root.update()
+        if cycle + 1 == WARMUP_CYCLES:
+            baseline = resident_bytes()
+    seconds = time.perf_counter() - start
+    final = resident_bytes()
+    if root is not None:
+        root.destroy()
+
+    if baseline is None:
+        baseline = final
+    growth = final - baseline
+    print("{:>10} {:>12} {:>14} {:>14} {:>12}".format("cycles", "seconds", "warm RSS MB", "final RSS MB", "growth MB"))
+    print("{:>10} {:>12.2f} {:>14.1f} {:>14.1f} {:>12.1f}".format(
+        args.cycles, seconds, baseline / (1 << 20), final / (1 << 20), growth / (1 << 20)
+    ))
+    assert growth <= MAX_GROWTH_BYTES, "RSS grew by {:.1f} MB after the warmup".format(growth / (1 << 20))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,27 @@
+"""
+Shows how chart.squarify.squarify scales with the number of siblings.
+
+Usage: python -m benchmarks.bench_squarify [sibling_count ...]
+"""
+import random
+import sys
+import time
+
+from chart.squarify import squarify
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000]
+    print("{:>10} {:>12} {:>16}".format("siblings", "seconds", "us per sibling"))
+    for size in sizes:
+        values = sorted((random.random() + 0.01 for _ in range(size)), reverse=True)
+        total = sum(values)
+        values = [value * 10000 / total for value in values]
+        start = time.perf_counter()
+        squarify(values, 0, 0, 100, 100)
+        seconds = time.perf_counter() - start
+        print("{:>10} {:>12.4f} {:>16.3f}".format(size, seconds, seconds / size * 1e6))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""
+Measures the startup of the application in new interpreters: the modules app.py imports before the window is
+shown against the modules it imported before they were loaded lazily, the background preload of matplotlib,
+the fonts and the colormaps, and, where a display and customtkinter are available, the time until the first
+window is drawn, which is checked against FIRST_WINDOW_TARGET_SECONDS.
+
+Usage: python -m benchmarks.bench_startup [runs]
+"""
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# time from starting the interpreter until the window of the application is drawn
+FIRST_WINDOW_TARGET_SECONDS = 1.0
+
+# the modules app.py imports, except the customtkinter widgets
+STARTUP_IMPORTS = "import tkinter, chart_generator, chart_worker, hierarchy_cache, result_cache, ui.output, ui.message_handler"
+# the modules imported before the window was shown when the charts were not loaded lazily
+EAGER_IMPORTS = STARTUP_IMPORTS + ", chart.treemap, chart.sunburst, chart.icicle, matplotlib.backends.backend_tkagg"
+PRELOAD = """
+import time
+start = time.perf_counter()
+from chart_generator import load_chart_modules
+load_chart_modules()
+import matplotlib.backends.backend_tkagg
+from matplotlib import font_manager
+from chart import color_scale
+font_manager.findfont(font_manager.FontProperties())
+color_scale.preload(["Greys", "Purples", "Blues", "Greens", "Oranges", "Reds"])
+print(time.perf_counter() - start)
+"""
+FIRST_WINDOW = """
+import customtkinter
+import app
+root = customtkinter.CTk()
+root.minsize(1480, 720)
+app.App(root)
+root.update()
+print("shown", flush=True)
+root.destroy()
+"""
+
+
+def run(code):
+    """
+    Returns the seconds from starting a new interpreter running the code until it printed its first line,
+    and that line.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=PACKAGE_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    seconds = time.perf_counter() - start
+    process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError("the interpreter failed with status {}".format(process.returncode))
+    return seconds, line.strip()
+
+
+def median_run(code, runs):
+    return statistics.median(run(code)[0] for _ in range(runs))
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 5
+    print("median of {} runs".format(runs))
+    interpreter = median_run("print()", runs)
+    print("{:<32} {:>10.0f} ms".format("empty interpreter", interpreter * 1e3))
+    print("{:<32} {:>10.0f} ms".format("startup imports", median_run(STARTUP_IMPORTS + "\nprint()", runs) * 1e3))
+    print("{:<32} {:>10.0f} ms".format("eager imports", median_run(EAGER_IMPORTS + "\nprint()", runs) * 1e3))
+    preload = statistics.median(float(run(PRELOAD)[1]) for _ in range(runs))
+    print("{:<32} {:>10.0f} ms".format("background preload", preload * 1e3))
+
+    if importlib.util.find_spec("customtkinter") is None or (sys.platform.startswith("linux") and not os.environ.get("DISPLAY")):
+        print("{:<32} {}".format("first window", "skipped, needs customtkinter and a display"))
+        return
+    first_window = median_run(FIRST_WINDOW, runs)
+    print("{:<32} {:>10.0f} ms, target {:.0f} ms: {}".format(
+        "first window", first_window * 1e3, FIRST_WINDOW_TARGET_SECONDS * 1e3,
+        "ok" if first_window <= FIRST_WINDOW_TARGET_SECONDS else "over target"
+    ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+"""
+Shows how the sunburst data preparation (Sunburst.__convert_data) and drawing scale with the number of leaves.
+
+Usage: python -m benchmarks.bench_sunburst [node_count ...]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from benchmarks.synthetic import make_nodes
+from chart.sunburst import Sunburst
+
+
+def measure_convert_data(nodes):
+    # skip the drawing done by Sunburst.__init__, only the path construction is measured
+    sunburst = Sunburst.__new__(Sunburst)
+    start = time.perf_counter()
+    sunburst._Sunburst__convert_data(nodes)
+    return time.perf_counter() - start
+
+
+CHART_PROPERTIES = {
+    "title": "",
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+
+
+def measure_render(nodes):
+    start = time.perf_counter()
+    sunburst = Sunburst(nodes, CHART_PROPERTIES)
+    sunburst.get_figure().canvas.draw()
+    seconds = time.perf_counter() - start
+    plt.close("all")
+    return seconds, len(sunburst.wedge_paths), sunburst.labels_emitted
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 55000, 100000]
+    print("{:>10} {:>10} {:>14} {:>10} {:>10} {:>10}".format("nodes", "leaves", "convert s", "render s", "wedges", "labels"))
+    for size in sizes:
+        nodes = make_nodes(size)
+        leaves = sum(1 for value, _ in nodes.values() if value is not None)
+        convert_seconds = measure_convert_data(nodes)
+        render_seconds, wedges, labels = measure_render(nodes)
+        print("{:>10} {:>10} {:>14.4f} {:>10.2f} {:>10} {:>10}".format(
+            size, leaves, convert_seconds, render_seconds, wedges, labels
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,60 @@
+"""
+Shows how the treemap tree construction (Treemap.__convert_data followed by
+Treemap.__calculate_tree) scales with the number of nodes, and how long a full
+treemap takes to build and draw on an Agg canvas.
+
+Usage: python -m benchmarks.bench_treemap [node_count ...]
+"""
+import sys
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from benchmarks.synthetic import make_nodes
+from chart.treemap import Treemap
+
+
+def measure_tree_construction(nodes):
+    # skip the drawing done by Treemap.__init__, only the tree construction is measured
+    treemap = Treemap.__new__(Treemap)
+    treemap.data = nodes
+    start = time.perf_counter()
+    treemap._Treemap__calculate_tree(treemap._Treemap__convert_data())
+    return time.perf_counter() - start
+
+
+def measure_render(nodes):
+    chart_properties = {
+        "title": "",
+        "title_font_family": "DejaVu Sans",
+        "title_font_size": 20,
+        "chart_font_family": "DejaVu Sans",
+        "chart_font_size": 8,
+        "colormap": "Blues"
+    }
+    start = time.perf_counter()
+    treemap = Treemap(nodes, chart_properties)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    FigureCanvasAgg(treemap.get_figure()).draw()
+    return build_seconds, time.perf_counter() - start, treemap.labels_emitted, treemap.labels_culled
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000, 1000000]
+    print("{:>10} {:>12} {:>14}".format("nodes", "seconds", "us per node"))
+    for size in sizes:
+        seconds = measure_tree_construction(make_nodes(size))
+        print("{:>10} {:>12.4f} {:>14.3f}".format(size, seconds, seconds / size * 1e6))
+
+    print()
+    print("{:>10} {:>12} {:>12} {:>10} {:>10}".format("nodes", "build s", "draw s", "labels", "culled"))
+    for size in sizes:
+        if size > 100000:
+            continue
+        build_seconds, draw_seconds, emitted, culled = measure_render(make_nodes(size))
+        print("{:>10} {:>12.3f} {:>12.3f} {:>10} {:>10}".format(size, build_seconds, draw_seconds, emitted, culled))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
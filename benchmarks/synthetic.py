@@ -0,0 +1,61 @@
+"""
+Synthetic hierarchies used by the benchmark scripts.
+"""
+
+def make_nodes(node_count, fanout=10):
+    """
+    Builds a balanced hierarchy in the parser's output format.
+
+    Nodes are numbered breadth first, so every parent is defined before its children
+    and the leaves are the last nodes of the dictionary.
+
+    Parameters
+    ----------
+    node_count: total number of nodes, including the root
+    fanout: number of children of every internal node
+
+    Returns
+    -------
+    dict[str, tuple(value, parent)]
+    """
+    nodes = {"n0": (None, None)}
+    first_leaf = (node_count - 2) // fanout + 1
+    for i in range(1, node_count):
+        value = float(i % 97 + 1) if i >= first_leaf else None
+        nodes["n{}".format(i)] = (value, "n{}".format((i - 1) // fanout))
+    return nodes
+
+
+def write_csv(path, node_count, fanout=10):
+    """
+    Writes a balanced hierarchy of node_count nodes as a PyCharts++ input file.
+    """
+    nodes = make_nodes(node_count, fanout)
+    full_names = {}
+    with open(path, "w") as file_obj:
+        file_obj.write("name,value\n")
+        for name, (value, parent) in nodes.items():
+            full_name = name if parent is None else full_names[parent] + "." + name
+            full_names[name] = full_name
+            file_obj.write("{},{}\n".format(full_name, "" if value is None else value))
+
+
+def make_long_tail(node_count, group_count=20):
+    """
+    Builds a two level hierarchy whose leaves have Zipf distributed values, so most of the leaves are tiny.
+
+    Parameters
+    ----------
+    node_count: total number of nodes, including the root and the groups
+    group_count: number of children of the root
+
+    Returns
+    -------
+    dict[str, tuple(value, parent)]
+    """
+    nodes = {"root": (None, None)}
+    for group in range(group_count):
+        nodes["g{}".format(group)] = (None, "root")
+    for i in range(node_count - group_count - 1):
+        nodes["l{}".format(i)] = (1000.0 / (i // group_count + 1), "g{}".format(i % group_count))
+    return nodes
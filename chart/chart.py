@@ -1,7 +1,38 @@
+from utils.node_table import NodeTable
+
 class BaseChart:
     def __init__(self, data):
-        self.data = data
+        if isinstance(data, NodeTable):
+            self._table = data
+            self._data = None
+        else:
+            self._table = None
+            self._data = data
         self.figure = None
 
+    @property
+    def data(self):
+        """
+        The data of the chart as a dictionary of type "node": (value, "parent"). Created on first use when the
+        chart was given a NodeTable, only the charts which still work on the dictionary create it.
+        """
+        if self._data is None:
+            self._data = self._table.to_dict()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._table = None
+
+    @property
+    def table(self):
+        """
+        The data of the chart as a NodeTable. Created on first use when the chart was given a dictionary.
+        """
+        if self._table is None:
+            self._table = NodeTable.from_dict(self._data)
+        return self._table
+
     def get_figure(self):
-        return self.figure
\ No newline at end of file
+        return self.figure
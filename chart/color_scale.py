@@ -0,0 +1,115 @@
+import functools
+import matplotlib as mpl
+import numpy as np
+
+# ways of mapping the values to the colormap, chosen with the "color_scale" chart property
+NORMALIZATIONS = ("linear", "log", "quantile")
+
+
+@functools.lru_cache(maxsize=None)
+def lookup_table(colormap_name):
+    """
+    Returns the colors of a colormap as a read only array of shape (N + 3, 4): the N colors of the colormap
+    followed by its under, over and bad colors. The table is computed once per colormap.
+
+    Parameters
+    ----------
+    colormap_name: name of a matplotlib colormap
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    colormap = mpl.colormaps[colormap_name]
+    table = np.empty((colormap.N + 3, 4), dtype=np.float64)
+    table[:colormap.N] = colormap(np.arange(colormap.N))
+    table[colormap.N] = colormap.get_under()
+    table[colormap.N + 1] = colormap.get_over()
+    table[colormap.N + 2] = colormap.get_bad()
+    table.flags.writeable = False
+    return table
+
+
+def preload(colormap_names):
+    """
+    Computes the lookup tables of the colormaps ahead of the first chart using them.
+    """
+    for colormap_name in colormap_names:
+        lookup_table(colormap_name)
+
+
+def normalize(values, normalization="linear", vmin=None, vmax=None):
+    """
+    Maps values to the range [0, 1].
+
+    linear: vmin and vmax map to 0 and 1, they default to the smallest and the largest value.
+    log: like linear on the logarithms of the values, the values which are not positive become NaN.
+    quantile: the rank of every value among all the values, ties get their middle rank. vmin and vmax
+        are not used.
+
+    Parameters
+    ----------
+    values: array of values, NaN for empty values
+    normalization: "linear" | "log" | "quantile"
+    vmin, vmax: values mapped to 0 and 1
+
+    Returns
+    -------
+    numpy.ndarray of float64, NaN where the value is NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if normalization == "quantile":
+        finite = np.sort(values[np.isfinite(values)])
+        if len(finite) < 2:
+            return np.where(np.isfinite(values), 0.0, np.nan)
+        ranks = (np.searchsorted(finite, values, "left") + np.searchsorted(finite, values, "right") - 1) / 2
+        return np.where(np.isfinite(values), ranks / (len(finite) - 1), np.nan)
+    if normalization == "log":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(values > 0, np.log(values), np.nan)
+        vmin = np.log(vmin) if vmin is not None and vmin > 0 else None
+        vmax = np.log(vmax) if vmax is not None and vmax > 0 else None
+    elif normalization != "linear":
+        raise ValueError("Unknown color scale '{}'".format(normalization))
+
+    finite = values[np.isfinite(values)]
+    if vmin is None:
+        vmin = float(finite.min()) if len(finite) else 0.0
+    if vmax is None:
+        vmax = float(finite.max()) if len(finite) else 1.0
+    if vmax == vmin:
+        return np.where(np.isnan(values), np.nan, 0.0)
+    return (values - vmin) / (vmax - vmin)
+
+
+def colors(values, colormap_name, normalization="linear", vmin=None, vmax=None, low=0.0, high=1.0):
+    """
+    Returns the colors of all the values with a single lookup in the table of the colormap.
+    The normalized values are mapped to the part of the colormap between low and high. The table is
+    indexed like matplotlib indexes a colormap, so the colors equal calling the colormap with the
+    same numbers.
+
+    Parameters
+    ----------
+    values: array of values, NaN for empty values
+    colormap_name: name of a matplotlib colormap
+    normalization: "linear" | "log" | "quantile"
+    vmin, vmax: values mapped to low and high
+    low, high: part of the colormap used, between 0 and 1
+
+    Returns
+    -------
+    numpy.ndarray of shape (len(values), 4), the bad color of the colormap for NaN
+    """
+    table = lookup_table(colormap_name)
+    count = len(table) - 3
+    position = normalize(values, normalization, vmin, vmax)
+    if low != 0.0 or high != 1.0:
+        position = high * position + low * (1 - position)
+    with np.errstate(invalid="ignore"):
+        scaled = position * count
+        # 1 is the last color, not an over range value
+        scaled[scaled == count] = count - 1
+        index = np.floor(np.clip(scaled, -1, count))
+        index = np.where(np.isnan(index), count + 2, np.where(index < 0, count, np.where(index > count - 1, count + 1, index)))
+    return table[index.astype(np.intp)]
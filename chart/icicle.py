@@ -1,8 +1,9 @@
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-from matplotlib.patches import Rectangle
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from chart import color_scale
 from chart.chart import BaseChart
-import sys
+from chart.spatial_index import GridIndex
 
 
 class Icicle(BaseChart):
@@ -10,6 +11,7 @@ class Icicle(BaseChart):
     def __init__(self, data, chart_properties={}):
         super().__init__(data)
         self.data_set = self.__duplicate_object(self.data)
+        self._spatial_index = None
         self.__configure_chart()
 
         if chart_properties:
@@ -59,7 +61,8 @@ class Icicle(BaseChart):
         '''
             creates the plot
         '''
-        self.figure, self.ax = plt.subplots()  # define Matplotlib figure and axis
+        self.figure = Figure()  # a standalone figure, not registered with pyplot
+        self.ax = self.figure.add_subplot()
         self.ax.get_xaxis().set_visible(False)  # hide x-axis
         self.ax.get_yaxis().set_visible(False)  # hide y-axis
         self.ax.set_axis_off()
@@ -71,141 +74,148 @@ class Icicle(BaseChart):
         '''
         return self.figure
 
-    def __get_updated_value(self, keys, current_parent, current_node):
-        return self.data_set[keys[keys.index(current_parent)]][0] + current_node[0] if \
-            self.data_set[keys[keys.index(current_parent)]][0] != None else current_node[0]
-
     def __convert_data(self):
         '''
-            calculates the overall values for every key in the data dictionary
+            calculates the overall values for every key in the data dictionary.
+            The value of a node is its own value plus the values of all its descendants. The sums are
+            computed bottom up over the node table of the chart, one level at a time. Nodes without a
+            value in their whole subtree keep an empty value.
+            _max and _min are taken from the values of the non root nodes and the total of the root.
         '''
         keys = list(self.data_set.keys())
-        self._max = -1000000000000000000
-        self._min = sys.maxsize
-
-        # update the value attribute in the tuple of parent elements
-        for i in range(1, len(keys)):
-            current_parent = self.data_set[keys[i]][1]
-            current_node = self.data_set[keys[i]]
-
-            while current_parent != None:
-                if current_node[0] != None:
-                    self._max = current_node[0] if self._max < current_node[0] else self._max
-                    self._min = current_node[0] if self._min > current_node[0] else self._min
-
-                    updated_value = self.__get_updated_value(keys, current_parent, current_node)
-
-                    self.data_set[keys[keys.index(current_parent)]] = (
-                        updated_value, self.data_set[keys[keys.index(current_parent)]][1])
-
-                current_parent = self.data_set[current_parent][1]
-
-        self._max = self.data_set[keys[0]][0] if self._max < self.data_set[keys[0]][0] else self._max
-        self._min = self.data_set[keys[0]][0] if self._min > self.data_set[keys[0]][0] else self._min
-
-    def __calculate_index(self,color_r,color_l,value):
-        return (color_r * (value - self._min) + color_l * (self._max - value)) / (self._max - self._min)
-
-    def __calculate_color(self, value):
-        '''
-            returns the color responding to the given value
+        table = self.table
+        has_value = ~np.isnan(table.value)
+        totals = table.subtree_sums().tolist()
+        filled = (table.aggregate(has_value) > 0).tolist()
+
+        # update the value attribute in the tuple of every element
+        for i, key in enumerate(keys):
+            self.data_set[key] = (totals[i] if filled[i] else None, self.data_set[key][1])
+
+        node_values = table.value[has_value & (table.parent >= 0)]
+        root_value = self.data_set[keys[0]][0]
+        self._max = max(float(node_values.max(initial=-np.inf)), root_value)
+        self._min = min(float(node_values.min(initial=np.inf)), root_value)
+
+    def __calculate_rectangles(self):
+        '''
+            calculates the rectangle of every node, one level of the hierarchy at a time.
+            The x of a node is given by its depth. Its height is the share of its value in the height of
+            its parent, and the children of a node are stacked from the top of the parent downwards in
+            data order, so the y of a node comes from a cumulative sum of the heights of its siblings.
+            Returns:
+                numpy array of shape (number of nodes, 4) with the x, y, width and height of every node
+                in the order of the data dictionary
+        '''
+        table = self.table
+        values = np.array([np.nan if item[0] is None else item[0] for item in self.data_set.values()], dtype=np.float64)
+        rectangles = np.zeros((len(values), 4), dtype=np.float64)
+        rectangles[:, 2] = self._width
+
+        # the root rectangle
+        rectangles[0, 3] = self._maxHeight
+
+        order, offsets = table.levels()
+        for level in range(1, len(offsets) - 1):
+            nodes = order[offsets[level]:offsets[level + 1]]
+            # group the siblings together, keeping the data order inside every group
+            nodes = nodes[np.argsort(table.parent[nodes], kind="stable")]
+            parents = table.parent[nodes]
+
+            heights = rectangles[parents, 3] * (values[nodes] / values[parents])
+            stacked = np.cumsum(heights)
+            group_starts = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+            group_ids = np.repeat(np.arange(len(group_starts)), np.diff(np.r_[group_starts, len(nodes)]))
+            stacked -= (stacked[group_starts] - heights[group_starts])[group_ids]
+
+            rectangles[nodes, 0] = rectangles[parents, 0] + self._width
+            rectangles[nodes, 1] = rectangles[parents, 1] + rectangles[parents, 3] - stacked
+            rectangles[nodes, 3] = heights
+        return rectangles
+
+    def __draw_rectangles(self, rectangles):
+        '''
+            draws the rectangles of all the nodes as a single collection and adds the node names.
+            Parameters:
+                rectangles: array of x, y, width and height of every node
         '''
-        # converting the colors into int
-        if self.chart_properties.get("colormap", False):
-            colormap = mpl.colormaps[self.chart_properties["colormap"]]
-            color_l = 0.4
-            color_r = 0.9
-
-            return colormap(self.__calculate_index(color_r,color_l,value))
-        else:
+        keys = list(self.data_set.keys())
+        x, y, width, height = rectangles.T
+        vertices = np.stack([
+            np.stack([x, y], axis=-1),
+            np.stack([x, y + height], axis=-1),
+            np.stack([x + width, y + height], axis=-1),
+            np.stack([x + width, y], axis=-1)
+        ], axis=1)
+        # one collection instead of a Rectangle patch per node. Agg blends the shared white edges of a collection
+        # a little differently, so a few edge pixels differ from the patches by at most 9/255.
+        self.collection = PolyCollection(vertices, facecolors=self.__calculate_colors(), edgecolors="white", linewidths=1)
+        self.ax.add_collection(self.collection)
+        self.ax.autoscale_view()
+
+        font_size, font_family = self.__chart_font()
+        self.labels = []
+        for index, key in enumerate(keys):
+            # add text into the rectangle
+            self.labels.append(self.ax.text(x[index] + 0.1, y[index] + height[index] - 0.8, key,
+                                            color='black', fontsize=font_size, fontfamily=font_family))
+
+    def __calculate_colors(self):
+        '''
+            returns the colors of all the nodes in the order of the data dictionary, white without a colormap.
+            The values from the smallest to the largest get the colors from 0.4 to 0.9 of the colormap, all with
+            one lookup in the colormap table.
+            The "color_scale" chart property chooses a linear, log or quantile scale, linear by default.
+        '''
+        if not self.chart_properties.get("colormap", False):
             return 'white'
+        values = np.array([np.nan if item[0] is None else item[0] for item in self.data_set.values()], dtype=np.float64)
+        return color_scale.colors(values, self.chart_properties["colormap"], self.chart_properties.get("color_scale", "linear"),
+                                  vmin=self._min, vmax=self._max, low=0.4, high=0.9)
 
-    def __add_rectangle(self, start_x, start_y, width, height, color):
+    def __chart_font(self):
         '''
-            adds a rectangular shape in to the plot.
-            Parmeters:
-                start_x: x value of the starting coordinate
-                start_y: y value of the starting coordinate
-                width: width of a single rectangle
-                height: height of a single rectangle
-                color: color of the rectangle
+            returns the font size and the font family of the node names
         '''
-        self.ax.add_patch(
-            Rectangle((start_x, start_y), width, height, fill=True, edgecolor="white", linewidth=1, facecolor=color))
+        font_size = self.chart_properties["chart_font_size"] if self.chart_properties["chart_font_size"] else 9
+        font_family = self.chart_properties["chart_font_family"] if self.chart_properties["chart_font_family"] else 'Arial'
+        return font_size, font_family
 
-    def __get_parent_nodes(self, index, keys, item):
+    def node_at(self, x, y):
         '''
-            returns the details of the parent node of a node.
+            returns the name of the node whose rectangle contains the point, None outside of the chart.
+            The rectangles are indexed on the first call.
             Parameters:
-                index : index of the current node
-                keys : set of keys in the data dictionary
-                item : a tuple which contains value and the parent of the current node
+                x, y(float): data coordinates of the point
         '''
-        start_x = -1
-        start_y = -1
-
-        # iterating through the list to find the parent
-        for i in range(index - 1, -1, -1):
-            # parent has other children
-            if self.data_set[keys[i]][1] == item[1]:
-                height = self.data_set[self.data_set[keys[i]][1]][5] * (
-                        item[0] / self.data_set[self.data_set[keys[i]][1]][0])
-                start_x = self.data_set[keys[i]][2]
-                start_y = self.data_set[keys[i]][3] - height
-                break
-
-        # current elem is the first or sole elem
-        if start_x == start_y == -1:
-            height = self.data_set[item[1]][5] * (item[0] / self.data_set[item[1]][0])
-            start_x = self.data_set[item[1]][2] + self._width
-            start_y = self.data_set[item[1]][3] + self.data_set[item[1]][5] - height
+        if self._spatial_index is None:
+            self._spatial_index = GridIndex(*self.rectangles.T)
+            self._names = list(self.data_set.keys())
+        i = self._spatial_index.query(x, y)
+        return self._names[i] if i >= 0 else None
 
-        return height, start_x, start_y
-
-    def __draw_fellow_rectangles(self, keys, index):
-        '''
-            draws the rest of the rectangles in the plot other than the root rectangle
+    def restyle(self, chart_properties):
         '''
-        for e in self.data_set:
-            if e != keys[0]:
-                item = self.data_set[e]
-                height = 20
-
-                height, start_x, start_y = self.__get_parent_nodes(index, keys, item)
-
-                # finding the color depending on the value
-                color = self.__calculate_color(item[0])
-
-                # add the rectangle
-                self.__add_rectangle(start_x, start_y, self._width, height, color)
-
-                # update the main array with coordinates
-                self.data_set[keys[index]] = [item[0], item[1], start_x, start_y, self._width, height]
-                # add text into the rectangle
-                self.ax.text(start_x  + 0.1, start_y +height -  0.8, keys[index],
-                             color='black', fontsize=self.chart_properties["chart_font_size"] if self.chart_properties["chart_font_size"] else 9,
-                             fontfamily=self.chart_properties["chart_font_family"] if self.chart_properties["chart_font_family"] else 'Arial')
-
-                index += 1
+            applies new chart properties (title, fonts and colormap) to the drawn chart.
+            Only the colors, the fonts of the node names and the title are updated, the rectangles are kept.
+            Parameters:
+                chart_properties(dict): title, fonts and colormap of the chart
+        '''
+        self.chart_properties = chart_properties
+        self.collection.set_facecolor(self.__calculate_colors())
+        font_size, font_family = self.__chart_font()
+        for label in self.labels:
+            label.set_fontsize(font_size)
+            label.set_fontfamily(font_family)
+        # clear the title of the earlier style, the new title may be empty
+        self.figure.suptitle("")
+        self.__customize_chart()
 
     def draw_chart(self):
         '''
-            draws the root rectangle and calls the functions to draw the other rectangles
+            calculates the layout of the chart and draws it
         '''
         self.__convert_data()
         self.__configure_plot()
-        keys = list(self.data_set.keys())
-
-        # add rectangle to plot for the first root parent
-        color = self.__calculate_color(self.data_set[keys[0]][0])
-        self.__add_rectangle(0, 0, self._width, self._maxHeight, color)
-
-        self.ax.text(0 + 0.1, self._maxHeight - 0.8, keys[0], color='black', fontsize=self.chart_properties["chart_font_size"] if self.chart_properties["chart_font_size"] else 9,
-                             fontfamily=self.chart_properties["chart_font_family"] if self.chart_properties["chart_font_family"] else 'Arial')
-
-        # update the list with width and height of the element
-        self.data_set[keys[0]] = (self.data_set[keys[0]][0], self.data_set[keys[0]][1], 0, 0, 2, 20)
-
-        index = 1
-
-        self.__draw_fellow_rectangles(keys, index)
\ No newline at end of file
+        self.rectangles = self.__calculate_rectangles()
+        self.__draw_rectangles(self.rectangles)
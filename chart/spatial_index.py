@@ -0,0 +1,136 @@
+import bisect
+import numpy as np
+
+
+class GridIndex:
+    """
+    A uniform grid over axis aligned rectangles, answering which rectangle contains a point.
+
+    Every cell of the grid lists the rectangles overlapping it in the order of the rectangles, so a query
+    only tests the few rectangles of one cell. The cells take the shape of the median rectangle, like the
+    tall and narrow bars of an icicle chart. Where rectangles are nested, the last one containing the
+    point is found, which is the one drawn on top.
+
+    Attributes
+    ----------
+    columns, rows: number of cells along the x and y axes
+    """
+    def __init__(self, x, y, width, height):
+        x, y, width, height = (np.asarray(column, dtype=np.float64) for column in (x, y, width, height))
+        # rectangles without a size, like the nodes without a value or the small treemap rectangles whose
+        # size the padding made negative, can not be hit
+        valid = np.isfinite(x) & np.isfinite(y) & (width >= 0) & (height >= 0)
+        self._ids = np.flatnonzero(valid)
+        self._x0, self._y0 = x[valid], y[valid]
+        self._x1, self._y1 = self._x0 + width[valid], self._y0 + height[valid]
+        count = len(self._ids)
+        if count == 0:
+            self.columns = self.rows = 0
+            return
+
+        self._left, self._bottom = float(self._x0.min()), float(self._y0.min())
+        self._right, self._top = float(self._x1.max()), float(self._y1.max())
+        # about four rectangles per cell, shaped like the median rectangle so that a rectangle covers few cells
+        median_width, median_height = float(np.median(width[valid])), float(np.median(height[valid]))
+        aspect = 1.0
+        if median_width > 0 and median_height > 0 and self._top > self._bottom:
+            aspect = (self._right - self._left) / (self._top - self._bottom) * median_height / median_width
+        self.columns = int(np.clip(np.sqrt(count / 4 * aspect), 1, count))
+        self.rows = int(np.clip(np.sqrt(count / 4 / aspect), 1, count))
+        self._cell_width = (self._right - self._left) / self.columns or 1.0
+        self._cell_height = (self._top - self._bottom) / self.rows or 1.0
+
+        first_column, last_column = self.__columns(self._x0), self.__columns(self._x1)
+        first_row, last_row = self.__rows(self._y0), self.__rows(self._y1)
+        spans = last_column - first_column + 1
+        counts = spans * (last_row - first_row + 1)
+        starts = np.zeros(count, dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        rect = np.repeat(np.arange(count), counts)
+        offset = np.arange(counts.sum()) - starts[rect]
+        cell = (first_row[rect] + offset // spans[rect]) * self.columns + first_column[rect] + offset % spans[rect]
+
+        # a stable sort keeps the rectangles of every cell in their order
+        order = np.argsort(cell, kind="stable")
+        self._entries = rect[order].astype(np.int32)
+        self._offsets = np.zeros(self.columns * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell, minlength=self.columns * self.rows), out=self._offsets[1:])
+
+    def __columns(self, x):
+        return np.clip(((x - self._left) / self._cell_width).astype(np.int64), 0, self.columns - 1)
+
+    def __rows(self, y):
+        return np.clip(((y - self._bottom) / self._cell_height).astype(np.int64), 0, self.rows - 1)
+
+    def query(self, x, y):
+        """
+        Returns the position of the last rectangle containing the point, -1 if there is none.
+
+        Parameters
+        ----------
+        x, y: coordinates of the point
+
+        Returns
+        -------
+        int
+        """
+        if self.columns == 0 or not (self._left <= x <= self._right and self._bottom <= y <= self._top):
+            return -1
+        column = min(int((x - self._left) / self._cell_width), self.columns - 1)
+        row = min(int((y - self._bottom) / self._cell_height), self.rows - 1)
+        cell = row * self.columns + column
+        candidates = self._entries[self._offsets[cell]:self._offsets[cell + 1]]
+        hits = np.flatnonzero(
+            (self._x0[candidates] <= x) & (x <= self._x1[candidates])
+            & (self._y0[candidates] <= y) & (y <= self._y1[candidates])
+        )
+        return int(self._ids[candidates[hits[-1]]]) if len(hits) else -1
+
+
+class RingIndex:
+    """
+    An index of the wedges of a sunburst, answering which wedge contains a point given in polar coordinates.
+
+    The wedges of every ring are sorted by their start angle, so a query finds the rings at the radius of
+    the point and bisects the angle in each of them. The deepest ring containing the point wins.
+    """
+    def __init__(self, depth, theta1, theta2, inner_radius, outer_radius):
+        depth = np.asarray(depth)
+        theta1 = np.asarray(theta1, dtype=np.float64)
+        theta2 = np.asarray(theta2, dtype=np.float64)
+        inner_radius = np.asarray(inner_radius, dtype=np.float64)
+        outer_radius = np.asarray(outer_radius, dtype=np.float64)
+        self._rings = []
+        # the deepest ring first, among wedges starting at the same angle the widest one comes last and is
+        # found by the bisection
+        order = np.lexsort((theta2, theta1, -depth.astype(np.int64)))
+        ring_starts = np.flatnonzero(np.diff(depth[order])) + 1
+        for wedges in (np.split(order, ring_starts) if len(order) else []):
+            self._rings.append((
+                float(np.min(inner_radius[wedges])),
+                float(np.max(outer_radius[wedges])),
+                theta1[wedges].tolist(),
+                theta2[wedges].tolist(),
+                wedges.tolist()
+            ))
+
+    def query(self, radius, theta):
+        """
+        Returns the position of the wedge containing the point, -1 if there is none.
+
+        Parameters
+        ----------
+        radius: distance of the point from the center
+        theta: angle of the point in degrees, counterclockwise from the x axis
+
+        Returns
+        -------
+        int
+        """
+        theta %= 360
+        for inner_radius, outer_radius, starts, ends, wedges in self._rings:
+            if inner_radius <= radius <= outer_radius:
+                i = bisect.bisect_right(starts, theta) - 1
+                if i >= 0 and theta < ends[i]:
+                    return wedges[i]
+        return -1
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def worst_ratio(row_sum, row_min, row_max, side):
+    """
+    Calculate the worst aspect ratio of a row of rectangles laid out along `side`.
+
+    The aspect ratio of a rectangle only depends on its size once the row is fixed, and it is largest
+    for the smallest or the largest rectangle of the row. So the running sum, minimum and maximum of
+    the row are enough to know the worst ratio of the whole row.
+
+    Parameters
+    ----------
+    row_sum: numeric
+        The sum of the sizes in the row.
+    row_min, row_max: numeric
+        The smallest and the largest size in the row.
+    side: numeric
+        The length of the side the row is laid out along, min(dx, dy).
+
+    Returns
+    -------
+    worst_ratio: numeric
+    """
+    width = row_sum / side
+    smallest = row_min / width
+    largest = row_max / width
+    return max(width / smallest, smallest / width, width / largest, largest / width)
+
+
+def squarify(sizes, x, y, dx, dy):
+    """Compute treemap rectangles.
+
+    Given a set of values, computes a treemap layout in the specified geometry
+    using an algorithm based on Bruls, Huizing, van Wijk, "Squarified Treemaps".
+
+    Rows are grown one size at a time while the worst aspect ratio of the row
+    does not get worse. The worst ratio is updated from the running sum, minimum
+    and maximum of the current row, and the leftover area is handled in a loop,
+    so the layout is linear in the number of sizes.
+
+    Parameters
+    ----------
+    sizes : list-like of numeric values
+        The set of values to compute a treemap for. `sizes` must be positive
+        values sorted in descending order and they should be normalized to the
+        total area (i.e., `dx * dy == sum(sizes)`)
+    x, y : numeric
+        The coordinates of the "origin".
+    dx, dy : numeric
+        The full width (`dx`) and height (`dy`) of the treemap.
+
+    Returns
+    -------
+    numpy.ndarray of shape (len(sizes), 4)
+        Each row is the (x, y, dx, dy) of a single rectangle in the treemap.
+        The order corresponds to the input order.
+    """
+    sizes = [float(size) for size in sizes]
+    count = len(sizes)
+    rects = np.empty((count, 4), dtype=np.float64)
+
+    start = 0
+    while start < count:
+        side = dy if dx >= dy else dx
+
+        # figure out where the row should end
+        row_sum = row_min = row_max = sizes[start]
+        worst = worst_ratio(row_sum, row_min, row_max, side)
+        end = start + 1
+        while end < count:
+            size = sizes[end]
+            next_min = size if size < row_min else row_min
+            next_max = size if size > row_max else row_max
+            next_worst = worst_ratio(row_sum + size, next_min, next_max, side)
+            if worst < next_worst:
+                break
+            row_sum, row_min, row_max, worst = row_sum + size, next_min, next_max, next_worst
+            end += 1
+
+        # lay out the row and continue with the leftover area
+        if dx >= dy:
+            width = row_sum / dy
+            row_y = y
+            for i in range(start, end):
+                height = sizes[i] / width
+                rects[i] = (x, row_y, width, height)
+                row_y += height
+            x += width
+            dx -= width
+        else:
+            height = row_sum / dx
+            row_x = x
+            for i in range(start, end):
+                width = sizes[i] / height
+                rects[i] = (row_x, y, width, height)
+                row_x += width
+            y += height
+            dy -= height
+        start = end
+
+    return rects
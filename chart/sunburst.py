@@ -1,19 +1,27 @@
 import collections
-import matplotlib.pyplot as plt
+import math
 import matplotlib as mpl
 import numpy as np
 
-from itertools import groupby
 from typing import DefaultDict, Dict, List, Optional, Tuple
-from matplotlib.patches import Wedge
+from matplotlib.axes import Axes
+from matplotlib.collections import PathCollection
 from matplotlib.figure import Figure
+from matplotlib.path import Path as OutlinePath
 
+from chart import color_scale
 from chart.chart import BaseChart
-from chart.sunburst_path import Path
-from utils.utils import get_root_node_key
+from chart.spatial_index import RingIndex
+from chart.sunburst_path import Path, PathRef, PathTable
+from utils.node_table import NodeTable
 
 STRING_DELIM = "/"
 Angles = collections.namedtuple("Angles", ["theta1", "theta2"])     
+WedgeGeometry = collections.namedtuple(
+    "WedgeGeometry", ["depth", "theta1", "theta2", "inner_radius", "outer_radius", "outmost"]
+)
+# the arcs of a wedge are approximated with one segment per ARC_STEP degrees
+ARC_STEP = 2.0
 
 class Sunburst(BaseChart):
     """
@@ -23,6 +31,7 @@ class Sunburst(BaseChart):
     ----------
     data: dictionary of type "Node" : (Value, "Parent")
     chart_properties: dictionary type of title and chart font sizes and families
+    axes: matplotlib axes to draw the chart on, the chart gets its own figure if it is None
     origin: coordinates of the center of the chart of type (float, float)
     base_ring_width: default width of a wedge as float
     base_edge_color: default edge color of a wedge as tuple 
@@ -41,16 +50,19 @@ class Sunburst(BaseChart):
     def __init__(self,
                 data,
                 chart_properties: dict = {},
-                axes: Optional[plt.Axes] = None,
+                axes: Optional[Axes] = None,
         ):
         super().__init__(data)
         
+        # draw on the given axes or on a standalone figure, not registered with pyplot
         if axes is None:
-            axes = plt.gca()
-        
-        self.figure, self.axes = plt.subplots()
+            self.figure = Figure()
+            self.axes = self.figure.add_subplot()
+        else:
+            self.figure = axes.get_figure()
+            self.axes = axes
         
-        self.data = self.__dict_to_pv(self.__convert_data(data))
+        self._path_values = self.__dict_to_pv(self.__convert_data(self.table))
         self.origin = (0.0, 0.0)
         self.base_wedge_width = 0.4
         self.base_edge_color = (0, 0, 0, 1)
@@ -71,14 +83,20 @@ class Sunburst(BaseChart):
             }
         
         # Variables
-        self._completed_pv = {}  # type: Dict[Path, float]
-        self._completed_paths = []  # type: List[Path]
+        self._path_table = PathTable()  # type: PathTable
+        self._completed_pv = []  # type: List[float]
+        self._completed_paths = []  # type: List[PathRef]
         self._max_level = 0  # type: int
-        self._structured_paths = []  # type: List[List[List[Path]]]
-        self._angles = {}  # type: Dict[Path, Angles]
+        self._angles = []  # type: List[Angles]
+        self._geometry = None  # type: Optional[WedgeGeometry]
+        self._spatial_index = None  # type: Optional[RingIndex]
 
         # Output
-        self.wedges = {}  # type: Dict[Path, Wedge]
+        self.wedge_paths = []  # type: List[PathRef]
+        self.collection = None  # type: Optional[PathCollection]
+        self.labels = []  # type: List[mpl.text.Text]
+        self.labels_emitted = 0  # type: int
+        self.labels_culled = 0  # type: int
         
         # Plot the chart 
         self.__plot()
@@ -86,10 +104,59 @@ class Sunburst(BaseChart):
     
     def get_figure(self):
         return self.figure
+    
+    def node_at(self, x: float, y: float) -> Optional[str]:
+        """
+        Returns the name of the node whose wedge contains the point, None outside of all the wedges
+        The wedges are indexed on the first call.
+        
+        Parameters
+        ----------
+        x, y: data coordinates of the point
+        
+        Returns
+        -------
+        str or None
+        """
+        geometry = self._geometry
+        if geometry is None:
+            return None
+        if self._spatial_index is None:
+            self._spatial_index = RingIndex(
+                geometry.depth, geometry.theta1, geometry.theta2, geometry.inner_radius, geometry.outer_radius
+            )
+        i = self._spatial_index.query(
+            math.hypot(x - self.origin[0], y - self.origin[1]),
+            math.degrees(math.atan2(y - self.origin[1], x - self.origin[0]))
+        )
+        return self.wedge_paths[i].name if i >= 0 else None
+    
+    def restyle(self, chart_properties: dict):
+        """
+        Applies new chart properties (title, fonts and colormap) to the drawn chart
+        Only the colors of the wedges, the labels and the title are updated, the geometry of the wedges is kept.
+        
+        Parameters
+        ----------
+        chart_properties: dictionary of title, fonts and colormap
+        
+        Returns
+        -------
+        None
+        """
+        self.chart_properties = chart_properties
+        self.collection.set_facecolor(self.__face_colors())
+        self.__add_annotations()
+        # clear the title of the earlier style, the new title may be empty
+        self.figure.suptitle("")
+        self.__customize_chart()
         
-    def __get_parent_key(self, data:dict,  node: str):
+    def __build_paths(self, table: NodeTable):
         """
-        Returns the directory of a node from the root as a string
+        Returns the directory of every node from the root, including the node itself
+        
+        The paths are built in a single top down traversal from the root over the children of the node table,
+        where the path of a node is the path of its parent followed by the node.
         
         e.g.
         data = {
@@ -104,28 +171,34 @@ class Sunburst(BaseChart):
             "Child3" : (22, "Parent3"),
         }
         
-        node = "Child1"
-        
-        function returns "Root/Grand Parent1/Parent1"
+        for the node table of the data, the path of "Child1" is "Root/Grand Parent1/Parent1/Child1"
+        and the path of "Root" is "Root"
         
         Parameters
         -----------
-        data: dictionary of type "node": (Value, "Parent")
-        node: the node that has to find the directory
-            
+        table: NodeTable of the data
+        
         Returns
         -------
-        String
-        """
-        root_node = get_root_node_key(data)
-        for key, value in data.items():
-            if key == node:
-                if value[1] != root_node:
-                    return self.__get_parent_key(data, value[1]) + '/' + str(value[1])
-                else:
-                    return str(value[1])
+        List[str] indexed by the position of the node in the table
+        """
+        names = table.names
+        order, offsets = table.children()
+        order = order.tolist()
+        offsets = offsets.tolist()
+        root_node = table.root()
+        
+        paths = [None] * len(table)
+        paths[root_node] = names[root_node]
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            for child in order[offsets[node]:offsets[node + 1]]:
+                paths[child] = paths[node] + STRING_DELIM + names[child]
+                stack.append(child)
+        return paths
     
-    def __convert_data(self, data:dict):
+    def __convert_data(self, table: NodeTable):
         """
         Returns a dictionary of type [String, Float]
         
@@ -142,7 +215,7 @@ class Sunburst(BaseChart):
             "Child3" : (22, "Parent3"),
         }
         
-        function returns
+        function returns for the node table of the data
         {
             'Root/Grand Parent1/Parent1/Child1': 10, 
             'Root/Grand Parent1/Parent2/Child2': 15, 
@@ -151,17 +224,19 @@ class Sunburst(BaseChart):
         
         Parameters
         ----------
-        data: dictionary of type "node": (Value, "Parent")
+        table: NodeTable of the data
 
         Returns
         -------
         dict[Str, Float]
         """
+        paths = self.__build_paths(table)
+        values = table.value.tolist()
         modified_data = {}
-        for key, value in data.items():
-            if value[0] != None:
-                pair = {self.__get_parent_key(data, key) + '/' + key : value[0]}
-                modified_data.update(pair)
+        for i, value in enumerate(values):
+            # NaN for an empty value
+            if value == value:
+                modified_data[paths[i]] = value
         return modified_data
     # ===============================================================================================
 
@@ -197,6 +272,11 @@ class Sunburst(BaseChart):
     
     def __complete_pv(self, path_values: Dict[Path, float]):
         """
+        Adds the value of every path to the path itself and all of its ancestors
+        
+        The paths are interned in self._path_table, and the result is indexed by the path ids. The value
+        of a path is added while following the parent pointers from the path to the empty path.
+        
         e.g.
         data = {
             Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )): 10, 
@@ -204,19 +284,19 @@ class Sunburst(BaseChart):
             Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )): 22
         }
         
-        function returns
-        {
-            Path((, )): 47.0, 
-            Path(('Root', )): 47.0, 
-            Path(('Root', 'Grand Parent1', )): 25.0, 
-            Path(('Root', 'Grand Parent1', 'Parent1', )): 10.0, 
-            Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )): 10.0, 
-            Path(('Root', 'Grand Parent1', 'Parent2', )): 15.0, 
-            Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )): 15.0, 
-            Path(('Root', 'Grand Parent2', )): 22.0, 
-            Path(('Root', 'Grand Parent2', 'Parent3', )): 22.0, 
-            Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )): 22.0
-        }
+        function returns the values of the paths with the ids
+        [
+            0: Path((, )) 47.0, 
+            1: Path(('Root', )) 47.0, 
+            2: Path(('Root', 'Grand Parent1', )) 25.0, 
+            3: Path(('Root', 'Grand Parent1', 'Parent1', )) 10.0, 
+            4: Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )) 10.0, 
+            5: Path(('Root', 'Grand Parent1', 'Parent2', )) 15.0, 
+            6: Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )) 15.0, 
+            7: Path(('Root', 'Grand Parent2', )) 22.0, 
+            8: Path(('Root', 'Grand Parent2', 'Parent3', )) 22.0, 
+            9: Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )) 22.0
+        ]
         
         Parameters
         ----------
@@ -224,112 +304,72 @@ class Sunburst(BaseChart):
         
         Returns
         -------
-        Dict[Path, float]
+        List[float]
         """
         if Path(()) in path_values:
             raise ValueError(
                 "This function does not allow the empty path as item"
                 "in the data list."
             )
-        completed: DefaultDict[Path, float] = collections.defaultdict(float)
-        
-        for path, value in path_values.items():
-            for level in range(0, len(path) + 1):
-                completed[path[:level]] += value
-        return dict(completed)
+        table = self._path_table
+        path_ids = [table.add(path) for path in path_values]
+        parent_ids = table.parent
+        completed = [0.0] * len(table)
+        
+        for path_id, value in zip(path_ids, path_values.values()):
+            while path_id >= 0:
+                completed[path_id] += value
+                path_id = parent_ids[path_id]
+        return completed
     
-    def __complete_paths(self, paths: List[Path]):
+    def __complete_paths(self, paths: List[PathRef]):
         """
-        Preserve the order of path
+        Preserve the order of path and add the missing ancestors of every path in front of it
+        
+        The walk up from a path stops at the first ancestor whose own ancestors were already completed,
+        so every path is visited a constant number of times.
         
         e.g.
         paths = [
-            Path(('Root', )), Path((, )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )), Path(('Root', 'Grand Parent2', 'Parent3', )), Path(('Root', 'Grand Parent2', )), Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )), Path(('Root', 'Grand Parent1', 'Parent2', )), Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', 'Parent1', ))
+            Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', 'Parent3', ))
         ]
         
         function returns
         [
-            Path((, )), Path(('Root', )), Path((, )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )), Path(('Root', 'Grand Parent2', 'Parent3', )), Path(('Root', 'Grand Parent2', )), Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )), Path(('Root', 'Grand Parent1', 'Parent2', )), Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', 'Parent1', ))
+            Path((, )), Path(('Root', )), Path(('Root', 'Grand Parent1', 'Parent1', )), Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', )), Path(('Root', 'Grand Parent2', 'Parent3', ))
         ]
         
         Parameters
         ----------
-        path: list of type Path
+        path: list of type PathRef
         
         Returns
         -------
-        List[Path]
-        """
-        ret = [Path(())]
+        List[PathRef]
+        """
+        empty_path = self._path_table.refs[0]
+        known = set(paths)
+        ret = [empty_path]
+        added = set(ret)
+        # paths which are known or added together with all of their ancestors
+        completed = {empty_path}
         for path in paths:
-            for i in range(1, len(path)):
-                ancestor = path[:i]
-                if ancestor not in paths and ancestor not in ret:
-                    ret.append(ancestor)
+            missing = []
+            ancestor = path.parent()
+            while ancestor not in completed:
+                if ancestor not in known and ancestor not in added:
+                    missing.append(ancestor)
+                completed.add(ancestor)
+                ancestor = ancestor.parent()
+            for ancestor in reversed(missing):
+                ret.append(ancestor)
+                added.add(ancestor)
             ret.append(path)
+            added.add(path)
+            completed.add(path)
         return ret
     
-    def __structure_paths(self, paths: List[Path]):
-        """
-        Takes a list of paths and groups the paths first by length (empty path length 0) and then by the parent (path[:len(path) - 1]).
-        e.g.
-        paths = [
-            Path(('Root', )), Path((, )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )), Path(('Root', 'Grand Parent2', 'Parent3', )), Path(('Root', 'Grand Parent2', )), Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )), Path(('Root', 'Grand Parent1', 'Parent2', )), Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', 'Parent1', ))
-        ]
-        
-        function returns
-        [
-            [
-                [Path((, )), Path((, ))]
-            ], 
-            [
-                [Path(('Root', ))]
-            ], 
-            [
-                [Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', ))]
-            ], 
-            [
-                [Path(('Root', 'Grand Parent1', 'Parent2', )), Path(('Root', 'Grand Parent1', 'Parent1', ))], 
-                [Path(('Root', 'Grand Parent2', 'Parent3', ))]
-            ], 
-            [
-                [Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', ))], 
-                [Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', ))], 
-                [Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', ))]
-            ]    
-        ]
-        
-        Parameters
-        ----------
-        paths: List of type Path
-        
-        Returns
-        -------
-        List[List[List[Path]]]
-        """
-        structured = []
-
-        def level(path):
-            return len(path)
-
-        def parent(path):
-            return path.parent()
-
-        # sort by level
-        paths.sort(key=level)
-        paths_by_level = (list(group) for _, group in groupby(paths, key=level))
-
-        # sort by parent
-        for paths_of_level in paths_by_level:
-            paths_of_level.sort(key=parent)
-            paths_by_parent = [
-                list(group) for _, group in groupby(paths_of_level, key=parent)
-            ]
-            structured.append(paths_by_parent)
-
-        return structured
-        
-    def __calculate_angles(self, structured_paths: List[List[List[Path]]], path_values: Dict[Path, float],) -> Dict[Path, Angles]:
+    def __calculate_angles(self, paths: List[PathRef], path_values: List[float]) -> List[Angles]:
         """
         Calculate the Starting angle and ending angle of the wedge
         e.g.
@@ -342,40 +382,45 @@ class Sunburst(BaseChart):
             
             and so on
         
+        The children of a path keep the order of `paths`, and the next free angle of every parent is kept
+        while its children are placed.
+        
         Parameters
         ----------
-        structured_paths: list of paths and groups the paths first by length (empty path length 0) and then by the parent (path[:len(path) - 1]).
-        path_values: Dict[Path, Value] must be in completed_pv
+        paths: list of paths sorted by length which must contain all the ancestors of every path
+        path_values: List[Value] must be in completed_pv
         
         Returns
         -------
-        Dict[Path, Angles]
+        List[Angles] indexed by the path ids
             
         """
-        angles: Dict[Path, Angles] = {}
+        parent_ids = self._path_table.parent
+        angles: List[Angles] = [None] * len(self._path_table)
+        next_theta1: Dict[int, float] = {}
         # the total sum of all elements (on one level)
-        value_sum = path_values[Path(())]
-        for level_no, groups in enumerate(structured_paths):
-            for group in groups:
-                theta2 = None 
-                for path_no, path in enumerate(group):
-                    if level_no == 0:
-                        theta1 = 0
-                    elif path_no == 0:
-                        theta1 = angles[path.parent()].theta1
-                    else:
-                        theta1 = theta2  # type: ignore
-                    theta2 = theta1 + 360 * path_values[path] / value_sum
-                    angles[path] = Angles(theta1, theta2)
+        value_sum = path_values[0]
+        for path in paths:
+            if len(path) == 0:
+                theta1 = 0
+            else:
+                parent_id = parent_ids[path.id]
+                theta1 = next_theta1.get(parent_id)
+                if theta1 is None:
+                    theta1 = angles[parent_id].theta1
+            theta2 = theta1 + 360 * path_values[path.id] / value_sum
+            angles[path.id] = Angles(theta1, theta2)
+            if len(path):
+                next_theta1[parent_id] = theta2
         return angles
     
     def __prepare_data(self):
         """
         Sets up variables used for computing  such as, 
+            _path_table
             _completed_pv
             _completed_path
             _max_level
-            _structured_paths
             _angles
             
         Parameters
@@ -386,8 +431,10 @@ class Sunburst(BaseChart):
         -------
         None
         """
-        self._completed_pv = self.__complete_pv(self.data)
-        ordered_paths: List[Path] = []
+        self._path_table = PathTable()
+        self._completed_pv = self.__complete_pv(self._path_values)
+        refs = self._path_table.refs
+        ordered_paths: List[PathRef] = []
         
         if self.order:
             order_options = set(self.order.split(" "))
@@ -409,58 +456,66 @@ class Sunburst(BaseChart):
             )
             
         if not order_options:
-            ordered_paths = list(self.data.keys())
+            ordered_paths = [self._path_table.find(path) for path in self._path_values.keys()]
         elif "keep" in self.order:
-            ordered_paths = list(self.data.keys())
-            if type(self.data) is dict:
+            ordered_paths = [self._path_table.find(path) for path in self._path_values.keys()]
+            if type(self._path_values) is dict:
                 print("Warning: path values are of type dict. can not keep the order of path values")
         elif "value" in self.order:
-            ordered_paths = sorted(
-                self._completed_pv.keys(),
-                key=lambda key: self._completed_pv[key],
-            )
+            ordered_paths = sorted(refs, key=lambda path: self._completed_pv[path.id])
         elif "key" in self.order:
-            ordered_paths = sorted(self._completed_pv.keys())
+            ordered_paths = sorted(refs, key=lambda path: path.to_path())
         
         if "reverse" in self.order:
             ordered_paths = list(reversed(ordered_paths))
             
-        self._completed_paths = self.__complete_paths(ordered_paths)
+        # the wedges are drawn level by level, the inner levels first
+        self._completed_paths = sorted(self.__complete_paths(ordered_paths), key=len)
         self._max_level = max((len(path) for path in self._completed_paths))
-        self._structured_paths = self.__structure_paths(self._completed_paths)
-        self._angles = self.__calculate_angles(
-            self._structured_paths, self._completed_pv
-        )
+        self._angles = self.__calculate_angles(self._completed_paths, self._completed_pv)
 
-        for path in self._completed_paths:
-            if self.plot_center or len(path) >= 1:
-                angle = self._angles[path].theta2 - self._angles[path].theta1
-                if len(path) == 0 or angle > self.plot_minimal_angle:
-                    self.wedges[path] = self.__wedge(path)
+        self.__calculate_geometry()
 
-    def __is_outmost(self, path: Path):
+    def __calculate_geometry(self):
         """
-        Checks whether thewedge corresponding to the path is the outmost wedge
-        return True if there is no descendant of the path
+        Calculates the depth, angles and radii of all the drawn wedges as arrays in one pass
+        The empty path is only drawn if plot_center is set, and a wedge is only drawn if its angle is bigger
+        than plot_minimal_angle. Sets wedge_paths and _geometry in the drawing order.
         
         Parameters
         ----------
-        path: Path of a node
+        None
         
         Returns
         -------
-        bool
-        """
-        level = len(path)
-        if level == self._max_level:
-            return True
-        for group in self._structured_paths[level + 1]:
-            for p in group:
-                if p.startswith(path):
-                    return False
-                continue
-        return True
-    
+        None
+        """
+        paths = self._completed_paths
+        ids = np.fromiter((path.id for path in paths), dtype=np.int64, count=len(paths))
+        depth = np.frombuffer(self._path_table.depth, dtype=np.int32).astype(np.int64)[ids]
+        parent = np.frombuffer(self._path_table.parent, dtype=np.int32).astype(np.int64)[ids]
+        angles = np.array(self._angles, dtype=np.float64)[ids].reshape(-1, 2)
+        theta1, theta2 = angles[:, 0], angles[:, 1]
+        
+        child_count = np.bincount(parent[depth > 0], minlength=len(self._path_table))
+        outmost = (depth == self._max_level) | (child_count[ids] == 0)
+        
+        start = 0 if self.plot_center else 1
+        inner_radius = (
+            np.maximum(depth - start, 0) * (self.__wedge_width() + sum(self.__wedge_spacing()))
+            + self.__wedge_spacing()[0]
+        )
+        outer_radius = inner_radius + self.__wedge_width()
+        
+        drawn = ((depth >= 1) | self.plot_center) & (
+            (depth == 0) | (theta2 - theta1 > self.plot_minimal_angle)
+        )
+        self.wedge_paths = [paths[i] for i in np.flatnonzero(drawn)]
+        self._geometry = WedgeGeometry(
+            depth[drawn], theta1[drawn], theta2[drawn],
+            inner_radius[drawn], outer_radius[drawn], outmost[drawn]
+        )
+
     def __wedge_width(self):
         """
         The width of the wedge corresponding to `path`
@@ -489,58 +544,6 @@ class Sunburst(BaseChart):
         """
         return 0, 0
 
-    def __wedge_inner_radius(self, path: Path):
-        """
-        The inner radius of the wedge corresponding to the path
-        
-        Parameters
-        ----------
-        path: Path
-        
-        Returns
-        -------
-        float
-        """
-        start = 0 if self.plot_center else 1
-        ancestors = [path[:i] for i in range(start, len(path))]
-        return (
-            sum(
-                self.__wedge_width() + sum(self.__wedge_spacing())
-                for ancestor in ancestors
-            )
-            + self.__wedge_spacing()[0]
-        )
-    
-    def __wedge_outer_radius(self, path: Path):
-        """
-        The outer radius of the wedge corresponding to the path
-        
-        Parameters
-        ----------
-        path: Path
-        
-        Returns
-        -------
-        float
-        """
-        return self.__wedge_inner_radius(path) + self.__wedge_width()
-        
-    def __wedge_mid_radius(self, path: Path) -> float:
-        """
-        The radius of the middle of the wedge corresponding to a path.
-        
-        Parameters
-        ----------
-        path: Path
-        
-        Returns
-        -------
-        float
-        """
-        return (
-            self.__wedge_outer_radius(path) + self.__wedge_inner_radius(path)
-        ) / 2
-        
     def __edge_color(self):
         """
         The line color of the wedge
@@ -571,29 +574,24 @@ class Sunburst(BaseChart):
         """
         return self.base_line_width;
     
-    def __face_color(self, path: Path):
+    def __face_colors(self):
         """
-        The color of the wedge corresponding to the path
+        The colors of all the drawn wedges, taken from the colormap by the middle angle of the wedge
+        The wedge of the empty path is white
         
         Parameters
         ----------
-        path: Path
+        None
         
         Returns
         -------
-        Tuple[float, float, float, float]
+        numpy.ndarray of shape (len(wedge_paths), 4)
         """
-        if len(path) == 0:
-            color: List[float] = [1, 1, 1, 1]
-        else:
-            
-            color: List[float] = []
-            angle = (self._angles[path].theta1 + self._angles[path].theta2) / 2
-            colormap = mpl.colormaps[self.chart_properties["colormap"]]                            
-            # cmap = plt.get_cmap(self.chart_properties["colormap"])
-            if angle < 270: color = colormap(angle/360)
-            else:   color = colormap(angle/720)
-        return tuple(color)
+        geometry = self._geometry
+        angle = (geometry.theta1 + geometry.theta2) / 2
+        colors = color_scale.colors(np.where(angle < 270, angle / 360, angle / 720), self.chart_properties["colormap"], vmin=0, vmax=1)
+        colors[geometry.depth == 0] = (1, 1, 1, 1)
+        return colors
     
     def __format_path_text(self, path):
         """
@@ -607,7 +605,7 @@ class Sunburst(BaseChart):
         -------
         str
         """
-        return path[-1] if path else ""
+        return path.name
     
     def __format_value_text(self, value: float):
         """
@@ -636,153 +634,87 @@ class Sunburst(BaseChart):
         str
         """
         path_text = self.__format_path_text(path)
-        value_text = self.__format_value_text(self._completed_pv[path])
+        value_text = self.__format_value_text(self._completed_pv[path.id])
         if path_text and value_text:
             return "{} ({})".format(path_text, value_text)
         return path_text
     
-    def __radial_text(self, path: Path):
+    def __add_annotations(self):
         """
-        Adds a radially rotated annotation for the wedge corresponding to `path` to the axes
+        Adds a radial or tangential text to every wedge which is big enough to hold a line of text
+        Must be called after the limits of the axes are set.
         
-        e.g.
-        if the angle is between 0 and 90 do not rotate text angle
-        if the angle is between 90 and 270 rotate text by 180
-        if the angle is between 270 and 360, flip the text
+        The text of a wedge is tangential if len(path) * angle > 90 and radial otherwise:
+            radial text between 0 and 90 is not rotated
+            radial text between 90 and 270 is rotated by 180
+            radial text between 270 and 360 is flipped
+            tangential text between 0 and 180 is rotated by 90, at 180 by 180 and after 180 by 270
+        The radial text of an outmost wedge starts at the inner radius so that it does not clash
+        with the levels below.
+        The labels replace the ones of an earlier call. The number of drawn and skipped labels is kept in
+        self.labels_emitted and self.labels_culled.
         
         Parameters
         ----------
-        path: Path
+        None
         
         Returns
         -------
         None
         """
-        theta1, theta2 = self._angles[path].theta1, self._angles[path].theta2
-        angle = (theta1 + theta2) / 2
-        radius = self.__wedge_mid_radius(path)
-        if self.__is_outmost(path):
-            radius = self.__wedge_inner_radius(path)
-
-        mid_x = self.origin[0] + radius * np.cos(np.deg2rad(angle))
-        mid_y = self.origin[1] + radius * np.sin(np.deg2rad(angle))
-
-        if 0 <= angle < 90:
-            rotation = angle
-        elif 90 <= angle < 270:
-            rotation = angle - 180
-        elif 270 < angle <= 360:
-            rotation = angle - 360
-        else:
-            raise ValueError
-        
-        # to avoid the clashes with below levels, move the text further out
-        if self.__is_outmost(path):
-            if 0 <= angle < 90:
-                va = "bottom"
-                ha = "left"
-            elif 90 <= angle <= 180:
-                va = "bottom"
-                ha = "right"
-            elif 180 <= angle <= 270:
-                va = "top"
-                ha = "right"
-            elif 270 <= angle <= 360:
-                va = "top"
-                ha = "left"
-            else:
-                raise ValueError
-        else:
-            ha = "center"
-            va = "center"
-
-        font = {
-            "family": self.chart_properties["chart_font_family"],
-            "size": self.chart_properties["chart_font_size"]
-        }
-        
-        text = self.__format_text(path)
-        self.axes.text(
-            mid_x,
-            mid_y,
-            text,
-            ha=ha,
-            va=va,
-            rotation=rotation,
-            fontdict=font,
-            # bbox=self.__textbox_props(),
+        for label in self.labels:
+            label.remove()
+        geometry = self._geometry
+        span = geometry.theta2 - geometry.theta1
+        angle = (geometry.theta1 + geometry.theta2) / 2
+        tangential = geometry.depth * span > 90
+        outmost = ~tangential & geometry.outmost
+        
+        radius = np.where(outmost, geometry.inner_radius, (geometry.inner_radius + geometry.outer_radius) / 2)
+        x = self.origin[0] + radius * np.cos(np.deg2rad(angle))
+        y = self.origin[1] + radius * np.sin(np.deg2rad(angle))
+        rotation = np.where(
+            tangential,
+            np.select([angle < 180, angle == 180], [angle - 90, 0], angle - 270),
+            np.select([angle < 90, angle < 270], [angle, angle - 180], angle - 360),
         )
-    
-    def __tangential_text(self, path: Path):
-        """
-        Adds a tangentially rotated annotation for the wedge corresponding to `path` to the axes
-        
-        e.g.
-        if the angle is between 0 and 180 rotate by 90
-        if the angle is 180, rotate by 180 
-        if the angle is between 180 and 360, rotate by 270
-        
-        Parameters
-        ----------
-        path: Path
+        quadrant = np.select([angle < 90, angle <= 180, angle <= 270], [0, 1, 2], 3)
+        
+        # a label needs the height of one line of text across the direction of the text
+        self.axes.apply_aspect()
+        origin_x, unit_x = self.axes.transData.transform([(0, 0), (1, 0)])[:, 0]
+        scale = abs(unit_x - origin_x)
+        font_size = self.chart_properties["chart_font_size"] * self.figure.dpi / 72
+        fits = np.where(
+            tangential,
+            (geometry.outer_radius - geometry.inner_radius) * scale >= font_size,
+            radius * np.deg2rad(span) * scale >= font_size,
+        )
+        labelled = (span > self.label_minimal_angle) & fits
         
-        Returns
-        -------
-        None
-        """
-        theta1, theta2 = self._angles[path].theta1, self._angles[path].theta2
-        angle = (theta1 + theta2) / 2
-        radius = self.__wedge_mid_radius(path)
-        mid_x = self.origin[0] + radius * np.cos(np.deg2rad(angle))
-        mid_y = self.origin[1] + radius * np.sin(np.deg2rad(angle))
-
-        if 0 <= angle < 180:
-            rotation = angle - 90
-        elif angle == 180:
-            rotation = angle - 180
-        elif 180 < angle < 360:
-            rotation = angle - 270
-        else:
-            raise ValueError
-
         font = {
             "family": self.chart_properties["chart_font_family"],
             "size": self.chart_properties["chart_font_size"]
         }
-        
-        text = self.__format_text(path)
-        self.axes.text(
-            mid_x,
-            mid_y,
-            text,
-            ha="center",
-            va="center",
-            rotation=rotation,
-            fontdict=font,
-            # bbox=self.__textbox_props(),
-        )
-    
-    def __add_annotation(self, path):
-        """
-        Add the radial or tangential text to the wedge
-        
-        Parameters
-        ----------
-        path: Path
-        
-        Returns
-        -------
-        None
-        """
-        angle = self._angles[path].theta2 - self._angles[path].theta1
-
-        if not angle > self.label_minimal_angle:
-            return  # no text
-
-        if len(path) * angle > 90:
-            self.__tangential_text(path)
-        else:
-            self.__radial_text(path)
+        self.labels = []
+        for i in np.flatnonzero(labelled):
+            if outmost[i]:
+                ha = ("left", "right", "right", "left")[quadrant[i]]
+                va = ("bottom", "bottom", "top", "top")[quadrant[i]]
+            else:
+                ha = va = "center"
+            label = self.axes.text(
+                x[i],
+                y[i],
+                self.__format_text(self.wedge_paths[i]),
+                ha=ha,
+                va=va,
+                rotation=float(rotation[i]),
+                fontdict=font,
+            )
+            self.labels.append(label)
+        self.labels_emitted = len(self.labels)
+        self.labels_culled = len(self.wedge_paths) - self.labels_emitted
             
     def __plot(self, setup_axes=False, interactive=False)-> None:
         """
@@ -798,45 +730,74 @@ class Sunburst(BaseChart):
         None
         """    
         
-        if not self.wedges:
+        if self._geometry is None:
             self.__prepare_data()
         
-        for path, wedge in self.wedges.items():
-            self.axes.add_patch(wedge)
-            self.__add_annotation(path)
+        self.collection = PathCollection(
+            self.__wedge_outlines(),
+            facecolors=self.__face_colors(),
+            edgecolors=[self.__edge_color()],
+            linewidths=self.__line_width(),
+        )
+        self.axes.add_collection(self.collection)
         
         self.axes.autoscale()
         self.axes.set_aspect("equal")
         self.axes.autoscale_view(True, True, True)
         self.axes.axis("off")
         self.axes.margins(x=0.1, y=0.1)
-            
+        self.__add_annotations()
     
-    def __wedge(self, path: Path) -> Wedge:
+    def __wedge_outlines(self) -> List[OutlinePath]:
         """
-        Generates the wedges corresponding to the path
+        Generates the outlines of all the drawn wedges
+        
+        All the vertices are computed at once. The arcs are split into one segment per ARC_STEP degrees of
+        the wedge, so a narrow wedge only has a few vertices. A wedge is its outer arc followed by its inner
+        arc backwards, a full ring is an outer and an inner circle so that it has no radial edge.
         
         Parameters
         ----------
-        path: Path
+        None
         
         Returns
         -------
-        Wedge
-        """
-        return Wedge(
-            (self.origin[0], self.origin[1]),
-            self.__wedge_outer_radius(path),
-            self._angles[path].theta1,
-            self._angles[path].theta2,
-            width = self.__wedge_width(),
-            label = self.__format_text(path),
-            facecolor = self.__face_color(path),
-            edgecolor = self.__edge_color(),
-            linewidth = self.__line_width(),
-            fill = True,
-            alpha = 1,
-        )
+        List[matplotlib.path.Path]
+        """
+        geometry = self._geometry
+        span = geometry.theta2 - geometry.theta1
+        segments = np.maximum(np.ceil(span / ARC_STEP), 1).astype(np.int64)
+        ring = span >= 360 - 1e-12
+        counts = 2 * segments + 3 + ring
+        starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=starts[1:])
+        
+        wedge = np.repeat(np.arange(len(counts)), counts)
+        vertex = np.arange(starts[-1]) - starts[wedge]
+        wedge_segments = segments[wedge]
+        on_outer_arc = vertex <= wedge_segments
+        # position of the vertex on its arc, counted in segments from theta1
+        step = np.where(on_outer_arc, vertex, 2 * wedge_segments + 1 + ring[wedge] - vertex)
+        radius = np.where(on_outer_arc, geometry.outer_radius[wedge], geometry.inner_radius[wedge])
+        theta = np.deg2rad(geometry.theta1[wedge] + span[wedge] * step / wedge_segments)
+        vertices = np.stack([
+            self.origin[0] + radius * np.cos(theta),
+            self.origin[1] + radius * np.sin(theta)
+        ], axis=-1)
+        
+        codes = np.full(len(vertex), OutlinePath.LINETO, dtype=OutlinePath.code_type)
+        codes[starts[:-1]] = OutlinePath.MOVETO
+        codes[starts[1:] - 1] = OutlinePath.CLOSEPOLY
+        outer_ends = starts[:-1][ring] + segments[ring]
+        codes[outer_ends + 1] = OutlinePath.CLOSEPOLY
+        codes[outer_ends + 2] = OutlinePath.MOVETO
+        
+        return [
+            OutlinePath(wedge_vertices, wedge_codes)
+            for wedge_vertices, wedge_codes in zip(
+                np.split(vertices, starts[1:-1]), np.split(codes, starts[1:-1])
+            )
+        ]
     
     def __customize_chart(self) -> None:
         """
@@ -1,4 +1,5 @@
-from typing import Dict, Iterable
+from array import array
+from typing import Dict, Iterable, Optional
 
 class Path(tuple):
     """
@@ -22,11 +23,6 @@ class Path(tuple):
     path of Parent1 is 'Root/Grand Parent1'
     path of ParentChild11 is 'Root/Grand Parent1/Parent1'
     """
-    def __new__(cls, __iterable: Iterable[str]):
-        for item in __iterable:
-            assert isinstance(item, str)
-        return super().__new__(cls, __iterable)
-    
     def __str__(self) -> str:
         STRING_DELIM = "/"
         return STRING_DELIM.join(self)
@@ -37,7 +33,7 @@ class Path(tuple):
         )
         
     def __getitem__(self, key):
-        result = tuple.__getitem__(tuple(self), key)
+        result = tuple.__getitem__(self, key)
         
         if isinstance(result, tuple):
             return Path(result)
@@ -57,4 +53,138 @@ class Path(tuple):
         return self[: len(self) - 1]
 
     def ancestors(self):
-        return [self[:i] for i in range(len(self) + 1)]
\ No newline at end of file
+        return [self[:i] for i in range(len(self) + 1)]
+
+
+class PathRef:
+    """
+    A path interned in a PathTable, identified by its integer id
+    
+    Offers the same methods as Path. Every path of a table has exactly one PathRef, so the methods return
+    existing objects instead of creating new paths, and two PathRefs of a table are equal only if they are
+    the same object.
+    
+    Attributes
+    ----------
+    table: PathTable holding the path
+    id: position of the path in the table
+    """
+    __slots__ = ("table", "id")
+    
+    def __init__(self, table, id: int):
+        self.table = table
+        self.id = id
+    
+    def __len__(self) -> int:
+        return self.table.depth[self.id]
+    
+    def __str__(self) -> str:
+        return str(self.to_path())
+    
+    def __repr__(self) -> str:
+        return "PathRef({}, {})".format(self.id, self.to_path().__repr__())
+    
+    @property
+    def name(self) -> str:
+        """
+        The last element of the path, an empty string for the empty path
+        """
+        return self.table.names[self.id]
+    
+    def parent(self):
+        parent_id = self.table.parent[self.id]
+        return self.table.refs[parent_id] if parent_id >= 0 else self
+    
+    def ancestors(self):
+        ancestors = [self]
+        parent_ids = self.table.parent
+        node_id = parent_ids[self.id]
+        while node_id >= 0:
+            ancestors.append(self.table.refs[node_id])
+            node_id = parent_ids[node_id]
+        ancestors.reverse()
+        return ancestors
+    
+    def startswith(self, tag):
+        if not isinstance(tag, PathRef) or tag.table is not self.table:
+            raise ValueError(
+                "Expecting a PathRef of the same table " "but got {}!".format(type(tag))
+            )
+        parent_ids = self.table.parent
+        depth = self.table.depth
+        tag_depth = depth[tag.id]
+        node_id = self.id
+        while depth[node_id] > tag_depth:
+            node_id = parent_ids[node_id]
+        return node_id == tag.id
+    
+    def to_path(self) -> Path:
+        return self.table.path(self.id)
+
+
+class PathTable:
+    """
+    Interns paths as integer ids with a parent pointer
+    
+    The empty path always has id 0, and a path always gets a larger id than its parent.
+    
+    Attributes
+    ----------
+    parent: array of the id of the parent of every path, -1 for the empty path
+    depth: array of the length of every path
+    names: last element of every path
+    refs: the PathRef of every path
+    """
+    def __init__(self):
+        self.parent = array("i", [-1])
+        self.depth = array("i", [0])
+        self.names = [""]
+        self.refs = [PathRef(self, 0)]
+        self._ids = {}  # type: Dict[tuple, int]
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def intern(self, parent_id: int, name: str) -> int:
+        """
+        Returns the id of the child `name` of the path `parent_id`, adding it if it is new
+        """
+        key = (parent_id, name)
+        path_id = self._ids.get(key)
+        if path_id is None:
+            path_id = len(self.names)
+            self._ids[key] = path_id
+            self.parent.append(parent_id)
+            self.depth.append(self.depth[parent_id] + 1)
+            self.names.append(name)
+            self.refs.append(PathRef(self, path_id))
+        return path_id
+    
+    def add(self, path: Iterable[str]) -> int:
+        """
+        Returns the id of a path, adding the path and its ancestors if they are new
+        """
+        path_id = 0
+        for name in path:
+            path_id = self.intern(path_id, name)
+        return path_id
+    
+    def find(self, path: Iterable[str]) -> Optional[PathRef]:
+        """
+        Returns the PathRef of a path, None if the path is not in the table
+        """
+        path_id = 0
+        for name in path:
+            path_id = self._ids.get((path_id, name))
+            if path_id is None:
+                return None
+        return self.refs[path_id]
+    
+    def path(self, path_id: int) -> Path:
+        names = []
+        while path_id > 0:
+            names.append(self.names[path_id])
+            path_id = self.parent[path_id]
+        names.reverse()
+        return Path(names)
+
@@ -1,9 +1,41 @@
+import collections
 import copy
-import matplotlib as mpl
+import numpy as np
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
 import random
+from chart import color_scale
 from chart.chart import BaseChart
-from utils.utils import get_root_node_key
+from chart.spatial_index import GridIndex
+from chart.squarify import squarify
+
+# width of every character relative to the font size, per font family
+_CHAR_WIDTHS = {}
+
+def label_widths(names, font_family):
+    """
+    Returns the width of every name in the font family relative to the font size, from the advance widths of
+    its characters. The advance widths are read from the font once per character, kerning is left out.
+
+    Parameters
+    ----------
+    names: list of strings
+    font_family: name of the font family
+
+    Returns
+    -------
+    numpy.ndarray of float64
+    """
+    from matplotlib import font_manager
+    char_widths = _CHAR_WIDTHS.setdefault(font_family, {})
+    missing = set().union(*names).difference(char_widths)
+    if missing:
+        font = font_manager.get_font(font_manager.findfont(font_manager.FontProperties(family=font_family)))
+        # 72 pixels per font size, the advances are in 1/65536 pixels
+        font.set_size(72, 72)
+        for char in missing:
+            char_widths[char] = font.load_char(ord(char)).linearHoriAdvance / 65536 / 72
+    return np.fromiter((sum(char_widths[char] for char in name) for name in names), dtype=np.float64, count=len(names))
 
 class Treemap(BaseChart):
     """
@@ -11,6 +43,11 @@ class Treemap(BaseChart):
     """
     def __init__(self, data, chart_properties = {}):
         super().__init__(data)
+        self.rectangles = None
+        self._spatial_index = None
+        self.labels = []
+        self.labels_emitted = 0
+        self.labels_culled = 0
         self.converted_data = self.__convert_data()
         self.figure = Figure((8, 6), 100)
         if chart_properties:
@@ -24,6 +61,8 @@ class Treemap(BaseChart):
         self.figure.gca().set_axis_off()
         self.__draw_treemap(self.converted_data)
         self.__customize_chart()
+        # the labels are fitted again once the figure is sized to the canvas showing it
+        self.figure.canvas.mpl_connect("resize_event", self.__on_resize)
 
     def __customize_chart(self):
         if self.chart_properties:
@@ -52,41 +91,52 @@ class Treemap(BaseChart):
         -------
         A nested tuple representing data.
         """
-        root_key = get_root_node_key(self.data) 
-        keys = list(self.data.keys())
-        keys.remove(root_key)
+        root_key = self.table.root_key()
 
         converted_data = [root_key, None]
-        converted_data[1] = self.__calculate_node_value(root_key, keys)
+        converted_data[1] = self.__calculate_node_value(root_key)
         return tuple(converted_data)
 
-    def __calculate_node_value(self, node_key: str, key_list: list):
+    def __calculate_node_value(self, node_key: str):
         """
         Calculates the value of a given node key.
+        Nodes are visited in post order with an explicit stack, so each node is handled once and deep hierarchies do not hit the recursion limit.
+        The values and the children of the nodes are read from the node table of the chart.
 
         Parameters
         ----------
         node_key: string
-        key_list: list[string]
 
         Returns
         --------
         a tuple or an int or a flot
         """
-        if self.data[node_key][0] != None:
-            return self.data[node_key][0]
-        else:
-            child_nodes = []
-            for key in key_list:
-                if self.data[key][1] == node_key:
-                    new_key_list = list(key_list)
-                    new_key_list.remove(key)
-                    child_nodes.append((key, self.__calculate_node_value(key, new_key_list)))
-            return tuple(child_nodes)
+        table = self.table
+        names = table.names
+        values = table.value.tolist()
+        order, offsets = table.children()
+        order = order.tolist()
+        offsets = offsets.tolist()
+        results = {}
+        node = table.index[node_key]
+        stack = [(node, False)]
+        while stack:
+            i, expanded = stack.pop()
+            value = values[i]
+            # NaN for an empty value
+            if value == value:
+                results[i] = value
+            elif expanded:
+                results[i] = tuple((names[child], results.pop(child)) for child in order[offsets[i]:offsets[i + 1]])
+            else:
+                stack.append((i, True))
+                stack.extend((child, False) for child in order[offsets[i]:offsets[i + 1]])
+        return results[node]
     
     def __calculate_tree(self, root):
         """
-        Recursively calculate the the sum of the node values under each node and add that value to the tuple format of the representation.
+        Calculate the the sum of the node values under each node and add that value to the tuple format of the representation.
+        Nodes are visited in post order with an explicit stack, the finished subtrees of the children are taken from the top of the output stack.
 
         Parameters
         ----------
@@ -96,28 +146,36 @@ class Treemap(BaseChart):
         -------
         A nested tuple(name, value, sum)
         """
-        if type(root[1]) == int or type(root[1]) == float:
-            return root
-        elif type(root[1]) == tuple:
-            value = 0
-            child_nodes = root[1]
-            subtrees = []
-            for child_node in child_nodes:
-                subtree = self.__calculate_tree(child_node)
-                subtrees.append(subtree)
-                # leaf node
-                if len(subtree) == 2:
-                    value += subtree[1]
-                else:
-                    value += subtree[2]
-            subtrees.sort(key=lambda node : node[-1], reverse=True)
-            return (
-                root[0],
-                tuple(subtrees),
-                value
-            )
-        else:
-            raise ValueError("Invalid node value")
+        stack = [(root, False)]
+        output = []
+        while stack:
+            node, expanded = stack.pop()
+            if type(node[1]) == int or type(node[1]) == float:
+                output.append(node)
+            elif type(node[1]) == tuple:
+                if not expanded:
+                    stack.append((node, True))
+                    stack.extend((child_node, False) for child_node in reversed(node[1]))
+                    continue
+                first = len(output) - len(node[1])
+                subtrees = output[first:]
+                del output[first:]
+                value = 0
+                for subtree in subtrees:
+                    # leaf node
+                    if len(subtree) == 2:
+                        value += subtree[1]
+                    else:
+                        value += subtree[2]
+                subtrees.sort(key=lambda node : node[-1], reverse=True)
+                output.append((
+                    node[0],
+                    tuple(subtrees),
+                    value
+                ))
+            else:
+                raise ValueError("Invalid node value")
+        return output[0]
     
     def __pad_rectangles(self, rects, pad=4):
         """
@@ -199,286 +257,197 @@ class Treemap(BaseChart):
         named_sizes = map(lambda node: (node[0], float(node[1]) * total_area / total_size), named_sizes)
         return list(named_sizes)
 
-    def __layoutrow(self, named_sizes, x, y, dx, dy):
+    def __squarify(self, named_sizes, x, y, dx, dy):
         """
-        Generate rects for each size in named_sizes when dx >= dy. These rects fill up the height.
+        Compute treemap rectangles with chart.squarify.squarify.
 
         Parameters
         ----------
         named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
+            The sizes must be positive, sorted in descending order and normalized wrt to dx, dy.
         x, y : numeric
             The coordinates of the "origin".
         dx, dy : numeric
             The full width (`dx`) and height (`dy`) of the treemap.
-        
-        Returns
-        -------
-        list[rects]
-        """
-        covered_area = sum(node[1] for node in named_sizes)
-        width = covered_area / dy
-        rects = []
-        for name, size in named_sizes:
-            rects.append({"name": name, "x": x, "y": y, "dx": width, "dy": size / width})
-            y += size / width
-        return rects
 
-
-    def __layoutcol(self, named_sizes, x, y, dx, dy):
-        """
-        Generate rects for each size in named_sizes when dx < dy. These rects fill up the width.
-
-        Parameters
-        ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
         Returns
         -------
-        list[rects]
-        """
-        covered_area = sum(node[1] for node in named_sizes)
-        height = covered_area / dx
-        rects = []
-        for name, size in named_sizes:
-            rects.append({"name": name, "x": x, "y": y, "dx": size / height, "dy": height})
-            x += size / height
-        return rects
-
-
-    def __layout(self, named_sizes, x, y, dx, dy):
-        """
-        Use the self.layoutrow and self.layoutcol to generate the rectangles.
-
-        Parameters
-        ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
-        Returns
-        -------
-        list[rects]
+        list[dict]
+            Each dict in the returned list represents a single rectangle in the
+            treemap. The order corresponds to the input order.
         """
-        return (
-            self.__layoutrow(named_sizes, x, y, dx, dy) if dx >= dy else self.__layoutcol(named_sizes, x, y, dx, dy)
-        )
+        rects = squarify([node[1] for node in named_sizes], x, y, dx, dy)
+        return [
+            {"name": node[0], "x": rect[0], "y": rect[1], "dx": rect[2], "dy": rect[3]}
+            for node, rect in zip(named_sizes, rects.tolist())
+        ]
 
-    def __worst_ratio(self, named_sizes, x, y, dx, dy): 
+    def __get_rectangles(self, node, x, y, dx=100, dy=100, pad=False):
         """
-        Calculate the worst ratio from dy/dx and dx/dy for each rect.
+        Calculate the rectangles using the self.squarify method.
 
         Parameters
         ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
-        Returns
-        -------
-        worst_ratio: numeric
-        """
-        return max(
-            [
-                max(rect["dx"] / rect["dy"], rect["dy"] / rect["dx"])
-                for rect in self.__layout(named_sizes, x, y, dx, dy)
-            ]
-        )
-
-    def __leftoverrow(self, named_sizes, x, y, dx, dy):
-        """
-        Calculate the remaining area when dx >= dy.
+        node: tuple(name, value, sum)
+            This node must be a node returned from self.calculate_tree
+        x, y, dx, dy: numeric
+        pad: boolean
 
-        Parameters
-        ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
         Returns
         -------
-        tuple(leftover_x, leftover_y, leftover_dx, leftover_dy)
-        """
-        covered_area = sum(node[1] for node in named_sizes)
-        width = covered_area / dy
-        leftover_x = x + width
-        leftover_y = y
-        leftover_dx = dx - width
-        leftover_dy = dy
-        return (leftover_x, leftover_y, leftover_dx, leftover_dy)
-
-
-    def __leftovercol(self, named_sizes, x, y, dx, dy):
+        list[rect]
         """
-        Calculate the remaining area when dx < dy.
+        node_value = node[1]
 
-        Parameters
-        ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
-        Returns
-        -------
-        tuple(leftover_x, leftover_y, leftover_dx, leftover_dy)
-        """
-        # compute remaining area when dx >= dy
-        covered_area = sum(node[1] for node in named_sizes)
-        height = covered_area / dx
-        leftover_x = x
-        leftover_y = y + height
-        leftover_dx = dx
-        leftover_dy = dy - height
-        return (leftover_x, leftover_y, leftover_dx, leftover_dy)
+        if type(node_value) != tuple:
+            return []
 
+        named_sizes = []
+        for child in node_value:
+            named_sizes.append(( self.__get_node_name(child), self.__get_node_value(child)))
+        named_sizes = self.__normalize_sizes(named_sizes, dx, dy)
+        named_sizes.sort(key=lambda x: x[1] , reverse=True)
 
-    def __leftover(self, named_sizes, x, y, dx, dy):
+        rectangles = self.__squarify(named_sizes, x, y, dx, dy)
+        if pad:
+            return self.__pad_rectangles(rectangles, dx, dy)
+        return rectangles
+    
+    def __plot_rectangles(self, rectangles_by_level, colorable=True):
         """
-        Use the self.leftoverrow and self.leftovercol to calculate the remaining area.
+        Draw all the rectangles with a single PolyCollection and label the rectangles which are big enough to hold their label.
+        The geometry of the rectangles is kept so that the chart can be restyled without computing the layout again.
 
         Parameters
         ----------
-        named_sizes: list[(name, size)]
-            The sizes must be normalized wrt to dx, dy.
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
-        
+        rectangles_by_level: list[list[rect]]
+        colorable: boolean
+
         Returns
         -------
-        tuple(leftover_x, leftover_y, leftover_dx, leftover_dy)
+        None
         """
-        return (
-            self.__leftoverrow(named_sizes, x, y, dx, dy)
-            if dx >= dy
-            else self.__leftovercol(named_sizes, x, y, dx, dy)
+        self._level_count = len(rectangles_by_level)
+        rects = [rect for level_rects in rectangles_by_level for rect in level_rects]
+        self._levels = np.repeat(np.arange(self._level_count), [len(level_rects) for level_rects in rectangles_by_level])
+        self._names = [rect["name"] for rect in rects]
+        self._geometry = np.array([[rect["x"], rect["y"], rect["dx"], rect["dy"]] for rect in rects], dtype=np.float64).reshape(-1, 4)
+        self._colorable = colorable
+        x, y, dx, dy = self._geometry.T
+
+        ax = self.figure.gca()
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 100)
+
+        vertices = np.stack([
+            np.stack([x, y], axis=-1),
+            np.stack([x, y + dy], axis=-1),
+            np.stack([x + dx, y + dy], axis=-1),
+            np.stack([x + dx, y], axis=-1)
+        ], axis=1)
+        self.rectangles = PolyCollection(vertices, linewidths=1)
+        self.__color_rectangles()
+        ax.add_collection(self.rectangles, autolim=False)
+        self.__label_rectangles()
+
+    def __color_rectangles(self):
+        """
+        Sets the colors of the rectangles from the colormap of the chart, by the level of every rectangle.
+        """
+        if self._colorable and self.chart_properties.get("colormap", False):
+            self.rectangles.set_facecolor(color_scale.colors(self._levels + 1, self.chart_properties["colormap"], vmin=0, vmax=self._level_count))
+            self.rectangles.set_edgecolor("black")
+        else:
+            self.rectangles.set_facecolor("white")
+            self.rectangles.set_edgecolor("none")
+
+    def __label_rectangles(self):
+        """
+        Label the rectangles which are big enough to hold their label with the chart font, at the current size
+        of the figure.
+        The labels replace the ones of an earlier call. The number of drawn and skipped labels is kept in
+        self.labels_emitted and self.labels_culled.
+        """
+        for label in self.labels:
+            label.remove()
+        names = self._names
+        x, y, dx, dy = self._geometry.T
+        ax = self.figure.gca()
+
+        # size of a data unit and of the chart font in screen pixels
+        axes_box = ax.get_position()
+        figure_width, figure_height = self.figure.get_size_inches() * self.figure.dpi
+        self._labelled_size = (figure_width, figure_height)
+        unit_x = axes_box.width * figure_width / 100
+        unit_y = axes_box.height * figure_height / 100
+        font_size = self.chart_properties["chart_font_size"] * self.figure.dpi / 72
+        name_widths = label_widths(names, self.chart_properties["chart_font_family"])
+
+        # the label starts 1 unit right of the left edge and its baseline is 3 units below the top edge
+        fits = (
+            (dx * unit_x >= unit_x + name_widths * font_size) &
+            (dy * unit_y >= np.maximum(font_size, 3 * unit_y))
         )
+        font = {
+            "family": self.chart_properties["chart_font_family"],
+            "size": self.chart_properties["chart_font_size"]
+        }
+        self.labels = [
+            ax.text(x[i] + 1, y[i] + dy[i] - 3, names[i], fontdict=font)
+            for i in np.flatnonzero(fits)
+        ]
+        self.labels_emitted = len(self.labels)
+        self.labels_culled = len(names) - self.labels_emitted
 
-    def __squarify(self, named_sizes, x, y, dx, dy):
-        """Compute treemap rectangles.
+    def __on_resize(self, event):
+        """
+        Labels the rectangles again when the size of the figure changed since they were labelled.
+        """
+        if self.rectangles is None:
+            return
+        if tuple(self.figure.get_size_inches() * self.figure.dpi) != self._labelled_size:
+            self.__label_rectangles()
 
-        Given a set of values, computes a treemap layout in the specified geometry
-        using an algorithm based on Bruls, Huizing, van Wijk, "Squarified Treemaps".
-        See README for example usage.
+    def node_at(self, x, y):
+        """
+        Returns the name of the node whose rectangle contains the point, the deepest one where the rectangles
+        are nested. The rectangles are indexed on the first call.
 
         Parameters
         ----------
-        sizes : list-like of numeric values
-            The set of values to compute a treemap for. `sizes` must be positive
-            values sorted in descending order and they should be normalized to the
-            total area (i.e., `dx * dy == sum(sizes)`)
-        x, y : numeric
-            The coordinates of the "origin".
-        dx, dy : numeric
-            The full width (`dx`) and height (`dy`) of the treemap.
+        x, y: data coordinates of the point
 
         Returns
         -------
-        list[dict]
-            Each dict in the returned list represents a single rectangle in the
-            treemap. The order corresponds to the input order.
+        str or None if the point is outside of all the rectangles
         """
-        named_sizes = list(map(lambda x: (x[0], float(x[1])), named_sizes))
-
-        if len(named_sizes) == 0:
-            return []
-
-        if len(named_sizes) == 1:
-            return self.__layout(named_sizes, x, y, dx, dy)
-
-        # figure out where 'split' should be
-        i = 1
-        while i < len(named_sizes) and self.__worst_ratio(named_sizes[:i], x, y, dx, dy) >= self.__worst_ratio(
-            named_sizes[: (i + 1)], x, y, dx, dy
-        ):
-            i += 1
-        current = named_sizes[:i]
-        remaining = named_sizes[i:]
-
-        (leftover_x, leftover_y, leftover_dx, leftover_dy) = self.__leftover(current, x, y, dx, dy)
-        return self.__layout(current, x, y, dx, dy) + self.__squarify(
-            remaining, leftover_x, leftover_y, leftover_dx, leftover_dy
-        )
+        if self.rectangles is None:
+            return None
+        if self._spatial_index is None:
+            self._spatial_index = GridIndex(*self._geometry.T)
+        i = self._spatial_index.query(x, y)
+        return self._names[i] if i >= 0 else None
 
-    def __get_rectangles(self, node, x, y, dx=100, dy=100, pad=False):
+    def restyle(self, chart_properties):
         """
-        Calculate the rectangles using the self.squarify method.
+        Applies new chart properties (title, fonts and colormap) to the drawn chart.
+        Only the colors, the labels and the title are updated, the layout of the rectangles is kept.
 
         Parameters
         ----------
-        node: tuple(name, value, sum)
-            This node must be a node returned from self.calculate_tree
-        x, y, dx, dy: numeric
-        pad: boolean
+        chart_properties: dictionary of title, fonts and colormap
 
         Returns
         -------
-        list[rect]
+        None
         """
-        node_value = node[1]
-
-        if type(node_value) != tuple:
-            return []
-
-        named_sizes = []
-        for child in node_value:
-            named_sizes.append(( self.__get_node_name(child), self.__get_node_value(child)))
-        named_sizes = self.__normalize_sizes(named_sizes, dx, dy)
-        named_sizes.sort(key=lambda x: x[1] , reverse=True)
-
-        rectangles = self.__squarify(named_sizes, x, y, dx, dy)
-        if pad:
-            return self.__pad_rectangles(rectangles, dx, dy)
-        return rectangles
-    
-    def __plot_rectangles(self, rectangles_by_level, colorable=True):
-        level_count = len(rectangles_by_level)
-
-        for index in range(level_count):
-            level_rects = rectangles_by_level[index]
-
-            ax = self.figure.gca()
-            x = [rect["x"] for rect in level_rects]
-            y = [rect["y"] for rect in level_rects]
-            dx = [rect["dx"] for rect in level_rects]
-            dy = [rect["dy"] for rect in level_rects]
-            names = [rect["name"] for rect in level_rects]
-
-            if colorable and self.chart_properties.get("colormap", False):
-                colormap = mpl.colormaps[self.chart_properties["colormap"]]
-                color_value = (index + 1) / level_count
-                color = colormap(color_value)
-                ax.bar(x, dy, width=dx, linewidth=1, edgecolor='black', bottom=y, color=color, align="edge")
-            else:
-                ax.bar(x, dy, width=dx, linewidth=1, bottom=y, color="white", align="edge")
-            
-            for i in range(len(level_rects)):
-                font = {
-                    "family": self.chart_properties["chart_font_family"],
-                    "size": self.chart_properties["chart_font_size"]
-                }
-                ax.text(x[i] + 1, y[i] + dy[i] - 3, names[i], fontdict=font)
-            
-            ax.set_xlim(0, 100)
-            ax.set_ylim(0, 100)
+        self.chart_properties = chart_properties
+        if self.rectangles is not None:
+            self.__color_rectangles()
+            self.__label_rectangles()
+        # clear the title of the earlier style, the new title may be empty
+        self.figure.suptitle("")
+        self.__customize_chart()
 
     def __draw_treemap(self, root):
         """
@@ -502,7 +471,7 @@ class Treemap(BaseChart):
         first_level_rects = self.__pad_rectangles(first_level_rects)
 
         if (type(calculated_tree[1]) == tuple and len(calculated_tree[1])):
-            queue = []
+            queue = collections.deque()
             for i in range(len(calculated_tree[1])):
                 queue.append((calculated_tree[1][i], first_level_rects[i]))
 
@@ -512,7 +481,7 @@ class Treemap(BaseChart):
                 current_level_rects = []
                 new_queue = []
                 while len(queue) > 0:
-                    node, rect = queue.pop(0)
+                    node, rect = queue.popleft()
 
                     # Draw the inner rectangles of the node
                     node_rects = self.__get_rectangles(node, rect["x"], rect["y"], rect["dx"], rect["dy"])
@@ -1,22 +1,190 @@
-from chart.sunburst import Sunburst
-from chart.treemap import Treemap
-from chart.icicle import Icicle
+import importlib
+import io
+import json
+from utils.node_table import NodeTable
+
+# the chart modules import matplotlib, which takes longer than opening the window of the application, so
+# the module of a chart type is imported when the chart type is first used
+CHART_MODULES = {"Treemap": "chart.treemap", "Sunburst": "chart.sunburst", "Icicle": "chart.icicle"}
+
+# rough memory used by the layout and the artists of one node, measured with tracemalloc
+LAYOUT_BYTES_PER_NODE = {"Treemap": 1 << 10, "Sunburst": 2 << 10, "Icicle": 10 << 10}
+# detail every chart type can show on a canvas of about 800x600 pixels, see NodeTable.reduce.
+# A treemap node of 1e-4 of the total is about 7x7 pixels, a sunburst wedge or an icicle bar of 1e-3 is
+# below 2 pixels wide, and the padding of the treemap leaves no room for deeper levels.
+DETAIL_LIMITS = {
+    "Treemap": {"min_share": 1e-4, "max_children": None, "max_depth": 10},
+    "Sunburst": {"min_share": 1e-3, "max_children": None, "max_depth": 12},
+    "Icicle": {"min_share": 1e-3, "max_children": None, "max_depth": 16}
+}
+
+def load_chart_modules():
+    """
+    Imports the modules of all the chart types, so that the first chart does not wait for them.
+    """
+    for module_name in CHART_MODULES.values():
+        importlib.import_module(module_name)
 
 class ChartGenerator:
-    def __init__(self):
+    """
+    Creates the charts, optionally remembering earlier results.
+
+    Before the layout, the hierarchy is reduced to the detail limits of the chart type: the tiny siblings are
+    merged into "Other" nodes and the deep levels are cut, so the cost of a chart depends on what it shows.
+
+    The layout cache maps the fingerprint of a hierarchy and a chart type to the built chart. The layout does
+    not depend on the chart properties, so a hit with other properties only restyles the cached chart.
+    The image cache maps the fingerprint, the chart type, the chart properties and the image format to the
+    rendered image. Both caches are result_cache.ResultCache objects and may be shared by several generators.
+
+    Attributes
+    ----------
+    chart_type: type of the last generated chart
+    chart: the last generated chart
+    layout_cache: ResultCache of charts, None to always build the charts
+    image_cache: ResultCache of rendered images, None to always render the images
+    detail_limits: dictionary of chart type to the keyword arguments of NodeTable.reduce, None to draw every node
+    """
+    def __init__(self, layout_cache=None, image_cache=None, detail_limits=DETAIL_LIMITS):
         self.chart_type = None
         self.file_obj = None
+        self.chart = None
+        self.layout_cache = layout_cache
+        self.image_cache = image_cache
+        self.detail_limits = detail_limits
+
+    def generate_chart(self, chart_type, data, chart_properties = {}, focus=None, restyle=True):
+        """
+        Creates the chart of the given type and returns its figure.
+        With a layout cache, the chart of an earlier call on an equal hierarchy is reused and the figure is shared.
+        With a focus, only the subtree of the focused node is laid out, and it is cached per focused node.
+        A cached chart may be shown on a canvas, and matplotlib figures must not be changed by two threads.
+        Off the thread showing the charts pass restyle=False, and apply the properties with restyle_chart on
+        that thread.
+
+        Parameters
+        ----------
+        chart_type: "Treemap" | "Sunburst" | "Icicle"
+        data: dictionary of type "node": (value, "parent") or a utils.node_table.NodeTable
+        chart_properties: dictionary of title, fonts and colormap
+        focus: name of the node shown as the root of the chart, None for the whole hierarchy
+        restyle: whether a cached chart with other chart properties is restyled, False leaves it as it is
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+        """
+        self.chart = None
+        # without properties every chart falls back to its own defaults, which restyle does not know
+        if self.layout_cache is not None and chart_properties and chart_type in LAYOUT_BYTES_PER_NODE:
+            data = self.__node_table(data)
+            key = (data.fingerprint(), chart_type, self.__limits_key(chart_type), focus)
+            self.chart = self.layout_cache.get(key)
+            if self.chart is None:
+                data = self.__reduce(chart_type, self.__focus(data, focus))
+                self.chart = self.__create_chart(chart_type, data, dict(chart_properties))
+                self.layout_cache.put(key, self.chart, len(data) * LAYOUT_BYTES_PER_NODE[chart_type])
+            elif restyle and self.chart.chart_properties != chart_properties:
+                self.chart.restyle(dict(chart_properties))
+        else:
+            self.chart = self.__create_chart(chart_type, self.__reduce(chart_type, self.__focus(data, focus)), chart_properties)
+        self.chart_type = chart_type
+        return self.chart.get_figure() if self.chart is not None else None
+
+    def render_image(self, chart_type, data, chart_properties, image_format="png"):
+        """
+        Renders the chart of the given type to an image, served from the image cache when possible.
+        A hit does not change the last generated chart.
 
-    def generate_chart(self, chart_type, data, chart_properties = {}):
-        figure = None
+        Parameters
+        ----------
+        chart_type: "Treemap" | "Sunburst" | "Icicle"
+        data: dictionary of type "node": (value, "parent") or a utils.node_table.NodeTable
+        chart_properties: dictionary of title, fonts and colormap
+        image_format: "png" | "svg" or any other format of matplotlib.figure.Figure.savefig
+
+        Returns
+        -------
+        bytes of the image
+        """
+        data = self.__node_table(data)
+        key = None
+        if self.image_cache is not None and chart_properties:
+            key = (
+                data.fingerprint(), chart_type, self.__limits_key(chart_type),
+                json.dumps(chart_properties, sort_keys=True, default=str), image_format
+            )
+            image = self.image_cache.get(key)
+            if image is not None:
+                return image
+
+        figure = self.generate_chart(chart_type, data, chart_properties)
+        if figure is None:
+            raise ValueError("Unknown chart type '{}'".format(chart_type))
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=image_format)
+        image = buffer.getvalue()
+        if self.layout_cache is None:
+            # nothing refers to the chart anymore, release its artists right away
+            figure.clear()
+        if key is not None:
+            self.image_cache.put(key, image, len(image))
+        return image
+
+    def restyle_chart(self, chart_properties):
+        """
+        Applies new chart properties to the last generated chart, keeping its layout, and returns its figure.
+
+        Parameters
+        ----------
+        chart_properties: dictionary of title, fonts and colormap
+
+        Returns
+        -------
+        matplotlib.figure.Figure or None if no chart was generated
+        """
+        if self.chart is None:
+            return None
+        self.chart.restyle(chart_properties)
+        return self.chart.get_figure()
+
+    def __create_chart(self, chart_type, data, chart_properties):
         match chart_type:
             case "Treemap":
-                treemap = Treemap(data, chart_properties)
-                figure = treemap.get_figure()
+                from chart.treemap import Treemap
+                return Treemap(data, chart_properties)
             case "Sunburst":
-                sunburst = Sunburst(data, chart_properties)
-                figure = sunburst.get_figure()
+                from chart.sunburst import Sunburst
+                return Sunburst(data, chart_properties)
             case "Icicle":
-                icicle = Icicle(data, chart_properties)
-                figure = icicle.get_figure()
-        return figure
+                from chart.icicle import Icicle
+                return Icicle(data, chart_properties)
+        return None
+
+    def __focus(self, data, focus):
+        """
+        Returns the subtree of the focused node, the data itself without a focus.
+        """
+        if focus is None:
+            return data
+        table = self.__node_table(data)
+        if focus not in table.index:
+            raise ValueError("Unknown node '{}'".format(focus))
+        return table.subtree(table.index[focus])
+
+    def __reduce(self, chart_type, data):
+        """
+        Returns the hierarchy reduced to the detail limits of the chart type, the data itself without limits.
+        """
+        limits = self.detail_limits.get(chart_type) if self.detail_limits else None
+        if not limits:
+            return data
+        return self.__node_table(data).reduce(**limits)
+
+    def __limits_key(self, chart_type):
+        limits = self.detail_limits.get(chart_type) if self.detail_limits else None
+        return json.dumps(limits, sort_keys=True)
+
+    @staticmethod
+    def __node_table(data):
+        return data if isinstance(data, NodeTable) else NodeTable.from_dict(data)
@@ -0,0 +1,188 @@
+import os
+import queue
+import threading
+from chart_generator import ChartGenerator
+from exceptions import ParseError
+from input_parser import Parser
+from utils.node_table import NodeTable
+
+# how often the Tk main loop checks for messages of the worker thread, in milliseconds
+POLL_INTERVAL_MS = 50
+
+class GenerationCancelled(Exception):
+    """
+    Raised inside the worker thread to stop a cancelled job.
+    """
+
+class ChartWorker:
+    """
+    Generates charts in a background thread so that the Tk main loop stays responsive.
+
+    A job loads the hierarchy of the file from the hierarchy cache or parses it, then builds the chart with
+    its layout and artists on a standalone figure. A focus job, like a drill-down, starts from a loaded
+    hierarchy and lays out the subtree of the focused node. The worker thread never touches Tk: it puts its progress,
+    result or error on a queue which the main thread drains through root.after, and the callbacks are called
+    there. Starting a new job or calling cancel() abandons the running job. It stops at the next chunk of
+    parsed rows or between two stages, and anything it still posts is dropped.
+
+    Attributes
+    ----------
+    root: the Tk root, used to schedule the polling of the queue
+    hierarchy_cache: HierarchyCache used to skip parsing known files
+    layout_cache: ResultCache shared by the chart generators of all the jobs, None to always build the charts
+    thread: the thread of the latest job, None before the first job
+    """
+    def __init__(self, root, hierarchy_cache, layout_cache=None):
+        self.root = root
+        self.hierarchy_cache = hierarchy_cache
+        self.layout_cache = layout_cache
+        self.thread = None
+        self._messages = queue.Queue()
+        self._job_id = 0
+        self._cancel_event = None
+        self._callbacks = None
+        self._polling = False
+
+    def start(self, chart_type, file_name, chart_properties, on_progress, on_done, on_error):
+        """
+        Starts generating a chart in the background and cancels the running job.
+
+        Parameters
+        ----------
+        chart_type: "Treemap" | "Sunburst" | "Icicle"
+        file_name: path of the input file, opened again by the worker
+        chart_properties: dictionary of title, fonts and colormap
+        on_progress: callable receiving a progress message
+        on_done: callable receiving the NodeTable, the ChartGenerator holding the chart and its figure. A chart
+            from the layout cache keeps the chart properties it was cached with, see ChartGenerator.restyle_chart
+        on_error: callable receiving an error message
+
+        Returns
+        -------
+        None
+        """
+        self.__start((chart_type, file_name, dict(chart_properties), None), (on_progress, on_done, on_error))
+
+    def start_focus(self, chart_type, nodes, chart_properties, focus, on_progress, on_done, on_error):
+        """
+        Starts laying out a loaded hierarchy again in the background with another node shown as the root of
+        the chart, like on a drill-down, and cancels the running job.
+
+        Parameters
+        ----------
+        chart_type: "Treemap" | "Sunburst" | "Icicle"
+        nodes: the NodeTable of the hierarchy
+        chart_properties: dictionary of title, fonts and colormap
+        focus: name of the node shown as the root of the chart, None for the whole hierarchy
+        on_progress, on_done, on_error: like the callbacks of start
+
+        Returns
+        -------
+        None
+        """
+        self.__start((chart_type, nodes, dict(chart_properties), focus), (on_progress, on_done, on_error))
+
+    def __start(self, job, callbacks):
+        self.cancel()
+        self._job_id += 1
+        self._cancel_event = threading.Event()
+        self._callbacks = callbacks
+        self.thread = threading.Thread(target=self.__run, args=(self._job_id, self._cancel_event) + job, daemon=True)
+        self.thread.start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self.__poll)
+
+    def cancel(self):
+        """
+        Cancels the running job, its callbacks are not called anymore.
+        """
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        self._cancel_event = None
+        self._callbacks = None
+
+    def is_running(self):
+        return self._callbacks is not None
+
+    def __run(self, job_id, cancel_event, chart_type, source, chart_properties, focus):
+        """
+        Runs a job in the worker thread. The source is the name of the input file or the loaded NodeTable.
+        """
+        def post(kind, *args):
+            self._messages.put((job_id, kind, args))
+
+        def check_cancelled():
+            if cancel_event.is_set():
+                raise GenerationCancelled()
+
+        try:
+            if isinstance(source, NodeTable):
+                nodes = source
+            else:
+                post("progress", "Loading {}".format(os.path.basename(source)))
+                nodes = self.hierarchy_cache.load(source)
+                if nodes is None:
+                    nodes = self.__parse(source, post, check_cancelled)
+                    check_cancelled()
+                    self.hierarchy_cache.store(source, nodes)
+                check_cancelled()
+
+            post("progress", "Drawing the {}".format(chart_type.lower()))
+            chart_generator = ChartGenerator(self.layout_cache)
+            # a chart from the layout cache may be on the canvas, it is restyled on the Tk thread by on_done
+            figure = chart_generator.generate_chart(chart_type, nodes, chart_properties, focus, restyle=False)
+            check_cancelled()
+            post("done", nodes, chart_generator, figure)
+        except GenerationCancelled:
+            pass
+        except ParseError as e:
+            post("error", e.message)
+        except (OSError, ValueError) as e:
+            post("error", str(e))
+        except Exception as e:
+            # a failing chart must still end the job, or the status would wait for it forever
+            post("error", "Could not draw the {}: {}: {}".format(chart_type.lower(), type(e).__name__, e))
+
+    def __parse(self, file_name, post, check_cancelled):
+        """
+        Parses the file in chunks, reporting the share of the file read so far and stopping if the job is cancelled.
+        """
+        size = os.path.getsize(file_name)
+        last_percent = -1
+        with open(file_name, "r") as file_obj:
+            def on_chunk(rows):
+                nonlocal last_percent
+                check_cancelled()
+                # the position of the underlying buffer, the text layer can not tell while it is iterated
+                percent = 100 * file_obj.buffer.tell() // size if size else 100
+                if percent != last_percent:
+                    last_percent = percent
+                    post("progress", "Parsing {}%".format(percent))
+
+            return NodeTable.from_dict(Parser().parse_stream(file_obj, on_chunk=on_chunk))
+
+    def __poll(self):
+        """
+        Hands the messages of the current job to its callbacks on the Tk main thread.
+        Keeps polling while a job is running.
+        """
+        while self._callbacks is not None:
+            try:
+                job_id, kind, args = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self._job_id:
+                continue
+            on_progress, on_done, on_error = self._callbacks
+            if kind == "progress":
+                on_progress(*args)
+            else:
+                self._callbacks = None
+                self._cancel_event = None
+                (on_done if kind == "done" else on_error)(*args)
+
+        if self._callbacks is not None:
+            self.root.after(POLL_INTERVAL_MS, self.__poll)
+        else:
+            self._polling = False
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import numpy as np
+from utils.node_table import NodeTable
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PYCHARTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pycharts")
+)
+DEFAULT_MAX_BYTES = 4 << 30
+SAMPLE_BYTES = 1 << 16
+CACHE_VERSION = "1"
+COLUMNS = ("parent", "value", "depth", "name_offsets", "name_bytes")
+
+class MappedNames:
+    """
+    A read only sequence of node names decoded on access from a memory mapped UTF-8 buffer.
+    """
+    def __init__(self, name_bytes, name_offsets):
+        self.name_bytes = name_bytes
+        self.name_offsets = name_offsets
+
+    def __len__(self):
+        return len(self.name_offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("name index out of range")
+        return self.name_bytes[self.name_offsets[i]:self.name_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+class HierarchyCache:
+    """
+    An on-disk cache of parsed hierarchies.
+
+    Every entry is a directory of .npy files holding the columns of a NodeTable, so a hit is loaded with
+    memory mapping instead of reading and parsing the file. Entries are keyed by a fingerprint of the
+    file: its absolute path, size, modification time and a hash of sampled content blocks (the head, the
+    middle and the tail of the file) which keeps fingerprinting cheap for very large files.
+    The least recently used entries are removed when the cache grows over max_bytes.
+
+    Attributes
+    ----------
+    cache_dir: directory holding the entries
+    max_bytes: upper limit of the total size of all the entries
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def fingerprint(self, path):
+        """
+        Returns the cache key of a file as a hex string.
+
+        Parameters
+        ----------
+        path: path of the input file
+
+        Returns
+        -------
+        str
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update("{}\0{}\0{}\0{}\0".format(CACHE_VERSION, path, stat.st_size, stat.st_mtime_ns).encode("utf-8"))
+        with open(path, "rb") as file_obj:
+            for offset in sorted({0, max(stat.st_size // 2 - SAMPLE_BYTES // 2, 0), max(stat.st_size - SAMPLE_BYTES, 0)}):
+                file_obj.seek(offset)
+                digest.update(file_obj.read(SAMPLE_BYTES))
+        return digest.hexdigest()
+
+    def load(self, path):
+        """
+        Returns the cached hierarchy of the file as a memory mapped NodeTable, None on a miss.
+
+        Parameters
+        ----------
+        path: path of the input file
+
+        Returns
+        -------
+        NodeTable or None
+        """
+        entry_dir = os.path.join(self.cache_dir, self.fingerprint(path))
+        try:
+            columns = {
+                column: np.load(os.path.join(entry_dir, column + ".npy"), mmap_mode="r")
+                for column in COLUMNS
+            }
+        except (OSError, ValueError):
+            return None
+        # mark the entry as recently used
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+        names = MappedNames(columns["name_bytes"], columns["name_offsets"])
+        return NodeTable(names, columns["parent"], columns["value"], columns["depth"])
+
+    def store(self, path, table):
+        """
+        Writes the hierarchy of the file to the cache and evicts old entries if needed.
+        Failing to write to the cache is not an error, the method returns False instead.
+
+        Parameters
+        ----------
+        path: path of the input file
+        table: NodeTable parsed from the file
+
+        Returns
+        -------
+        bool
+        """
+        encoded_names = [name.encode("utf-8") for name in table.names]
+        name_offsets = np.zeros(len(encoded_names) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded_names], out=name_offsets[1:])
+        columns = {
+            "parent": np.asarray(table.parent),
+            "value": np.asarray(table.value),
+            "depth": np.asarray(table.depth),
+            "name_offsets": name_offsets,
+            "name_bytes": np.frombuffer(b"".join(encoded_names), dtype=np.uint8),
+        }
+
+        try:
+            key = self.fingerprint(path)
+            entry_dir = os.path.join(self.cache_dir, key)
+            temp_dir = "{}.tmp-{}-{}".format(entry_dir, os.getpid(), threading.get_ident())
+            os.makedirs(temp_dir, exist_ok=True)
+            for column, array in columns.items():
+                np.save(os.path.join(temp_dir, column + ".npy"), array)
+            try:
+                os.rename(temp_dir, entry_dir)
+            except OSError:
+                # another process stored the same file first
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            self.evict()
+        except OSError:
+            return False
+        return True
+
+    def entries(self):
+        """
+        Returns the cached entries from the least to the most recently used.
+
+        Returns
+        -------
+        list[tuple(entry_dir, last_used, size)]
+        """
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, key)
+            if ".tmp-" in key or not os.path.isdir(entry_dir):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+                entries.append((entry_dir, os.stat(entry_dir).st_mtime_ns, size))
+            except OSError:
+                continue
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size is not over max_bytes.
+        """
+        entries = self.entries()
+        total_size = sum(entry[2] for entry in entries)
+        for entry_dir, _, size in entries:
+            if total_size <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+
+    def clear(self):
+        """
+        Removes all the entries of the cache.
+        """
+        for entry_dir, _, _ in self.entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
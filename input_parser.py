@@ -1,11 +1,79 @@
 import csv
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pprint import pp
 import pprint
 from exceptions import ParseError
 
+DEFAULT_CHUNK_SIZE = 1024
+MIN_SHARD_BYTES = 1 << 20
+
+def _is_valid_entry(row):
+    return len(row) == 2 and (row[1] == "" or row[1].replace(".", "").isdigit())
+
+def _read_shard(path, start, end):
+    """
+    Tokenizes and validates the rows between the byte offsets start and end of a file.
+    Both offsets must be at the beginning of a line. Runs in the worker processes of Parser.parse_parallel.
+
+    Parameters
+    ----------
+    path: path of the input file
+    start, end: byte offsets of the shard
+
+    Returns
+    -------
+    tuple(rows, error_index)
+        rows: list[tuple(node_names, value)] of the valid rows in front of the first invalid one
+        error_index: position of the first invalid line in the shard, None if all lines are valid
+    """
+    with open(path, "rb") as file_obj:
+        file_obj.seek(start)
+        lines = file_obj.read(end - start).decode("utf-8").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    rows = []
+    for index, row in enumerate(csv.reader(lines, delimiter=",")):
+        if not _is_valid_entry(row):
+            return rows, index
+        rows.append((row[0].split("."), None if row[1] == "" else float(row[1])))
+    return rows, None
+
+class ParseStats:
+    """
+    Throughput and memory figures of a single streaming parse.
+
+    Attributes
+    ----------
+    rows: number of data rows read (the header line is not counted)
+    seconds: wall clock time spent parsing
+    peak_bytes: peak traced allocation during the parse, None if memory was not measured
+    """
+    def __init__(self, rows, seconds, peak_bytes=None):
+        self.rows = rows
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+    @property
+    def rows_per_second(self):
+        if self.seconds <= 0:
+            return float(self.rows)
+        return self.rows / self.seconds
+
+    def __repr__(self):
+        return "ParseStats(rows={}, seconds={:.3f}, rows_per_second={:.0f}, peak_bytes={})".format(
+            self.rows, self.seconds, self.rows_per_second, self.peak_bytes
+        )
+
 class Parser:
     def __init__(self):
         self.nodes = {}
+        self.stats = None
 
     def clear_nodes(self):
         self.nodes = {}
@@ -24,6 +92,128 @@ class Parser:
             row_count += 1
         return self.nodes
 
+    def parse_stream(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE, measure_memory=False, on_chunk=None):
+        """
+        Parses the file in chunks of `chunk_size` rows, validating and linking each row as it arrives.
+
+        Unlike parse, the node dictionary is not kept on the parser instance, so the caller owns the only
+        reference to it. Node and parent names are interned, which makes every parent reference share the
+        key string of its parent instead of holding a copy of it.
+        Throughput (and optionally peak memory) of the run is stored in self.stats.
+
+        Parameters
+        ----------
+        file_obj: a text file object
+        chunk_size: number of rows read per chunk
+        measure_memory: trace allocations to report the peak bytes of the parse. Tracing slows the parse down.
+        on_chunk: optional callable receiving the number of rows read so far after every chunk
+
+        Returns
+        -------
+        dict[str, tuple(value, parent)]
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        started_tracing = False
+        if measure_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            base_bytes = tracemalloc.get_traced_memory()[0]
+
+        nodes = {}
+        line_no = 1
+        start = time.perf_counter()
+        try:
+            csv_reader = csv.reader(file_obj, delimiter=",")
+            first_row = next(csv_reader, None)
+            if first_row is not None:
+                if not self._validate_first_row(first_row):
+                    raise ParseError("Invalid first line: Line 1")
+                while True:
+                    chunk = list(islice(csv_reader, chunk_size))
+                    if not chunk:
+                        break
+                    for row in chunk:
+                        line_no += 1
+                        self._link_row(nodes, row, line_no)
+                    del chunk
+                    if on_chunk:
+                        on_chunk(line_no - 1)
+            peak_bytes = None
+            if measure_memory:
+                peak_bytes = max(tracemalloc.get_traced_memory()[1] - base_bytes, 0)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.stats = ParseStats(line_no - 1, time.perf_counter() - start, peak_bytes)
+        return nodes
+
+    def parse_parallel(self, path, workers=None, min_shard_bytes=MIN_SHARD_BYTES):
+        """
+        Parses the file with a pool of processes.
+
+        The data lines are split into newline aligned byte ranges of at least `min_shard_bytes` bytes.
+        Every worker tokenizes and validates the rows of one range, and the rows are then linked to their
+        parents in file order, so errors report the same line numbers as parse. Quoted names must not
+        contain line breaks. Like parse_stream, the nodes are not kept on the parser instance and the
+        throughput of the run is stored in self.stats.
+
+        Parameters
+        ----------
+        path: path of the input file
+        workers: number of worker processes, defaults to the number of CPUs
+        min_shard_bytes: files smaller than two shards are parsed in the calling process
+
+        Returns
+        -------
+        dict[str, tuple(value, parent)]
+        """
+        start = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+        with open(path, "rb") as file_obj:
+            first_line = file_obj.readline()
+            data_start = file_obj.tell()
+            file_size = os.fstat(file_obj.fileno()).st_size
+            if not first_line:
+                self.stats = ParseStats(0, time.perf_counter() - start)
+                return {}
+            if not self._validate_first_row(next(csv.reader([first_line.decode("utf-8").rstrip("\r\n")]), [])):
+                raise ParseError("Invalid first line: Line 1")
+
+            shard_count = max(1, min(workers, (file_size - data_start) // max(min_shard_bytes, 1)))
+            boundaries = [data_start]
+            for i in range(1, shard_count):
+                file_obj.seek(data_start + (file_size - data_start) * i // shard_count)
+                file_obj.readline()
+                if file_obj.tell() > boundaries[-1]:
+                    boundaries.append(file_obj.tell())
+            if boundaries[-1] < file_size:
+                boundaries.append(file_size)
+
+        shards = list(zip(boundaries[:-1], boundaries[1:]))
+        if len(shards) <= 1:
+            results = [_read_shard(path, shard_start, shard_end) for shard_start, shard_end in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+                results = list(executor.map(_read_shard, [path] * len(shards), *zip(*shards)))
+
+        nodes = {}
+        line_no = 1
+        for rows, error_index in results:
+            for node_names, value in rows:
+                line_no += 1
+                self._link_node(nodes, node_names, value, line_no)
+            if error_index is not None:
+                raise ParseError(f"Invalid entry: Line {line_no + 1}")
+
+        self.stats = ParseStats(line_no - 1, time.perf_counter() - start)
+        return nodes
+
     def _validate_first_row(self, first_row):
         if len(first_row) == 2 and first_row[0] == "name" and first_row[1] == "value":
             return True
@@ -37,7 +227,7 @@ class Parser:
         ):
             return True
         return False
-    
+
     def _validate_name(self, name):
         node_names = name.split(".")
         if node_names[-1] in self.nodes:
@@ -46,7 +236,7 @@ class Parser:
             if not name in self.nodes:
                 return False
         return True
-    
+
     def _add_node(self, row):
         node_names = row[0].split(".")
         node_name = node_names[-1]
@@ -55,3 +245,25 @@ class Parser:
             parent_name = node_names[-2]
         value = None if row[1]=="" else float(row[1])
         self.nodes[node_name] = (value, parent_name)
+
+    def _link_row(self, nodes, row, line_no):
+        """
+        Validates a data row against the nodes read so far and adds it to nodes.
+        Same rules as _validate_row and _add_node, but the name is split only once.
+        """
+        if not _is_valid_entry(row):
+            raise ParseError(f"Invalid entry: Line {line_no}")
+        self._link_node(nodes, row[0].split("."), None if row[1]=="" else float(row[1]), line_no)
+
+    def _link_node(self, nodes, node_names, value, line_no):
+        """
+        Adds a tokenized row to nodes after checking that the node is new and all of its ancestors exist.
+        """
+        node_name = node_names[-1]
+        if node_name in nodes:
+            raise ParseError(f"Invalid entry: Line {line_no}")
+        for name in node_names[:-1]:
+            if not name in nodes:
+                raise ParseError(f"Invalid entry: Line {line_no}")
+        parent_name = sys.intern(node_names[-2]) if len(node_names) > 1 else None
+        nodes[sys.intern(node_name)] = (value, parent_name)
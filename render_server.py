@@ -0,0 +1,423 @@
+"""
+A local HTTP service rendering hierarchies to images, for embedding charts without starting a process per chart.
+
+Endpoints
+---------
+POST /render
+    text/csv body: a hierarchy file. chart_type, format and chart_properties (as JSON) are query parameters.
+    application/json body: {"chart_type": ..., "format": ..., "chart_properties": {...}, and either
+    "csv": "<file content>" or "nodes": {"node": [value, "parent"], ...}}
+    Returns the chart as image/png or image/svg+xml.
+GET /metrics
+    Request counters and latency histograms in the Prometheus text format.
+GET /health
+    "ok" once the workers are warm.
+
+The charts are rendered by a pool of worker processes which load matplotlib and the fonts before the first
+request. At most workers + queue_size requests are accepted at a time, further requests get 503 with a
+Retry-After header until a slot is free.
+
+Usage: python render_server.py [--host 127.0.0.1] [--port 8765] [-w WORKERS] [--queue-size QUEUE_SIZE]
+"""
+import argparse
+import bisect
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use("Agg")
+
+from chart_generator import ChartGenerator
+from exceptions import ParseError
+from input_parser import Parser
+from result_cache import ResultCache
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+DEFAULT_CHART_PROPERTIES = {
+    "title": "",
+    "title_font_family": "DejaVu Sans",
+    "title_font_size": 20,
+    "chart_font_family": "DejaVu Sans",
+    "chart_font_size": 8,
+    "colormap": "Blues"
+}
+MAX_BODY_BYTES = 64 << 20
+REQUEST_TIMEOUT = 120
+# upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+WARMUP_NODES = {"Root": (None, None), "A": (1, "Root"), "B": (2, "Root")}
+# size of the caches of every worker process
+LAYOUT_CACHE_BYTES = 128 << 20
+IMAGE_CACHE_BYTES = 64 << 20
+
+# the chart generator of the worker process, created by the first render
+_chart_generator = None
+
+class PayloadError(Exception):
+    """
+    Raised for requests that can not be rendered because of their content, answered with 400.
+    """
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+def warm_worker():
+    """
+    Initializer of the worker processes. Renders a tiny chart of every type so that matplotlib, the
+    colormaps and the fonts are loaded before the first request.
+    """
+    for chart_type in CHART_TYPES:
+        for image_format in CONTENT_TYPES:
+            render(chart_type, image_format, DEFAULT_CHART_PROPERTIES, nodes=WARMUP_NODES)
+
+def render(chart_type, image_format, chart_properties, csv_text=None, nodes=None):
+    """
+    Renders a hierarchy given as CSV text or as a dictionary of type "node": (value, "parent"). Runs in a
+    worker process, repeated requests for the same hierarchy are served from the caches of the process.
+
+    Returns
+    -------
+    bytes of the image
+    """
+    global _chart_generator
+    if _chart_generator is None:
+        _chart_generator = ChartGenerator(ResultCache(LAYOUT_CACHE_BYTES), ResultCache(IMAGE_CACHE_BYTES))
+    if csv_text is not None:
+        nodes = Parser().parse_stream(io.StringIO(csv_text))
+    return _chart_generator.render_image(chart_type, nodes, chart_properties, image_format)
+
+class LatencyHistogram:
+    """
+    A thread safe cumulative histogram of request latencies, labelled like Prometheus histograms.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # type: dict[tuple, tuple[list, float]]
+
+    def observe(self, labels, seconds):
+        """
+        Records one request.
+
+        Parameters
+        ----------
+        labels: tuple of (name, value) pairs
+        seconds: latency of the request
+        """
+        with self._lock:
+            counts, total = self._series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self._series[labels] = (counts, total + seconds)
+
+    def format(self, name):
+        """
+        Returns the histogram in the Prometheus text format.
+        """
+        lines = ["# TYPE {} histogram".format(name)]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total) in series:
+            label_text = ",".join('{}="{}"'.format(key, value) for key, value in labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(name, label_text, bound, cumulative))
+            lines.append("{}_sum{{{}}} {:.6f}".format(name, label_text, total))
+            lines.append("{}_count{{{}}} {}".format(name, label_text, cumulative))
+        return "\n".join(lines) + "\n"
+
+class RenderService:
+    """
+    The render service: an HTTP server on a thread plus a warm pool of render processes.
+
+    Attributes
+    ----------
+    host, port: address of the server, port 0 picks a free port
+    workers: number of render processes
+    queue_size: number of requests waiting for a worker before new requests are rejected
+    request_timeout: seconds a request waits for its image before it is answered with 504
+    latency: LatencyHistogram of the /render requests by chart type and status
+    """
+    def __init__(self, host="127.0.0.1", port=0, workers=2, queue_size=8, request_timeout=REQUEST_TIMEOUT):
+        if workers < 1 or queue_size < 0:
+            raise ValueError("workers must be at least 1 and queue_size must not be negative")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.request_timeout = request_timeout
+        self.latency = LatencyHistogram()
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://{}:{}".format(self.host, self.port)
+
+    def start(self):
+        """
+        Starts and warms up the render processes, then starts serving on a background thread.
+        """
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        # one task per worker makes the pool start all of its processes, which warm up in the initializer
+        for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        self._server = ThreadingHTTPServer((self.host, self.port), RenderRequestHandler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def serve_forever(self):
+        """
+        Serves until interrupted, starting the service first if needed.
+        """
+        if self._server is None:
+            self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def acquire_slot(self):
+        """
+        Reserves a place for a request, returns False if the workers and the queue are full.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self._in_flight += 1
+        return True
+
+    def release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, payload):
+        """
+        Starts rendering a validated payload on the worker pool and returns the future of the image bytes.
+        The future takes over the slot of the request and releases it when the render ends. A render which
+        outlives the timeout of its request keeps its slot, so it still counts against the capacity.
+        """
+        future = self._executor.submit(
+            render, payload["chart_type"], payload["format"], payload["chart_properties"],
+            csv_text=payload.get("csv"), nodes=payload.get("nodes")
+        )
+        future.add_done_callback(lambda future: self.release_slot())
+        return future
+
+    def metrics(self):
+        with self._lock:
+            in_flight, rejected = self._in_flight, self.rejected
+        return (
+            "# TYPE render_in_flight gauge\nrender_in_flight {}\n".format(in_flight)
+            + "# TYPE render_capacity gauge\nrender_capacity {}\n".format(self.workers + self.queue_size)
+            + "# TYPE render_rejected_total counter\nrender_rejected_total {}\n".format(rejected)
+            + self.latency.format("render_request_seconds")
+        )
+
+def read_payload(content_type, body, query):
+    """
+    Validates a /render request and returns its payload as a dictionary with chart_type, format,
+    chart_properties and either csv or nodes.
+    """
+    options = {key: values[-1] for key, values in parse_qs(query).items()}
+    if content_type == "application/json":
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise PayloadError("The body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise PayloadError("The body must be a JSON object")
+        options.update({key: payload[key] for key in ("chart_type", "format", "chart_properties") if key in payload})
+        if isinstance(payload.get("csv"), str):
+            data = {"csv": payload["csv"]}
+        elif isinstance(payload.get("nodes"), dict):
+            data = {"nodes": read_nodes(payload["nodes"])}
+        else:
+            raise PayloadError("The body must hold the hierarchy as 'csv' text or as a 'nodes' object")
+    elif content_type in ("text/csv", "text/plain"):
+        try:
+            data = {"csv": body.decode("utf-8")}
+        except UnicodeDecodeError:
+            raise PayloadError("The CSV body must be UTF-8 encoded")
+        if "chart_properties" in options:
+            try:
+                options["chart_properties"] = json.loads(options["chart_properties"])
+            except ValueError:
+                raise PayloadError("chart_properties must be a JSON object")
+    else:
+        raise PayloadError("Unsupported content type '{}'".format(content_type))
+
+    chart_type = options.get("chart_type", "Treemap")
+    if chart_type not in CHART_TYPES:
+        raise PayloadError("chart_type must be one of {}".format(", ".join(CHART_TYPES)))
+    image_format = options.get("format", "png")
+    if image_format not in CONTENT_TYPES:
+        raise PayloadError("format must be one of {}".format(", ".join(CONTENT_TYPES)))
+    chart_properties = options.get("chart_properties", {})
+    if not isinstance(chart_properties, dict):
+        raise PayloadError("chart_properties must be a JSON object")
+    data.update({
+        "chart_type": chart_type,
+        "format": image_format,
+        "chart_properties": dict(DEFAULT_CHART_PROPERTIES, **chart_properties)
+    })
+    return data
+
+def read_nodes(nodes):
+    """
+    Converts a JSON object of type "node": [value, "parent"] into a dictionary of type "node": (value, "parent").
+    """
+    converted = {}
+    for name, entry in nodes.items():
+        if not (isinstance(entry, list) and len(entry) == 2):
+            raise PayloadError("Invalid entry for node '{}', expecting [value, parent]".format(name))
+        value, parent = entry
+        if not (value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))):
+            raise PayloadError("Invalid value for node '{}'".format(name))
+        if not (parent is None or isinstance(parent, str)):
+            raise PayloadError("Invalid parent for node '{}'".format(name))
+        converted[name] = (value, parent)
+    return converted
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the endpoints of the RenderService stored on the server.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self.__respond(200, "text/plain; version=0.0.4", self.server.service.metrics().encode("utf-8"))
+        elif path == "/health":
+            self.__respond(200, "text/plain", b"ok\n")
+        else:
+            self.__respond(404, "text/plain", b"Not found\n")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.__respond(404, "text/plain", b"Not found\n")
+            return
+        service = self.server.service
+        start = time.perf_counter()
+        chart_type = "unknown"
+        status = 500
+        if not service.acquire_slot():
+            status = 503
+            self.__respond(status, "text/plain", b"Too many requests, retry later\n", {"Retry-After": "1"})
+            return
+        headers = None
+        future = None
+        try:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                status = 400
+                # the end of the body is unknown, so the connection can not be reused
+                self.close_connection = True
+                content_type, body, headers = "text/plain", b"Invalid Content-Length\n", {"Connection": "close"}
+            elif length > MAX_BODY_BYTES:
+                status = 413
+                # the body is not read, so the connection can not be reused
+                self.close_connection = True
+                content_type, body, headers = "text/plain", b"Payload too large\n", {"Connection": "close"}
+            else:
+                body = self.rfile.read(length)
+                content_type = self.headers.get("Content-Type", "text/csv").split(";")[0].strip()
+                payload = read_payload(content_type, body, url.query)
+                chart_type = payload["chart_type"]
+                future = service.submit(payload)
+                body = future.result(timeout=service.request_timeout)
+                status = 200
+                content_type = CONTENT_TYPES[payload["format"]]
+        except (PayloadError, ParseError) as e:
+            status = 400
+            content_type, body = "text/plain", (e.message + "\n").encode("utf-8")
+        except FutureTimeoutError:
+            # a render still waiting for a worker is dropped, a running one keeps its slot until it ends
+            future.cancel()
+            status = 504
+            content_type, body = "text/plain", b"Rendering timed out\n"
+        except (KeyError, ValueError) as e:
+            # unknown parents, colormaps or invalid chart properties
+            status = 400
+            content_type, body = "text/plain", (str(e) + "\n").encode("utf-8")
+        except (ArithmeticError, TypeError, IndexError) as e:
+            # hierarchies the charts can not lay out, like one without any value, or chart properties of the
+            # wrong type. The type is part of the message, "float division by zero" alone does not say much
+            status = 400
+            content_type, body = "text/plain", "{}: {}\n".format(type(e).__name__, e).encode("utf-8")
+        except Exception:
+            status = 500
+            content_type, body = "text/plain", b"Rendering failed\n"
+        finally:
+            if future is None:
+                service.release_slot()
+            service.latency.observe((("chart_type", chart_type), ("status", str(status))), time.perf_counter() - start)
+        # the metrics are complete before the client sees the response
+        self.__respond(status, content_type, body, headers)
+
+    def log_message(self, format, *args):
+        # keep the output of the tests and the server quiet, the metrics hold the request statistics
+        pass
+
+    def __respond(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Serve chart rendering over HTTP on the local machine.")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    arg_parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    arg_parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                            help="number of render processes (default: number of CPUs)")
+    arg_parser.add_argument("--queue-size", type=int, default=16,
+                            help="requests waiting for a worker before new ones get 503 (default: 16)")
+    args = arg_parser.parse_args(argv)
+    service = RenderService(args.host, args.port, args.workers, args.queue_size)
+    print("Warming up {} workers".format(args.workers))
+    service.start()
+    print("Serving on {}".format(service.url))
+    service.serve_forever()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+class ResultCache:
+    """
+    A thread safe in-memory LRU cache bounded by the total size of its entries.
+
+    Every entry is stored with its size in bytes, given by the caller because only the caller knows how
+    to estimate it. The least recently used entries are removed when the total grows over max_bytes, an
+    entry larger than max_bytes is not stored at all.
+
+    Attributes
+    ----------
+    max_bytes: upper limit of the total size of all the entries
+    hits, misses, evictions: counters of the lookups and the removed entries
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # type: OrderedDict[object, tuple[object, int]]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """
+        Returns the value stored under the key and marks it as the most recently used, None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Stores a value, replacing the value stored under the same key, and evicts the least recently used
+        entries until the cache fits into max_bytes again.
+
+        Parameters
+        ----------
+        key: hashable key
+        value: the cached object
+        size: estimated size of the value in bytes
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._total_bytes -= old_entry[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Returns the counters and the current size of the cache.
+
+        Returns
+        -------
+        dict with hits, misses, evictions, entries and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes
+            }
@@ -0,0 +1,75 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from batch_render import collect_inputs, main, render_file
+
+class TestBatchRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.tmp_dir, "out")
+        self.chart_properties = {
+            "title": "",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 8,
+            "colormap": "Blues"
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_summary(self):
+        with open(os.path.join(self.output_dir, "summary.csv"), newline="") as summary_file:
+            return list(csv.DictReader(summary_file))
+
+    def test_render_file(self):
+        os.makedirs(self.output_dir)
+        rows = render_file("sample-data-2.csv", ["Treemap", "Sunburst"], self.output_dir, "svg", self.chart_properties)
+        self.assertEqual([row["status"] for row in rows], ["ok", "ok"])
+        self.assertEqual(rows[0]["nodes"], 14)
+        for row in rows:
+            self.assertTrue(os.path.isfile(row["output"]))
+            self.assertTrue(row["output"].endswith(".svg"))
+
+    def test_render_file_error(self):
+        rows = render_file("tests/fixtures/test_invalid_row.csv", ["Icicle"], self.output_dir, "png", self.chart_properties)
+        self.assertEqual(rows[0]["status"], "error")
+        self.assertEqual(rows[0]["error"], "Invalid entry: Line 4")
+
+    def test_render_file_chart_error(self):
+        # every value is zero, the charts can not divide the space
+        rows = render_file("tests/fixtures/test_zero_values.csv", ["Treemap", "Sunburst"], self.output_dir, "png", self.chart_properties)
+        self.assertEqual([row["status"] for row in rows], ["error", "error"])
+        self.assertTrue(rows[0]["error"].startswith("ZeroDivisionError"))
+        self.assertEqual(rows[0]["nodes"], 3)
+
+    def test_main_chart_error(self):
+        inputs = ["tests/fixtures/test_zero_values.csv", "sample-data-2.csv"]
+        status = main(inputs + ["-c", "Sunburst", "-o", self.output_dir, "-w", "2"])
+        self.assertEqual(status, 1)
+        self.assertEqual([row["status"] for row in self.read_summary()], ["error", "ok"])
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, "sample-data-2.sunburst.png")))
+
+    def test_main(self):
+        inputs = ["sample-data-2.csv", "sample-data-3.csv", "tests/fixtures/test_invalid_row.csv"]
+        status = main(inputs + ["-c", "Treemap", "Icicle", "-o", self.output_dir, "-w", "2"])
+        self.assertEqual(status, 1)
+        rows = self.read_summary()
+        self.assertEqual([(row["input"], row["chart_type"]) for row in rows], [
+            (input_path, chart_type) for input_path in inputs for chart_type in ("Treemap", "Icicle")
+        ])
+        self.assertEqual([row["status"] for row in rows], ["ok"] * 4 + ["error"] * 2)
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, "sample-data-3.icicle.png")))
+
+    def test_collect_inputs(self):
+        for name in ("b.csv", "a.csv", "notes.txt"):
+            open(os.path.join(self.tmp_dir, name), "w").close()
+        self.assertEqual(collect_inputs([self.tmp_dir, "sample-data-2.csv"]), [
+            os.path.join(self.tmp_dir, "a.csv"), os.path.join(self.tmp_dir, "b.csv"), "sample-data-2.csv"
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
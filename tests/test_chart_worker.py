@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from chart_worker import ChartWorker
+from hierarchy_cache import HierarchyCache
+from input_parser import Parser
+from result_cache import ResultCache
+from matplotlib.figure import Figure
+from utils.node_table import NodeTable
+
+class FakeRoot:
+    """
+    Stands in for the Tk root, the scheduled callbacks are run by run_pending.
+    """
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def run_pending(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for callback in scheduled:
+            callback()
+
+class TestChartWorker(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = FakeRoot()
+        self.worker = ChartWorker(self.root, HierarchyCache(os.path.join(self.tmp_dir, "cache")))
+        self.chart_properties = {
+            "title": "",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 8,
+            "colormap": "Blues"
+        }
+        self.progress = []
+        self.results = []
+        self.errors = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def start(self, chart_type, file_name):
+        self.worker.start(
+            chart_type, file_name, self.chart_properties,
+            on_progress=self.progress.append,
+            on_done=lambda *result: self.results.append(result),
+            on_error=self.errors.append
+        )
+
+    def finish(self):
+        self.worker.thread.join(10)
+        deadline = time.time() + 10
+        while self.root.scheduled and time.time() < deadline:
+            self.root.run_pending()
+
+    def test_generate(self):
+        self.start("Sunburst", "tests/fixtures/test_valid_data_1.csv")
+        self.finish()
+        self.assertEqual(self.errors, [])
+        self.assertEqual(len(self.results), 1)
+        nodes, chart_generator, figure = self.results[0]
+        self.assertEqual(nodes.root_key(), "Countries")
+        self.assertEqual(chart_generator.chart_type, "Sunburst")
+        self.assertTrue(isinstance(figure, Figure))
+        self.assertTrue(any(message.startswith("Parsing") for message in self.progress))
+        self.assertFalse(self.worker.is_running())
+
+    def test_error(self):
+        self.start("Treemap", "tests/fixtures/test_invalid_row.csv")
+        self.finish()
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.errors[0].startswith("Invalid entry"))
+
+    def test_chart_error(self):
+        # the sunburst of a hierarchy without any value divides by zero
+        self.start("Sunburst", "tests/fixtures/test_zero_values.csv")
+        self.finish()
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.errors[0].startswith("Could not draw the sunburst"))
+        self.assertFalse(self.worker.is_running())
+        self.assertEqual(self.root.scheduled, [])
+
+    def test_cached_chart_is_not_restyled_by_the_worker(self):
+        self.worker.layout_cache = ResultCache()
+        self.start("Icicle", "tests/fixtures/test_valid_data_1.csv")
+        self.finish()
+        chart = self.results[0][1].chart
+        self.chart_properties = dict(self.chart_properties, colormap="Greens", chart_font_size=12)
+        self.start("Icicle", "tests/fixtures/test_valid_data_1.csv")
+        self.finish()
+        chart_generator = self.results[1][1]
+        # the cached chart may be on the canvas, only the Tk thread restyles it
+        self.assertIs(chart_generator.chart, chart)
+        self.assertEqual(chart.chart_properties["colormap"], "Blues")
+        chart_generator.restyle_chart(dict(self.chart_properties))
+        self.assertEqual(chart.chart_properties["colormap"], "Greens")
+
+    def start_focus(self, chart_type, focus):
+        with open("tests/fixtures/test_valid_data_1.csv") as file_obj:
+            nodes = NodeTable.from_dict(Parser().parse_stream(file_obj))
+        self.worker.start_focus(
+            chart_type, nodes, self.chart_properties, focus,
+            on_progress=self.progress.append,
+            on_done=lambda *result: self.results.append(result),
+            on_error=self.errors.append
+        )
+
+    def test_focus(self):
+        self.start_focus("Icicle", "Europe")
+        self.finish()
+        self.assertEqual(self.errors, [])
+        chart_generator = self.results[0][1]
+        self.assertEqual(chart_generator.chart.table.root_key(), "Europe")
+        self.assertEqual(len(chart_generator.chart.table), 6)
+        self.assertEqual(self.progress, ["Drawing the icicle"])
+
+    def test_focus_unknown_node(self):
+        self.start_focus("Treemap", "Atlantis")
+        self.finish()
+        self.assertEqual(self.results, [])
+        self.assertEqual(self.errors, ["Unknown node 'Atlantis'"])
+
+    def test_cancel(self):
+        self.start("Treemap", "tests/fixtures/test_valid_data_1.csv")
+        self.worker.cancel()
+        self.finish()
+        self.assertEqual(self.results, [])
+        self.assertEqual(self.errors, [])
+
+    def test_restart_drops_the_earlier_job(self):
+        self.start("Treemap", "tests/fixtures/test_valid_data_1.csv")
+        first_thread = self.worker.thread
+        self.start("Icicle", "tests/fixtures/test_valid_data_1.csv")
+        first_thread.join(10)
+        self.finish()
+        self.assertEqual(len(self.results), 1)
+        self.assertEqual(self.results[0][1].chart_type, "Icicle")
+
+if __name__ == "__main__":
+    unittest.main()
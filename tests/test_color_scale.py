@@ -0,0 +1,42 @@
+import unittest
+import matplotlib as mpl
+import numpy as np
+from chart import color_scale
+
+class TestColorScale(unittest.TestCase):
+    def test_lookup_table(self):
+        table = color_scale.lookup_table("Blues")
+        colormap = mpl.colormaps["Blues"]
+        self.assertEqual(table.shape, (colormap.N + 3, 4))
+        np.testing.assert_array_equal(table[-1], colormap.get_bad())
+        self.assertIs(color_scale.lookup_table("Blues"), table)
+        self.assertFalse(table.flags.writeable)
+
+    def test_colors_match_colormap(self):
+        values = np.r_[np.linspace(-0.5, 1.5, 1001), 1.0, 0.0, np.nan]
+        for name in ("Blues", "viridis"):
+            np.testing.assert_array_equal(
+                color_scale.colors(values, name, vmin=0, vmax=1),
+                mpl.colormaps[name](values)
+            )
+
+    def test_low_high(self):
+        values = np.array([2.0, 4.0, 6.0, np.nan])
+        colors = color_scale.colors(values, "Blues", low=0.4, high=0.9)
+        np.testing.assert_array_equal(colors, mpl.colormaps["Blues"](np.array([0.4, 0.65, 0.9, np.nan])))
+
+    def test_normalize_linear(self):
+        np.testing.assert_allclose(color_scale.normalize([1, 2, 3, np.nan]), [0, 0.5, 1, np.nan])
+        np.testing.assert_allclose(color_scale.normalize([1, 2, 3], vmin=0, vmax=4), [0.25, 0.5, 0.75])
+        np.testing.assert_array_equal(color_scale.normalize([5, 5]), [0, 0])
+
+    def test_normalize_log(self):
+        np.testing.assert_allclose(color_scale.normalize([1, 10, 100, 0, -1], "log"), [0, 0.5, 1, np.nan, np.nan])
+
+    def test_normalize_quantile(self):
+        np.testing.assert_allclose(color_scale.normalize([10, 1, 1000, 1, np.nan], "quantile"), [2 / 3, 1 / 6, 1, 1 / 6, np.nan])
+        np.testing.assert_array_equal(color_scale.normalize([7, np.nan], "quantile"), [0, np.nan])
+
+    def test_unknown_normalization(self):
+        with self.assertRaises(ValueError):
+            color_scale.normalize([1, 2], "sqrt")
@@ -0,0 +1,56 @@
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+from chart_generator import ChartGenerator
+
+CHART_TYPES = ("Treemap", "Sunburst", "Icicle")
+THREAD_COUNT = 8
+
+class TestConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "Countries": (None, None),
+            "Asia": (None, "Countries"),
+            "India": (None, "Asia"),
+            "Chennai": (380, "India"),
+            "Mumbai": (200, "India"),
+            "Sri Lanka": (None, "Asia"),
+            "Colombo": (280, "Sri Lanka"),
+            "Europe": (None, "Countries"),
+            "Germany": (128, "Europe"),
+            "Italy": (None, "Europe"),
+            "Rome": (82, "Italy"),
+            "Venice": (110, "Italy")
+        }
+        self.chart_properties = {
+            "title": "Cities",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 8,
+            "colormap": "Blues"
+        }
+
+    def render(self, chart_type):
+        figure = ChartGenerator().generate_chart(chart_type, self.data, self.chart_properties)
+        image = io.BytesIO()
+        figure.savefig(image, format="png")
+        return image.getvalue()
+
+    def test_render_from_threads(self):
+        figure_numbers = plt.get_fignums()
+        expected = {chart_type: self.render(chart_type) for chart_type in CHART_TYPES}
+
+        chart_types = [chart_type for chart_type in CHART_TYPES for _ in range(THREAD_COUNT)]
+        with ThreadPoolExecutor(max_workers=THREAD_COUNT) as executor:
+            images = list(executor.map(self.render, chart_types))
+
+        for chart_type, image in zip(chart_types, images):
+            self.assertEqual(image, expected[chart_type], "{} rendered differently in a thread".format(chart_type))
+        # the charts must not register any figure with pyplot
+        self.assertEqual(plt.get_fignums(), figure_numbers)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from hierarchy_cache import HierarchyCache
+from input_parser import Parser
+from utils.node_table import NodeTable
+
+class TestHierarchyCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = HierarchyCache(os.path.join(self.tmp_dir, "cache"))
+        self.path = os.path.join(self.tmp_dir, "data.csv")
+        shutil.copy("sample-data-2.csv", self.path)
+        with open(self.path, "r") as file_obj:
+            self.table = NodeTable.from_dict(Parser().parse_stream(file_obj))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_store_and_load(self):
+        self.assertTrue(self.cache.store(self.path, self.table))
+        cached = self.cache.load(self.path)
+        self.assertTrue(isinstance(cached.parent, np.memmap))
+        self.assertEqual(list(cached.names), self.table.names)
+        self.assertEqual(cached.to_dict(), self.table.to_dict())
+        self.assertEqual(cached.depth.tolist(), self.table.depth.tolist())
+
+    def test_modified_file_misses(self):
+        self.cache.store(self.path, self.table)
+        with open(self.path, "a") as file_obj:
+            file_obj.write("Countries.Oceania,\n")
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_lru_eviction(self):
+        other_path = os.path.join(self.tmp_dir, "other.csv")
+        shutil.copy("sample-data-3.csv", other_path)
+        self.cache.store(self.path, self.table)
+        self.cache.store(other_path, self.table)
+        entry_size = self.cache.entries()[0][2]
+        first_dir = os.path.join(self.cache.cache_dir, self.cache.fingerprint(self.path))
+        second_dir = os.path.join(self.cache.cache_dir, self.cache.fingerprint(other_path))
+        os.utime(first_dir, ns=(1, 1))
+        os.utime(second_dir, ns=(2, 2))
+
+        # using the first entry makes the second one the least recently used
+        self.assertIsNotNone(self.cache.load(self.path))
+        self.cache.max_bytes = entry_size
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.load(self.path))
+        self.assertIsNone(self.cache.load(other_path))
+
+if __name__ == "__main__":
+    unittest.main()
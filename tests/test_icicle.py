@@ -1,4 +1,6 @@
 import unittest
+import matplotlib as mpl
+import numpy as np
 from chart.icicle import Icicle
 from matplotlib.figure import Figure
 
@@ -16,8 +18,46 @@ class TestIciclemap(unittest.TestCase):
     def test_get_figure(self):
         self.assertTrue(isinstance(self.icicle.get_figure(), Figure))
 
-    def test_calculate_color(self):
-        self.assertEqual(self.icicle._Icicle__calculate_color(1280), 'white', "Should equal to white")
+    def test_node_at(self):
+        self.assertEqual(self.icicle.node_at(0.5, 10), "Documents")
+        self.assertEqual(self.icicle.node_at(2, 15), "School")
+        self.assertEqual(self.icicle.node_at(3.5, 5), "CV")
+        self.assertEqual(self.icicle.node_at(10, 10), None)
+
+    def test_restyle(self):
+        paths = self.icicle.collection.get_paths()
+        chart_properties = {
+            "title": "Files",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 12,
+            "colormap": "Blues"
+        }
+        self.icicle.restyle(chart_properties)
+        self.assertEqual(self.icicle.collection.get_paths(), paths)
+        self.assertEqual(len(self.icicle.collection.get_facecolor()), 5)
+        self.assertEqual([label.get_fontsize() for label in self.icicle.labels], [12] * 5)
+        self.assertIn("Files", [text.get_text() for text in self.icicle.get_figure().texts])
+
+    def test_color_scale(self):
+        chart_properties = {
+            "title": "",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 12,
+            "colormap": "Blues"
+        }
+        self.icicle.restyle(chart_properties)
+        linear = self.icicle.collection.get_facecolor().copy()
+        self.icicle.restyle(dict(chart_properties, color_scale="quantile"))
+        quantile = self.icicle.collection.get_facecolor()
+        self.assertEqual(len(quantile), 5)
+        self.assertFalse((linear == quantile).all())
+
+    def test_calculate_colors(self):
+        self.assertEqual(self.icicle._Icicle__calculate_colors(), 'white', "Should equal to white")
 
     def test_duplicate_object(self):
         data = {
@@ -30,20 +70,43 @@ class TestIciclemap(unittest.TestCase):
         dup_data = self.icicle._Icicle__duplicate_object(data)
         self.assertEqual(dup_data,data)
 
-    def test_calculate_color_middle_value(self):
-        self.min = 100
-        self.max = 500
-        self.assertEqual(self.icicle._Icicle__calculate_index(0.9,0.4,200), 0.65, "Should equal to 0.65")
+    def test_convert_data(self):
+        icicle = Icicle({
+            "Documents": (None, None),
+            "School": (None, "Documents"),
+            "Assignment": (100, "School"),
+            "Personal": (None, "Documents"),
+            "CV": (200, "Personal"),
+            "Photo": (40, "Personal")
+        })
+        self.assertEqual(icicle._max, 340)
+        self.assertEqual(icicle._min, 40)
+        self.assertEqual(icicle.data_set["Documents"][0], 340)
+        self.assertEqual(icicle.data_set["Personal"][0], 240)
+        self.assertEqual(icicle.data_set["Photo"][0], 40)
 
-    def test_calculate_color_min_value(self):
-        self.min = 100
-        self.max = 500
-        self.assertEqual(self.icicle._Icicle__calculate_index(0.9, 0.4, 100), 0.4, "Should equal to 0.4")
+    def test_calculate_rectangles(self):
+        expected_rectangles = [
+            [0, 0, 1.5, 20],
+            [1.5, 20 - 20 / 3, 1.5, 20 / 3],
+            [3, 20 - 20 / 3, 1.5, 20 / 3],
+            [1.5, 0, 1.5, 40 / 3],
+            [3, 0, 1.5, 40 / 3]
+        ]
+        for rectangle, expected_rectangle in zip(self.icicle.rectangles.tolist(), expected_rectangles):
+            for value, expected_value in zip(rectangle, expected_rectangle):
+                self.assertAlmostEqual(value, expected_value)
+        self.assertEqual(len(self.icicle.ax.collections), 1)
 
-    def test_calculate_color_max_value(self):
-        self.min = 100
-        self.max = 500
-        self.assertEqual(self.icicle._Icicle__calculate_index(0.9, 0.4, 500), 1.4, "Should equal to 0.9")
+    def test_calculate_colors_colormap(self):
+        self.icicle.chart_properties["colormap"] = "Blues"
+        colors = self.icicle._Icicle__calculate_colors()
+        colormap = mpl.colormaps["Blues"]
+        self.assertEqual(len(colors), 5)
+        # Documents has the largest value, 300, and School the smallest, 100
+        np.testing.assert_allclose(colors[0], colormap(0.9))
+        np.testing.assert_allclose(colors[1], colormap(0.4))
+        np.testing.assert_allclose(colors[3], colormap(0.65))
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import numpy as np
+from matplotlib.figure import Figure
+from chart_generator import ChartGenerator
+from utils.node_table import NodeTable
+from utils.utils import get_root_node_key
+
+class TestNodeTable(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "Documents": (None, None),
+            "School": (None, "Documents"),
+            "Assignment": (100, "School"),
+            "Personal": (None, "Documents"),
+            "CV": (200, "Personal"),
+            "Photo": (50, "Personal")
+        }
+        self.table = NodeTable.from_dict(self.data)
+
+    def test_columns(self):
+        self.assertEqual(self.table.names, ["Documents", "School", "Assignment", "Personal", "CV", "Photo"])
+        self.assertEqual(self.table.parent.dtype, np.int32)
+        self.assertEqual(self.table.value.dtype, np.float64)
+        self.assertEqual(self.table.depth.dtype, np.int16)
+        self.assertEqual(self.table.parent.tolist(), [-1, 0, 1, 0, 3, 3])
+        self.assertEqual(self.table.depth.tolist(), [0, 1, 2, 1, 2, 2])
+        self.assertTrue(np.isnan(self.table.value[0]))
+
+    def test_to_dict(self):
+        self.assertEqual(self.table.to_dict(), self.data)
+
+    def test_children_before_parents(self):
+        data = {"CV": (200, "Personal"), "Personal": (None, "Documents"), "Documents": (None, None)}
+        table = NodeTable.from_dict(data)
+        self.assertEqual(table.depth.tolist(), [2, 1, 0])
+        self.assertEqual(table.root_key(), "Documents")
+
+    def test_unknown_parent(self):
+        self.assertRaises(ValueError, NodeTable.from_dict, {"A": (None, None), "B": (1, "C")})
+
+    def test_children(self):
+        order, offsets = self.table.children()
+        personal = self.table.index["Personal"]
+        children = order[offsets[personal]:offsets[personal + 1]]
+        self.assertEqual([self.table.names[i] for i in children], ["CV", "Photo"])
+        self.assertEqual(offsets[2], offsets[3])
+
+    def test_levels(self):
+        order, offsets = self.table.levels()
+        self.assertEqual(offsets.tolist(), [0, 1, 3, 6])
+        self.assertEqual([self.table.names[i] for i in order[offsets[2]:offsets[3]]], ["Assignment", "CV", "Photo"])
+
+    def test_chain(self):
+        data = {"n0": (None, None)}
+        for i in range(1, 5000):
+            data["n{}".format(i)] = (1, "n{}".format(i - 1))
+        table = NodeTable.from_dict(data)
+        self.assertEqual(table.depth[-1], 4999)
+        self.assertEqual(table.subtree_sums()[0], 4999)
+        self.assertEqual(len(table.subtree(2)), 4998)
+
+    def test_cycle(self):
+        self.assertRaises(ValueError, NodeTable.from_dict, {"A": (None, None), "B": (1, "C"), "C": (1, "B")})
+
+    def test_subtree_sums(self):
+        self.assertEqual(self.table.subtree_sums().tolist(), [350, 100, 100, 250, 200, 50])
+
+    def test_get_root_node_key(self):
+        self.assertEqual(get_root_node_key(self.table), "Documents")
+
+    def test_fingerprint(self):
+        self.assertEqual(self.table.fingerprint(), NodeTable.from_dict(dict(self.data)).fingerprint())
+        changed = dict(self.data, Photo=(51, "Personal"))
+        self.assertNotEqual(self.table.fingerprint(), NodeTable.from_dict(changed).fingerprint())
+        renamed = {("Resume" if name == "CV" else name): node for name, node in self.data.items()}
+        self.assertNotEqual(self.table.fingerprint(), NodeTable.from_dict(renamed).fingerprint())
+
+    def test_ancestors(self):
+        self.assertEqual(self.table.ancestors(4), [0, 3, 4])
+        self.assertEqual(self.table.ancestors(0), [0])
+
+    def test_subtree(self):
+        subtree = self.table.subtree(3)
+        self.assertEqual(subtree.to_dict(), {"Personal": (None, None), "CV": (200, "Personal"), "Photo": (50, "Personal")})
+        self.assertEqual(subtree.depth.tolist(), [0, 1, 1])
+        self.assertIs(self.table.subtree(0), self.table)
+
+    def test_reduce_min_share(self):
+        # Assignment (100) is the only small child of Documents, so nothing is merged there
+        self.assertIs(self.table.reduce(min_share=0.1), self.table)
+        reduced = self.table.reduce(min_share=0.7)
+        self.assertEqual(reduced.to_dict(), {
+            "Documents": (None, None),
+            "School": (None, "Documents"),
+            "Assignment": (100, "School"),
+            "Personal": (None, "Documents"),
+            "Other": (250, "Personal")
+        })
+        self.assertEqual(reduced.depth.tolist(), [0, 1, 2, 1, 2])
+        self.assertEqual(reduced.subtree_sums()[0], self.table.subtree_sums()[0])
+
+    def test_reduce_max_children(self):
+        # the kept node named Other makes the merged node take the name of its parent
+        data = dict(self.data, Other=(1000, "Documents"))
+        reduced = NodeTable.from_dict(data).reduce(max_children=1)
+        self.assertEqual(reduced.to_dict(), {
+            "Documents": (None, None),
+            "Other": (1000, "Documents"),
+            "Other (Documents)": (350, "Documents")
+        })
+
+    def test_reduce_max_depth(self):
+        reduced = self.table.reduce(max_depth=1)
+        self.assertEqual(reduced.to_dict(), {
+            "Documents": (None, None),
+            "School": (100, "Documents"),
+            "Personal": (250, "Documents")
+        })
+
+    def test_generate_chart_from_table(self):
+        chart_generator = ChartGenerator()
+        for chart_type in ["Treemap", "Icicle", "Sunburst"]:
+            self.assertTrue(isinstance(chart_generator.generate_chart(chart_type, self.table), Figure))
+
+    def test_charts_keep_the_table(self):
+        chart_generator = ChartGenerator(detail_limits=None)
+        for chart_type in ["Treemap", "Sunburst"]:
+            chart_generator.generate_chart(chart_type, self.table)
+            self.assertIs(chart_generator.chart.table, self.table)
+            # the dictionary form of the data is not created
+            self.assertIsNone(chart_generator.chart._data)
+
+if __name__ == "__main__":
+    unittest.main()
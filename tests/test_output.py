@@ -0,0 +1,90 @@
+import unittest
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from chart.icicle import Icicle
+from chart.treemap import Treemap
+from ui.output import Output
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.clicked = []
+        self.breadcrumbs = []
+        # the widgets of the output panel need a display, so it is wired to an Agg canvas instead
+        self.output = Output.__new__(Output)
+        self.output.on_node_click = self.clicked.append
+        self.output.on_breadcrumb = self.breadcrumbs.append
+        self.output.chart = None
+        self.output._connections = []
+        self.output.figure_canvas = FigureCanvasAgg(Figure(figsize=(8, 6), dpi=100))
+        self.output._Output__connect_events()
+
+        self.chart = Icicle({
+            "Documents": (None, None),
+            "School": (None, "Documents"),
+            "Assignment": (100, "School"),
+            "Personal": (None, "Documents"),
+            "CV": (200, "Personal")
+        })
+
+    def click(self, canvas, x, y, button=1):
+        """
+        Sends a mouse press at the data coordinates of the chart through the callbacks of the canvas.
+        """
+        x, y = canvas.figure.axes[0].transData.transform((x, y))
+        canvas.callbacks.process("button_press_event", MouseEvent("button_press_event", canvas, x, y, button=button))
+
+    def test_click(self):
+        self.output.chart = self.chart
+        self.output._Output__replace_figure(self.chart.get_figure())
+        canvas = self.output.figure_canvas
+        self.click(canvas, 3.5, 5)
+        self.click(canvas, 3.5, 5, button=3)
+        self.assertEqual(self.clicked, ["CV"])
+
+    def test_click_outside_nodes(self):
+        self.output.chart = self.chart
+        self.output._Output__replace_figure(self.chart.get_figure())
+        self.output._Output__on_click(MouseEvent("button_press_event", self.output.figure_canvas, -10, -10, button=1))
+        self.click(self.output.figure_canvas, 10, 10)
+        self.assertEqual(self.clicked, [])
+
+    def test_events_move_to_the_new_figure(self):
+        self.output.chart = self.chart
+        self.output._Output__replace_figure(self.chart.get_figure())
+        other_chart = Icicle(dict(self.chart.data))
+        self.output.chart = other_chart
+        self.output._Output__replace_figure(other_chart.get_figure())
+        self.assertIs(self.output.figure_canvas.figure, other_chart.get_figure())
+        self.assertEqual(len(self.output._connections), 3)
+        # the handlers of the replaced figure are gone, a click on it reaches nothing
+        self.click(FigureCanvasAgg(self.chart.get_figure()), 3.5, 5)
+        self.assertEqual(self.clicked, [])
+        self.click(self.output.figure_canvas, 3.5, 5)
+        self.assertEqual(self.clicked, ["CV"])
+
+    def test_labels_fitted_to_the_canvas(self):
+        chart_properties = {
+            "title": "",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 40,
+            "colormap": "Blues"
+        }
+        treemap = Treemap(dict(self.chart.data), chart_properties)
+        emitted = treemap.labels_emitted
+        self.output.figure_canvas = FigureCanvasAgg(Figure(figsize=(24, 18), dpi=100))
+        self.output.chart = treemap
+        self.output._Output__replace_figure(treemap.get_figure())
+        self.assertEqual(tuple(treemap.get_figure().bbox.size), (2400, 1800))
+        self.assertGreater(treemap.labels_emitted, emitted)
+
+    def test_breadcrumb_clicked(self):
+        self.output._Output__breadcrumb_clicked(1)
+        self.output.on_breadcrumb = None
+        self.output._Output__breadcrumb_clicked(0)
+        self.assertEqual(self.breadcrumbs, [1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from input_parser import Parser
 from exceptions import ParseError
@@ -27,6 +29,69 @@ class TestParser(unittest.TestCase):
         self.assertTrue(ParseError, self.parser.parse(file_obj))
         file_obj.close()
 
+    @parameterized.expand([
+        ("tests/fixtures/test_invalid_col_names.csv", "Invalid first line: Line 1"),
+        ("tests/fixtures/test_invalid_num_of_cols.csv", "Invalid entry: Line 2"),
+        ("tests/fixtures/test_duplicate_rows.csv", "Invalid entry: Line 4"),
+        ("tests/fixtures/test_invalid_row.csv", "Invalid entry: Line 4")
+    ])
+    def test_stream_invalid_data_files(self, path, message):
+        with open(path, "r") as file_obj:
+            with self.assertRaises(ParseError) as context:
+                self.parser.parse_stream(file_obj, chunk_size=2)
+        self.assertEqual(context.exception.message, message)
+
+    def test_stream_matches_parse(self):
+        with open("sample-data-2.csv", "r") as file_obj:
+            expected = self.parser.parse(file_obj)
+        with open("sample-data-2.csv", "r") as file_obj:
+            nodes = Parser().parse_stream(file_obj, chunk_size=3)
+        self.assertEqual(nodes, expected)
+        self.assertEqual(list(nodes.keys()), list(expected.keys()))
+
+    @parameterized.expand([
+        ("tests/fixtures/test_invalid_col_names.csv", "Invalid first line: Line 1"),
+        ("tests/fixtures/test_invalid_num_of_cols.csv", "Invalid entry: Line 2"),
+        ("tests/fixtures/test_duplicate_rows.csv", "Invalid entry: Line 4"),
+        ("tests/fixtures/test_invalid_row.csv", "Invalid entry: Line 4")
+    ])
+    def test_parallel_invalid_data_files(self, path, message):
+        with self.assertRaises(ParseError) as context:
+            self.parser.parse_parallel(path, workers=2, min_shard_bytes=8)
+        self.assertEqual(context.exception.message, message)
+
+    def test_parallel_matches_parse(self):
+        with open("sample-data-2.csv", "r") as file_obj:
+            expected = self.parser.parse(file_obj)
+        for workers in [1, 3]:
+            parser = Parser()
+            nodes = parser.parse_parallel("sample-data-2.csv", workers=workers, min_shard_bytes=16)
+            self.assertEqual(list(nodes.items()), list(expected.items()))
+            self.assertEqual(parser.stats.rows, len(expected))
+
+    def test_parallel_error_line_in_later_shard(self):
+        with open("sample-data-2.csv", "r") as file_obj:
+            lines = file_obj.read().splitlines()
+        lines.insert(12, "Countries.Nowhere.Town,5")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            with open(path, "w") as file_obj:
+                file_obj.write("\n".join(lines) + "\n")
+            with self.assertRaises(ParseError) as context:
+                self.parser.parse_parallel(path, workers=4, min_shard_bytes=16)
+        self.assertEqual(context.exception.message, "Invalid entry: Line 13")
+
+    def test_stream_stats(self):
+        chunks = []
+        parser = Parser()
+        with open("tests/fixtures/test_valid_data_1.csv", "r") as file_obj:
+            nodes = parser.parse_stream(file_obj, chunk_size=5, measure_memory=True, on_chunk=chunks.append)
+        self.assertEqual(parser.nodes, {})
+        self.assertEqual(parser.stats.rows, len(nodes))
+        self.assertGreater(parser.stats.rows_per_second, 0)
+        self.assertGreater(parser.stats.peak_bytes, 0)
+        self.assertEqual(chunks[-1], len(nodes))
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,138 @@
+import http.client
+import json
+import time
+import unittest
+from urllib.parse import quote
+from render_server import REQUEST_TIMEOUT, LatencyHistogram, RenderService
+
+class TestRenderServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = RenderService(port=0, workers=1, queue_size=1)
+        cls.service.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.stop()
+
+    def request(self, method, path, body=None, headers={}):
+        connection = http.client.HTTPConnection("127.0.0.1", self.service.port, timeout=60)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.getheader("Content-Type"), response.read()
+        finally:
+            connection.close()
+
+    def test_render_csv(self):
+        with open("sample-data-2.csv", "rb") as file_obj:
+            body = file_obj.read()
+        chart_properties = quote(json.dumps({"title": "Cities", "colormap": "Greens"}))
+        status, content_type, image = self.request(
+            "POST", "/render?chart_type=Sunburst&chart_properties=" + chart_properties, body, {"Content-Type": "text/csv"}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(content_type, "image/png")
+        self.assertTrue(image.startswith(b"\x89PNG"))
+
+    def test_render_json_nodes(self):
+        body = json.dumps({
+            "chart_type": "Icicle",
+            "format": "svg",
+            "nodes": {"Root": [None, None], "A": [3, "Root"], "B": [4, "Root"]}
+        })
+        status, content_type, image = self.request("POST", "/render", body, {"Content-Type": "application/json"})
+        self.assertEqual(status, 200)
+        self.assertEqual(content_type, "image/svg+xml")
+        self.assertIn(b"<svg", image)
+
+    def test_invalid_payloads(self):
+        with open("tests/fixtures/test_invalid_row.csv", "rb") as file_obj:
+            status, _, message = self.request("POST", "/render", file_obj.read(), {"Content-Type": "text/csv"})
+        self.assertEqual((status, message), (400, b"Invalid entry: Line 4\n"))
+        status, _, _ = self.request("POST", "/render", json.dumps({"nodes": {"A": [1, "Missing"]}}), {"Content-Type": "application/json"})
+        self.assertEqual(status, 400)
+        status, _, _ = self.request("POST", "/render?chart_type=Pie", b"name,value\n", {"Content-Type": "text/csv"})
+        self.assertEqual(status, 400)
+        status, _, _ = self.request("GET", "/unknown")
+        self.assertEqual(status, 404)
+
+    def test_degenerate_payloads(self):
+        body = json.dumps({"nodes": {"Root": [None, None], "A": [0, "Root"], "B": [0, "Root"]}})
+        status, _, message = self.request("POST", "/render", body, {"Content-Type": "application/json"})
+        self.assertEqual((status, message), (400, b"ZeroDivisionError: float division by zero\n"))
+        body = json.dumps({"chart_type": "Icicle", "nodes": {"Root": [None, None]}})
+        status, _, message = self.request("POST", "/render", body, {"Content-Type": "application/json"})
+        self.assertEqual(status, 400)
+        self.assertTrue(message.startswith(b"TypeError: "))
+
+    def test_invalid_content_length(self):
+        connection = http.client.HTTPConnection("127.0.0.1", self.service.port, timeout=10)
+        try:
+            connection.putrequest("POST", "/render")
+            connection.putheader("Content-Type", "text/csv")
+            connection.putheader("Content-Length", "-1")
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual((response.status, response.read()), (400, b"Invalid Content-Length\n"))
+        finally:
+            connection.close()
+
+    def test_backpressure(self):
+        # occupy the worker and the queue slot
+        self.assertTrue(self.service.acquire_slot())
+        self.assertTrue(self.service.acquire_slot())
+        try:
+            rejected = self.service.rejected
+            status, _, _ = self.request("POST", "/render", b"name,value\n", {"Content-Type": "text/csv"})
+            self.assertEqual(status, 503)
+            self.assertEqual(self.service.rejected, rejected + 1)
+        finally:
+            self.service.release_slot()
+            self.service.release_slot()
+
+    def in_flight(self):
+        _, _, metrics = self.request("GET", "/metrics")
+        line = next(line for line in metrics.decode("utf-8").splitlines() if line.startswith("render_in_flight "))
+        return int(line.split()[1])
+
+    def test_timeout_keeps_the_slot(self):
+        nodes = {"n0": [None, None]}
+        nodes.update({"n{}".format(i): [i, "n{}".format((i - 1) // 10)] for i in range(1, 5000)})
+        body = json.dumps({"chart_type": "Icicle", "nodes": nodes})
+        self.service.request_timeout = 0.001
+        try:
+            status, _, _ = self.request("POST", "/render", body, {"Content-Type": "application/json"})
+        finally:
+            self.service.request_timeout = REQUEST_TIMEOUT
+        self.assertEqual(status, 504)
+        # the render goes on in the worker and holds its slot until it ends
+        self.assertEqual(self.in_flight(), 1)
+        deadline = time.time() + 60
+        while self.in_flight() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.in_flight(), 0)
+
+    def test_metrics(self):
+        self.request("POST", "/render", json.dumps({"nodes": {"Root": [None, None], "A": [1, "Root"]}}), {"Content-Type": "application/json"})
+        status, content_type, metrics = self.request("GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn(b'render_request_seconds_bucket{chart_type="Treemap",status="200",le="+Inf"}', metrics)
+        self.assertIn(b"render_capacity 2", metrics)
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram((0.1, 1))
+        histogram.observe((("chart_type", "Treemap"),), 0.05)
+        histogram.observe((("chart_type", "Treemap"),), 0.5)
+        histogram.observe((("chart_type", "Treemap"),), 5)
+        lines = histogram.format("latency").splitlines()
+        self.assertEqual(lines[1:4], [
+            'latency_bucket{chart_type="Treemap",le="0.1"} 1',
+            'latency_bucket{chart_type="Treemap",le="1"} 2',
+            'latency_bucket{chart_type="Treemap",le="+Inf"} 3'
+        ])
+        self.assertEqual(lines[5], 'latency_count{chart_type="Treemap"} 3')
+
+if __name__ == "__main__":
+    unittest.main()
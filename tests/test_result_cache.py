@@ -0,0 +1,102 @@
+import unittest
+from chart_generator import ChartGenerator
+from result_cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = ResultCache(100)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1, 10)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 10})
+
+    def test_eviction(self):
+        cache = ResultCache(100)
+        cache.put("a", 1, 40)
+        cache.put("b", 2, 40)
+        # "a" becomes the most recently used entry, so "b" is evicted
+        cache.get("a")
+        cache.put("c", 3, 40)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.total_bytes, 80)
+
+    def test_replace_and_oversized(self):
+        cache = ResultCache(100)
+        cache.put("a", 1, 40)
+        cache.put("a", 2, 50)
+        self.assertEqual(cache.total_bytes, 50)
+        cache.put("b", 3, 101)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(len(cache), 1)
+
+class TestChartGeneratorCache(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "Documents": (None, None),
+            "School": (None, "Documents"),
+            "Assignment": (100, "School"),
+            "Personal": (None, "Documents"),
+            "CV": (200, "Personal"),
+            "Photo": (50, "Personal")
+        }
+        self.chart_properties = {
+            "title": "Files",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 8,
+            "colormap": "Blues"
+        }
+
+    def test_layout_cache(self):
+        layout_cache = ResultCache()
+        chart_generator = ChartGenerator(layout_cache)
+        treemap = chart_generator.generate_chart("Treemap", self.data, self.chart_properties)
+        chart_generator.generate_chart("Sunburst", self.data, self.chart_properties)
+        # an equal hierarchy from another generator sharing the cache
+        figure = ChartGenerator(layout_cache).generate_chart("Treemap", dict(self.data), self.chart_properties)
+        self.assertIs(figure, treemap)
+        self.assertEqual(layout_cache.stats()["hits"], 1)
+        self.assertEqual(layout_cache.stats()["misses"], 2)
+
+    def test_layout_cache_restyles(self):
+        chart_generator = ChartGenerator(ResultCache())
+        chart_generator.generate_chart("Icicle", self.data, self.chart_properties)
+        figure = chart_generator.generate_chart("Icicle", self.data, dict(self.chart_properties, title="Other"))
+        self.assertIn("Other", [text.get_text() for text in figure.texts])
+        self.assertEqual(chart_generator.chart.chart_properties["title"], "Other")
+
+    def test_image_cache(self):
+        image_cache = ResultCache()
+        chart_generator = ChartGenerator(image_cache=image_cache)
+        image = chart_generator.render_image("Sunburst", self.data, self.chart_properties)
+        self.assertTrue(image.startswith(b"\x89PNG"))
+        self.assertIs(chart_generator.render_image("Sunburst", self.data, self.chart_properties), image)
+        self.assertIsNot(chart_generator.render_image("Sunburst", self.data, dict(self.chart_properties, colormap="Reds")), image)
+        self.assertEqual(image_cache.stats()["hits"], 1)
+        self.assertEqual(image_cache.stats()["entries"], 2)
+
+    def test_focus(self):
+        layout_cache = ResultCache()
+        chart_generator = ChartGenerator(layout_cache)
+        figure = chart_generator.generate_chart("Sunburst", self.data, self.chart_properties, focus="Personal")
+        self.assertEqual(chart_generator.chart.table.names, ["Personal", "CV", "Photo"])
+        self.assertIs(chart_generator.generate_chart("Sunburst", self.data, self.chart_properties, focus="Personal"), figure)
+        self.assertIsNot(chart_generator.generate_chart("Sunburst", self.data, self.chart_properties), figure)
+        self.assertEqual(layout_cache.stats()["hits"], 1)
+        with self.assertRaises(ValueError):
+            chart_generator.generate_chart("Sunburst", self.data, self.chart_properties, focus="Unknown")
+
+    def test_detail_limits(self):
+        limits = {"Treemap": {"min_share": 0.7, "max_children": None, "max_depth": None}}
+        chart_generator = ChartGenerator(detail_limits=limits)
+        chart_generator.generate_chart("Treemap", self.data, self.chart_properties)
+        self.assertEqual(chart_generator.chart.table.names, ["Documents", "School", "Assignment", "Personal", "Other"])
+        chart_generator.generate_chart("Icicle", self.data, self.chart_properties)
+        self.assertEqual(len(chart_generator.chart.table), len(self.data))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from chart.spatial_index import GridIndex, RingIndex
+
+class TestGridIndex(unittest.TestCase):
+    def setUp(self):
+        # a parent with two children side by side, a rectangle without a value and a padded away rectangle
+        self.index = GridIndex(
+            [0, 0, 50, 10, 20],
+            [0, 0, 0, 10, 20],
+            [100, 50, 50, np.nan, -5],
+            [100, 100, 100, 10, 10]
+        )
+
+    def test_query(self):
+        self.assertEqual(self.index.query(25, 50), 1)
+        self.assertEqual(self.index.query(75, 50), 2)
+        self.assertEqual(self.index.query(100, 100), 2)
+
+    def test_query_outside(self):
+        self.assertEqual(self.index.query(-1, 50), -1)
+        self.assertEqual(self.index.query(50, 101), -1)
+
+    def test_invalid_rectangles(self):
+        self.assertEqual(self.index.query(15, 15), 1)
+        self.assertEqual(self.index.query(17, 25), 1)
+        self.assertEqual(GridIndex([0], [0], [np.nan], [1]).query(0, 0), -1)
+
+    def test_many_rectangles(self):
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(0, 100, 2000), rng.uniform(0, 100, 2000)
+        width, height = rng.uniform(0, 5, 2000), rng.uniform(0, 20, 2000)
+        index = GridIndex(x, y, width, height)
+        for px, py in rng.uniform(0, 100, (200, 2)):
+            hits = np.flatnonzero((x <= px) & (px <= x + width) & (y <= py) & (py <= y + height))
+            self.assertEqual(index.query(px, py), hits[-1] if len(hits) else -1)
+
+class TestRingIndex(unittest.TestCase):
+    def setUp(self):
+        # a full root ring, two wedges around it and a wedge without an angle
+        self.index = RingIndex(
+            [1, 2, 2, 2],
+            [0, 0, 90, 90],
+            [360, 90, 360, 90],
+            [0, 1, 1, 1],
+            [1, 2, 2, 2]
+        )
+
+    def test_query(self):
+        self.assertEqual(self.index.query(0.5, 200), 0)
+        self.assertEqual(self.index.query(1.5, 45), 1)
+        self.assertEqual(self.index.query(1.5, 90), 2)
+        self.assertEqual(self.index.query(1.5, -45), 2)
+        # the deeper ring wins on the border of two rings
+        self.assertEqual(self.index.query(1, 45), 1)
+
+    def test_query_outside(self):
+        self.assertEqual(self.index.query(3, 45), -1)
+
+if __name__ == "__main__":
+    unittest.main()
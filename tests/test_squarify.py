@@ -0,0 +1,31 @@
+import unittest
+from chart.squarify import squarify, worst_ratio
+
+class TestSquarify(unittest.TestCase):
+    def test_squarify(self):
+        expected_rects = [
+            [0, 0, 3.0, 2.0],
+            [0, 2.0, 3.0, 2.0],
+            [3.0, 0, 1.7142857142857142, 2.3333333333333335],
+            [4.714285714285714, 0, 1.2857142857142856, 2.3333333333333335],
+            [3.0, 2.3333333333333335, 1.2000000000000002, 1.6666666666666665],
+            [4.2, 2.3333333333333335, 1.2000000000000002, 1.6666666666666665],
+            [5.4, 2.3333333333333335, 0.5999999999999996, 1.6666666666666676]
+        ]
+        self.assertEqual(squarify([6, 6, 4, 3, 2, 2, 1], 0, 0, 6, 4).tolist(), expected_rects)
+
+    def test_empty(self):
+        self.assertEqual(squarify([], 0, 0, 100, 100).shape, (0, 4))
+
+    def test_worst_ratio(self):
+        self.assertEqual(worst_ratio(8, 2, 6, 4), 2.0)
+
+    def test_wide_node(self):
+        count = 100000
+        sizes = [10000 / count] * count
+        rects = squarify(sizes, 0, 0, 100, 100)
+        self.assertEqual(rects.shape, (count, 4))
+        self.assertAlmostEqual(float((rects[:, 2] * rects[:, 3]).sum()), 10000, 6)
+
+if __name__ == "__main__":
+    unittest.main()
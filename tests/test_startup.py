@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+import unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def imported_modules(code):
+    """
+    Runs the code in a new interpreter and returns the names of the modules it imported.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=PACKAGE_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split())
+
+class TestStartup(unittest.TestCase):
+    def test_no_matplotlib_before_first_chart(self):
+        modules = imported_modules("import chart_generator, chart_worker, hierarchy_cache, result_cache, ui.output")
+        self.assertNotIn("matplotlib", modules)
+        self.assertNotIn("chart.treemap", modules)
+
+    def test_load_chart_modules(self):
+        modules = imported_modules("import chart_generator\nchart_generator.load_chart_modules()")
+        self.assertTrue({"chart.treemap", "chart.sunburst", "chart.icicle"} <= modules)
+        self.assertNotIn("matplotlib.pyplot", modules)
@@ -1,6 +1,10 @@
 import unittest
 from chart.sunburst import Sunburst
-from chart.sunburst_path import Path
+from chart.sunburst_path import Path, PathTable
+from utils.node_table import NodeTable
+import matplotlib as mpl
+import numpy as np
+from matplotlib.path import Path as OutlinePath
 
 class TestSunburst(unittest.TestCase):
     def setUp(self):
@@ -29,7 +33,10 @@ class TestSunburst(unittest.TestCase):
             "Parent3" : (None, "Grand Parent2"),
             "Child3" : (22, "Parent3"),
         }
-        self.assertEqual(self.sunburst._Sunburst__get_parent_key(data, "Child2"), "Root/Grand Parent1/Parent2", "Should be equal to Root/Grand Parent1/Parent2")
+        table = NodeTable.from_dict(data)
+        paths = self.sunburst._Sunburst__build_paths(table)
+        self.assertEqual(paths[table.parent[table.index["Child2"]]], "Root/Grand Parent1/Parent2", "Should be equal to Root/Grand Parent1/Parent2")
+        self.assertEqual(paths[table.index["Child2"]], "Root/Grand Parent1/Parent2/Child2")
     
     def test_convert_data(self):
         data = {
@@ -43,8 +50,16 @@ class TestSunburst(unittest.TestCase):
             "Parent3" : (None, "Grand Parent2"),
             "Child3" : (22, "Parent3"),
         }
-        self.assertEqual(self.sunburst._Sunburst__convert_data(data), {'Root/Grand Parent1/Parent1/Child1': 10, 'Root/Grand Parent1/Parent2/Child2': 15, 'Root/Grand Parent2/Parent3/Child3': 22}, "Should be equal to {'Root/Grand Parent1/Parent1/Child1': 10, 'Root/Grand Parent1/Parent2/Child2': 15, 'Root/Grand Parent2/Parent3/Child3': 22}")
+        self.assertEqual(self.sunburst._Sunburst__convert_data(NodeTable.from_dict(data)), {'Root/Grand Parent1/Parent1/Child1': 10, 'Root/Grand Parent1/Parent2/Child2': 15, 'Root/Grand Parent2/Parent3/Child3': 22}, "Should be equal to {'Root/Grand Parent1/Parent1/Child1': 10, 'Root/Grand Parent1/Parent2/Child2': 15, 'Root/Grand Parent2/Parent3/Child3': 22}")
         
+    def test_build_paths(self):
+        data = {"n0": (None, None)}
+        for i in range(1, 1500):
+            data["n{}".format(i)] = (None, "n{}".format(i - 1))
+        paths = self.sunburst._Sunburst__build_paths(NodeTable.from_dict(data))
+        self.assertEqual(paths[0], "n0")
+        self.assertEqual(paths[1499], "/".join("n{}".format(i) for i in range(1500)))
+
     def test_dictionary_to_pathvalues(self):
         data = {
             "Root/Grand Parent1/Parent1/Child1": 10,
@@ -53,20 +68,122 @@ class TestSunburst(unittest.TestCase):
         }
         self.assertEqual(self.sunburst._Sunburst__dict_to_pv(data), {Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )): 10, Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )): 15, Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )): 22}, "Should be equal to {Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )): 10, Path(('Root', 'Grand Parent1', 'Parent2', 'Child2', )): 15, Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )): 22}")
         
+    def test_complete_paths(self):
+        table = self.sunburst._path_table
+        paths = [table.find(path) for path in [Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )), Path(('Root', 'Grand Parent1', )), Path(('Root', 'Grand Parent2', 'Parent3', ))]]
+        expected_paths = [
+            Path(()),
+            Path(('Root', )),
+            Path(('Root', 'Grand Parent1', 'Parent1', )),
+            Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )),
+            Path(('Root', 'Grand Parent1', )),
+            Path(('Root', 'Grand Parent2', )),
+            Path(('Root', 'Grand Parent2', 'Parent3', ))
+        ]
+        completed_paths = self.sunburst._Sunburst__complete_paths(paths)
+        self.assertEqual([path.to_path() for path in completed_paths], expected_paths)
+
+    def test_outmost(self):
+        geometry = self.sunburst._geometry
+        wedges = [path.to_path() for path in self.sunburst.wedge_paths]
+        self.assertTrue(geometry.outmost[wedges.index(Path(('Root', 'Grand Parent2', 'Parent3', 'Child3', )))])
+        self.assertFalse(geometry.outmost[wedges.index(Path(('Root', 'Grand Parent2', )))])
+
+    def test_complete_pv(self):
+        table = self.sunburst._path_table
+        completed_pv = self.sunburst._completed_pv
+        self.assertEqual(completed_pv[table.find(Path(())).id], 47)
+        self.assertEqual(completed_pv[table.find(Path(('Root', 'Grand Parent1', ))).id], 25)
+        self.assertEqual(completed_pv[table.find(Path(('Root', 'Grand Parent2', 'Parent3', ))).id], 22)
+
+    def test_calculate_angles(self):
+        table = self.sunburst._path_table
+        angles = self.sunburst._angles
+        self.assertEqual(angles[0].theta1, 0)
+        self.assertEqual(angles[0].theta2, 360)
+        grand_parent2 = angles[table.find(Path(('Root', 'Grand Parent2', ))).id]
+        self.assertAlmostEqual(grand_parent2.theta1, 360 * 25 / 47)
+        self.assertAlmostEqual(grand_parent2.theta2, 360)
+
+    def test_path_table(self):
+        table = PathTable()
+        child_id = table.add(Path(('Root', 'Parent', 'Child', )))
+        self.assertEqual(table.add(Path(('Root', 'Parent', ))), table.parent[child_id])
+        self.assertEqual(table.path(child_id), Path(('Root', 'Parent', 'Child', )))
+        self.assertIsNone(table.find(Path(('Root', 'Other', ))))
+        child = table.refs[child_id]
+        self.assertEqual(len(child), 3)
+        self.assertEqual(child.name, 'Child')
+        self.assertEqual([len(ancestor) for ancestor in child.ancestors()], [0, 1, 2, 3])
+        self.assertTrue(child.startswith(table.find(Path(('Root', )))))
+        self.assertFalse(table.find(Path(('Root', ))).startswith(child))
+        self.assertIs(table.refs[0].parent(), table.refs[0])
+
+    def test_calculate_geometry(self):
+        geometry = self.sunburst._geometry
+        self.assertEqual(len(self.sunburst.wedge_paths), 9)
+        self.assertEqual(list(geometry.depth), sorted(geometry.depth))
+        self.assertEqual(geometry.depth[0], 1)
+        self.assertAlmostEqual(geometry.inner_radius[-1], 1.2)
+        self.assertAlmostEqual(geometry.outer_radius[-1], 1.6)
+        self.assertEqual(int(geometry.outmost.sum()), 3)
+
+    def test_wedge_outlines(self):
+        outlines = self.sunburst._Sunburst__wedge_outlines()
+        self.assertEqual(len(outlines), len(self.sunburst.wedge_paths))
+        # the root is a full circle, the outlines of the other wedges are closed polygons
+        self.assertEqual(list(outlines[0].codes).count(OutlinePath.MOVETO), 2)
+        self.assertEqual(list(outlines[1].codes).count(OutlinePath.MOVETO), 1)
+        self.assertEqual(outlines[1].codes[-1], OutlinePath.CLOSEPOLY)
+        self.assertEqual(list(self.sunburst.axes.collections), [self.sunburst.collection])
+
+    def test_labels(self):
+        self.assertEqual(self.sunburst.labels_emitted + self.sunburst.labels_culled, len(self.sunburst.wedge_paths))
+        self.assertEqual(len(self.sunburst.axes.texts), self.sunburst.labels_emitted)
+
+    def test_node_at(self):
+        def node_at(radius, angle):
+            return self.sunburst.node_at(radius * np.cos(np.radians(angle)), radius * np.sin(np.radians(angle)))
+        self.assertEqual(node_at(0.2, 10), "Root")
+        self.assertEqual(node_at(1.4, 45), "Child2")
+        self.assertEqual(node_at(1.0, 250), "Parent3")
+        self.assertEqual(node_at(0.6, 150), "Grand Parent1")
+        self.assertEqual(node_at(2.0, 45), None)
+
+    def test_restyle(self):
+        paths = self.sunburst.collection.get_paths()
+        chart_properties = {
+            "title": "Cities",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 6,
+            "colormap": "Greens"
+        }
+        self.sunburst.restyle(chart_properties)
+        colors = self.sunburst.collection.get_facecolor()
+        self.assertEqual(self.sunburst.collection.get_paths(), paths)
+        # the root wedge spans the whole circle, its middle angle is 180
+        self.assertEqual(tuple(colors[0]), mpl.colormaps["Greens"](0.5))
+        self.assertEqual(len(self.sunburst.axes.texts), self.sunburst.labels_emitted)
+        self.assertTrue(all(label.get_fontsize() == 6 for label in self.sunburst.labels))
+        self.assertIn("Cities", [text.get_text() for text in self.sunburst.get_figure().texts])
+
     def test_wedge_width(self):
         self.assertEqual(self.sunburst._Sunburst__wedge_width(), self.sunburst.base_wedge_width, "Should be equal to 0.4")
         
     def test_wedge_spacing(self):
         self.assertEqual(self.sunburst._Sunburst__wedge_spacing(), (0, 0), "Should be equal to (0, 0)")
     
-    def test_wedge_inner_radius(self):
-        self.assertAlmostEqual(self.sunburst._Sunburst__wedge_inner_radius(Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', ))), 1.2, 1, "Should be equal to 1.2")
-    
-    def test_wedge_outer_radius(self):
-        self.assertAlmostEqual(self.sunburst._Sunburst__wedge_outer_radius(Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', ))), 1.6, 1, "Should be equal to 1.6")
-    
-    def test_wedge_mid_radius(self):
-        self.assertAlmostEqual(self.sunburst._Sunburst__wedge_mid_radius(Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', ))), 1.4, 1, "Should be equal to 1.4")
+    def test_wedge_radii(self):
+        geometry = self.sunburst._geometry
+        wedges = [path.to_path() for path in self.sunburst.wedge_paths]
+        child1 = wedges.index(Path(('Root', 'Grand Parent1', 'Parent1', 'Child1', )))
+        self.assertAlmostEqual(geometry.inner_radius[child1], 1.2, 1, "Should be equal to 1.2")
+        self.assertAlmostEqual(geometry.outer_radius[child1], 1.6, 1, "Should be equal to 1.6")
+        root = wedges.index(Path(('Root', )))
+        self.assertAlmostEqual(geometry.inner_radius[root], 0)
+        self.assertAlmostEqual(geometry.outer_radius[root], 0.4)
         
     def test_edge_color(self):
         self.assertEqual(self.sunburst._Sunburst__edge_color(), (0, 0, 0, 1), "Should be equal to (0, 0, 0, 1)")
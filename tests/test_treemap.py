@@ -1,6 +1,8 @@
 import unittest
+from matplotlib.backend_bases import ResizeEvent
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
-from chart.treemap import Treemap
+from chart.treemap import Treemap, label_widths
 
 class TestTreemap(unittest.TestCase):
     def setUp(self):
@@ -46,15 +48,105 @@ class TestTreemap(unittest.TestCase):
         self.assertEqual(converted_data, expected_data)
 
     def test_calculate_node_value_1(self):
-        key_list = ["Documents", "School", "Assignment", "Personal", "CV"]
-        return_value = self.treemap._Treemap__calculate_node_value("CV", key_list)
+        return_value = self.treemap._Treemap__calculate_node_value("CV")
         self.assertEqual(return_value, 200)
     
     def test_calculate_node_value_2(self):
-        key_list = ["Documents", "School", "Assignment", "Personal", "CV"]
-        return_value = self.treemap._Treemap__calculate_node_value("School", key_list)
+        return_value = self.treemap._Treemap__calculate_node_value("School")
         self.assertEqual(return_value, (("Assignment", 100),))
 
+    def test_calculate_tree(self):
+        calculated_tree = self.treemap._Treemap__calculate_tree(self.treemap._Treemap__convert_data())
+        expected_tree = (
+            "Documents",
+            (
+                ("Personal", (("CV", 200),), 200),
+                ("School", (("Assignment", 100),), 100)
+            ),
+            300
+        )
+        self.assertEqual(calculated_tree, expected_tree)
+
+    def test_deep_hierarchy(self):
+        data = {"n0": (None, None)}
+        for i in range(1, 1500):
+            data["n{}".format(i)] = (None, "n{}".format(i - 1))
+        data["leaf"] = (7, "n1499")
+        self.treemap.data = data
+        calculated_tree = self.treemap._Treemap__calculate_tree(self.treemap._Treemap__convert_data())
+        self.assertEqual(calculated_tree[0], "n0")
+        self.assertEqual(calculated_tree[2], 7)
+
+    def test_plot_rectangles(self):
+        ax = self.treemap.get_figure().gca()
+        self.assertEqual(list(ax.collections), [self.treemap.rectangles])
+        self.assertTrue(isinstance(self.treemap.rectangles, PolyCollection))
+        self.assertEqual(len(self.treemap.rectangles.get_paths()), 4)
+        self.assertEqual(self.treemap.labels_emitted + self.treemap.labels_culled, 4)
+        self.assertEqual(len(ax.texts), self.treemap.labels_emitted)
+
+    def test_labels_culled(self):
+        chart_properties = {
+            "title": "",
+            "title_font_family": "Arial",
+            "title_font_size": 20,
+            "chart_font_family": "Arial",
+            "chart_font_size": 400,
+            "colormap": "Blues"
+        }
+        treemap = Treemap(self.treemap.data, chart_properties)
+        self.assertEqual(treemap.labels_emitted, 0)
+        self.assertEqual(treemap.labels_culled, 4)
+
+    def test_labels_fitted_on_resize(self):
+        chart_properties = {
+            "title": "",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 40,
+            "colormap": "Blues"
+        }
+        treemap = Treemap(self.treemap.data, chart_properties)
+        emitted = treemap.labels_emitted
+        figure = treemap.get_figure()
+        figure.set_size_inches(24, 18, forward=False)
+        figure.canvas.callbacks.process("resize_event", ResizeEvent("resize_event", figure.canvas))
+        self.assertGreater(treemap.labels_emitted, emitted)
+        self.assertEqual(treemap.labels_emitted + treemap.labels_culled, 4)
+        self.assertEqual(len(figure.gca().texts), treemap.labels_emitted)
+
+    def test_label_widths(self):
+        widths = label_widths(["WW", "ii", ""], "DejaVu Sans")
+        self.assertGreater(widths[0], widths[1])
+        self.assertEqual(widths[2], 0)
+
+    def test_node_at(self):
+        # the rectangles of the children are nested in their parents, the deepest one is found
+        self.assertEqual(self.treemap.node_at(2, 50), "Personal")
+        self.assertEqual(self.treemap.node_at(30, 50), "CV")
+        self.assertEqual(self.treemap.node_at(80, 50), "Assignment")
+        self.assertEqual(self.treemap.node_at(150, 50), None)
+
+    def test_restyle(self):
+        paths = self.treemap.rectangles.get_paths()
+        chart_properties = {
+            "title": "Files",
+            "title_font_family": "DejaVu Sans",
+            "title_font_size": 20,
+            "chart_font_family": "DejaVu Sans",
+            "chart_font_size": 400,
+            "colormap": "Blues"
+        }
+        self.treemap.restyle(chart_properties)
+        ax = self.treemap.get_figure().gca()
+        self.assertEqual(self.treemap.rectangles.get_paths(), paths)
+        self.assertEqual(list(ax.collections), [self.treemap.rectangles])
+        self.assertEqual(len(self.treemap.rectangles.get_facecolor()), 4)
+        self.assertEqual(self.treemap.labels_emitted, 0)
+        self.assertEqual(len(ax.texts), 0)
+        self.assertIn("Files", [text.get_text() for text in self.treemap.get_figure().texts])
+
     def test_get_node_name(self):
         self.assertEqual(self.treemap._Treemap__get_node_name(("Cecil", 20)), "Cecil")
 
@@ -2,6 +2,30 @@ import customtkinter
 import tkinter as tk
 from tkinter import ttk
 
+# colormaps offered for the charts, their colors are loaded in the background after the window is shown
+COLORMAPS = [
+    'Greys',
+    'Purples',
+    'Blues',
+    'Greens',
+    'Oranges',
+    'Reds',
+    'YlOrBr',
+    'YlOrRd',
+    'OrRd',
+    'PuRd',
+    'RdPu',
+    'BuPu',
+    'GnBu',
+    'PuBu',
+    'YlGnBu',
+    'PuBuGn',
+    'BuGn',
+    'YlGn'
+]
+# the normalizations of chart.color_scale, which imports matplotlib and is not needed to open the window
+COLOR_SCALES = ["linear", "log", "quantile"]
+
 class CustomizationFrame:
     def __init__(self, root, app):
         customization_frame = customtkinter.CTkFrame(master=root)
@@ -15,6 +39,7 @@ class CustomizationFrame:
         customization_frame.rowconfigure(3, pad=20)
         customization_frame.rowconfigure(4, pad=20)
         customization_frame.rowconfigure(5, pad=20)
+        customization_frame.rowconfigure(6, pad=20)
 
         self.root = root
         self.app = app
@@ -29,6 +54,7 @@ class CustomizationFrame:
         self.chart_font_size = 11
 
         self.colormap = tk.StringVar(customization_frame, "Blues")
+        self.color_scale = tk.StringVar(customization_frame, "linear")
 
         self.app.chart_properties = {
             "title": self.title.get(),
@@ -36,7 +62,8 @@ class CustomizationFrame:
             "title_font_size": self.title_font_size,
             "chart_font_family": self.chart_font_family,
             "chart_font_size": self.chart_font_size,
-            "colormap": self.colormap.get()
+            "colormap": self.colormap.get(),
+            "color_scale": self.color_scale.get()
         }
 
         frame_title_label = customtkinter.CTkLabel(master=customization_frame, text="Customization", text_font=("", 14), anchor="w")
@@ -69,38 +96,24 @@ class CustomizationFrame:
         # Colormap
         colormap_label = customtkinter.CTkLabel(master=customization_frame, text="Color Map", text_font=("", 12)).grid(
             row=4, column=0, sticky=tk.W)
-        colormaps = [
-            'Greys',
-            'Purples',
-            'Blues',
-            'Greens',
-            'Oranges',
-            'Reds',
-            'YlOrBr',
-            'YlOrRd',
-            'OrRd',
-            'PuRd',
-            'RdPu',
-            'BuPu',
-            'GnBu',
-            'PuBu',
-            'YlGnBu',
-            'PuBuGn',
-            'BuGn',
-            'YlGn'
-        ]
-
-        colormap_entry = customtkinter.CTkComboBox(master=customization_frame, values=colormaps, variable=self.colormap, text_font=("", 12))
+        colormap_entry = customtkinter.CTkComboBox(master=customization_frame, values=COLORMAPS, variable=self.colormap, text_font=("", 12))
         colormap_entry.configure(state="readonly", text_color="black")
         colormap_entry.grid(row=4, column=1, sticky=(tk.W, tk.E))
 
+        # Color scale, how the values of the nodes are spread over the colormap
+        color_scale_label = customtkinter.CTkLabel(master=customization_frame, text="Color Scale", text_font=("", 12)).grid(
+            row=5, column=0, sticky=tk.W)
+        color_scale_entry = customtkinter.CTkComboBox(master=customization_frame, values=COLOR_SCALES, variable=self.color_scale, text_font=("", 12))
+        color_scale_entry.configure(state="readonly", text_color="black")
+        color_scale_entry.grid(row=5, column=1, sticky=(tk.W, tk.E))
+
         # update button
         update_btn = customtkinter.CTkButton(master=customization_frame, text="Update", text_font=("", 12), command=self.update_chart)
-        update_btn.grid(row=5, column=0)
+        update_btn.grid(row=6, column=0)
 
         # reset button
         reset_btn = customtkinter.CTkButton(master=customization_frame, text="Reset", text_font=("", 12), command=self.__reset)
-        reset_btn.grid(row=5, column=1, sticky=(tk.W))
+        reset_btn.grid(row=6, column=1, sticky=(tk.W))
 
     def update_chart(self):
         self.app.chart_properties = {
@@ -109,7 +122,8 @@ class CustomizationFrame:
             "title_font_size": self.title_font_size,
             "chart_font_family": self.chart_font_family,
             "chart_font_size": self.chart_font_size,
-            "colormap": self.colormap.get()
+            "colormap": self.colormap.get(),
+            "color_scale": self.color_scale.get()
         }
         self.app.update_chart()
 
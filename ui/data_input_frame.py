@@ -18,6 +18,8 @@ class DataInputFrame:
         self.app = app
         self.file_name = tk.StringVar(input_frame, "No file.")
         self.chart_type = tk.StringVar(input_frame, "Treemap")
+        # a chart of another type is not wanted anymore
+        self.chart_type.trace_add("write", lambda *args: self.app.cancel_generation())
         self.file_obj = None
 
         frame_title_label = customtkinter.CTkLabel(master=input_frame, text="Data", text_font=("", 14), anchor="w")
@@ -40,11 +42,15 @@ class DataInputFrame:
         generate_btn = customtkinter.CTkButton(master=input_frame, text="Generate", command=self._generate_btn_click_handler, text_font=("", 12))
         generate_btn.grid(row=2, column=2)
 
+        status_label = customtkinter.CTkLabel(master=input_frame, textvariable=app.status, text_font=("", 12), anchor="w")
+        status_label.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), padx=(20,0))
+
     def _file_select(self):
         file_types = (("CSV files", "*.csv"), ("All files", "*.*"))
 
         file_obj = fd.askopenfile(filetypes=file_types)
         if file_obj != None:
+            self.app.cancel_generation()
             self._set_file_name(os.path.basename(file_obj.name))
             self.file_obj = file_obj
 
@@ -1,39 +1,210 @@
+from __future__ import annotations
+
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import ( FigureCanvasTkAgg, NavigationToolbar2Tk)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
+# the node under the mouse pointer is looked up at most once per HOVER_INTERVAL_MS milliseconds
+HOVER_INTERVAL_MS = 30
 
 class Output:
-    def __init__(self, root):
+    def __init__(self, root, on_node_click=None, on_breadcrumb=None):
         styles = ttk.Style()
         styles.configure('Output.TFrame', borderwidth=5, relief="raised")
 
         self.outputFrame = ttk.Frame(root, padding="3 3 12 12", style="Output.TFrame")
-        self.outputFrame["borderwidth"] = 2 
+        self.outputFrame["borderwidth"] = 2
         self.outputFrame.grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
-        self.outputFrame.rowconfigure(0, weight=1)
+        self.outputFrame.rowconfigure(1, weight=1)
         self.outputFrame.columnconfigure(0, weight=1)
 
-        # Create the default figure
-        fig = Figure(figsize=(8, 6), dpi=100, edgecolor="black", linewidth=1)
+        # called with the name of a clicked node and with the position of a clicked breadcrumb
+        self.on_node_click = on_node_click
+        self.on_breadcrumb = on_breadcrumb
+        # the chart of the shown figure, used to find the clicked node and the node under the pointer
+        self.chart = None
+        self._hovered = None
+        self._pending_motion = None
+        self._hover_scheduled = False
 
-        # Embed the chart
-        self.figure_canvas = FigureCanvasTkAgg(fig, master=self.outputFrame)
-        self.figure_canvas.draw()
-        self.figure_canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
+        # Breadcrumbs of the focused node
+        self.breadcrumbFrame = ttk.Frame(self.outputFrame)
+        self.breadcrumbFrame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+        # An empty canvas in place of the figure. Importing the Tk backend of matplotlib takes longer than opening
+        # the window, so the figure canvas is created for the first chart.
+        self.figure_canvas = None
+        self.placeholder = tk.Canvas(self.outputFrame, width=800, height=600, background="white",
+                                     highlightthickness=1, highlightbackground="black")
+        self.placeholder.grid(row=1, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
+        self._connections = []
+
+        # Tooltip of the node under the pointer, a Tk label so that hovering does not redraw the figure
+        self.tooltip = tk.Label(self.outputFrame, background="#ffffe0", relief="solid", borderwidth=1, justify=tk.LEFT)
+
+    def show_chart(self, figure: Figure, chart=None, breadcrumbs=()):
+        """
+        Shows the figure of a chart.
 
-    def show_chart(self, figure: Figure):
+        Parameters
+        ----------
+        figure: matplotlib.figure.Figure
+        chart: the chart drawn on the figure, its nodes can be clicked if it is given
+        breadcrumbs: names of the nodes from the root to the focused node
+
+        Returns
+        -------
+        None
+        """
         figure.set_edgecolor("black")
         figure.set_linewidth(1)
-        self.figure_canvas = FigureCanvasTkAgg(figure, master=self.outputFrame)
-        self.figure_canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
-        self.figure_canvas.draw()
+        self.chart = chart
+        self.__hide_tooltip()
+        self.__replace_figure(figure)
+        self.__show_breadcrumbs(breadcrumbs)
 
     def reset(self):
-        figure = Figure(figsize=(8, 6), dpi=100, edgecolor="black", linewidth=1)
+        self.chart = None
+        self.__hide_tooltip()
+        if self.figure_canvas is not None:
+            from matplotlib.figure import Figure
+            self.__replace_figure(Figure(figsize=(8, 6), dpi=100, edgecolor="black", linewidth=1))
+        self.__show_breadcrumbs(())
+
+    def __replace_figure(self, figure: Figure):
+        """
+        Shows the figure on the existing canvas.
+        The canvas widget is created once and reused, so repeated updates do not pile up widgets and figures.
+        The replaced figure is left intact because the layout cache of the chart generator may show it again,
+        it is freed once nothing refers to it.
+
+        Parameters
+        ----------
+        figure: matplotlib.figure.Figure
+
+        Returns
+        -------
+        None
+        """
+        if self.figure_canvas is None:
+            self.__create_canvas(figure)
+            return
+        old_figure = self.figure_canvas.figure
+        if figure is not old_figure:
+            # the callbacks of a canvas are kept by its figure, so the event handlers move to the new figure
+            self.__disconnect_events()
+            # the new figure takes over the size of the widget
+            width, height = old_figure.bbox.size
+            figure.set_size_inches(width / figure.dpi, height / figure.dpi, forward=False)
+            figure.set_canvas(self.figure_canvas)
+            self.figure_canvas.figure = figure
+            self.__connect_events()
+            self.__figure_resized()
+        self.figure_canvas.draw()
+
+    def __create_canvas(self, figure: Figure):
+        """
+        Replaces the empty canvas with a matplotlib canvas showing the figure, in the size of the empty canvas.
+        """
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        width, height = self.placeholder.winfo_width(), self.placeholder.winfo_height()
+        if width > 1 and height > 1:
+            figure.set_size_inches(width / figure.dpi, height / figure.dpi, forward=False)
         self.figure_canvas = FigureCanvasTkAgg(figure, master=self.outputFrame)
-        self.figure_canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
+        self.placeholder.destroy()
+        self.figure_canvas.get_tk_widget().grid(row=1, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
+        self.__connect_events()
+        self.__figure_resized()
         self.figure_canvas.draw()
 
+    def __figure_resized(self):
+        """
+        Tells the chart that its figure was sized to the widget, like a resize of the widget does, so that it
+        can fit its labels to the size.
+        """
+        from matplotlib.backend_bases import ResizeEvent
+        self.figure_canvas.callbacks.process("resize_event", ResizeEvent("resize_event", self.figure_canvas))
+
+    def __connect_events(self):
+        self._connections = [
+            self.figure_canvas.mpl_connect("button_press_event", self.__on_click),
+            self.figure_canvas.mpl_connect("motion_notify_event", self.__on_motion),
+            self.figure_canvas.mpl_connect("figure_leave_event", lambda event: self.__hide_tooltip())
+        ]
+
+    def __disconnect_events(self):
+        for connection in self._connections:
+            self.figure_canvas.mpl_disconnect(connection)
+        self._connections = []
+
+    def __show_breadcrumbs(self, breadcrumbs):
+        """
+        Shows a button for every ancestor of the focused node and the name of the focused node.
+        Nothing is shown while the root is focused.
+        """
+        for widget in self.breadcrumbFrame.winfo_children():
+            widget.destroy()
+        if len(breadcrumbs) < 2:
+            return
+        for index, name in enumerate(breadcrumbs[:-1]):
+            ttk.Button(self.breadcrumbFrame, text=name, command=lambda index=index: self.__breadcrumb_clicked(index)).grid(row=0, column=2 * index)
+            ttk.Label(self.breadcrumbFrame, text="›").grid(row=0, column=2 * index + 1, padx=2)
+        ttk.Label(self.breadcrumbFrame, text=breadcrumbs[-1]).grid(row=0, column=2 * len(breadcrumbs) - 2)
+
+    def __breadcrumb_clicked(self, index):
+        if self.on_breadcrumb is not None:
+            self.on_breadcrumb(index)
+
+    def __on_click(self, event):
+        """
+        Hands the node under a left click to on_node_click.
+        """
+        if event.button != 1 or event.inaxes is None or self.chart is None or self.on_node_click is None:
+            return
+        name = self.chart.node_at(event.xdata, event.ydata)
+        if name is not None:
+            self.on_node_click(name)
+
+    def __on_motion(self, event):
+        """
+        Remembers the latest position of the pointer and schedules a tooltip update, unless one is scheduled.
+        The pointer moves much faster than the tooltip needs to follow it.
+        """
+        self._pending_motion = event
+        if not self._hover_scheduled:
+            self._hover_scheduled = True
+            self.figure_canvas.get_tk_widget().after(HOVER_INTERVAL_MS, self.__update_tooltip)
+
+    def __update_tooltip(self):
+        """
+        Shows the name and the value of the node under the latest position of the pointer next to it.
+        """
+        self._hover_scheduled = False
+        event, self._pending_motion = self._pending_motion, None
+        if event is None or event.inaxes is None or self.chart is None:
+            self.__hide_tooltip()
+            return
+        name = self.chart.node_at(event.xdata, event.ydata)
+        if name is None:
+            self.__hide_tooltip()
+            return
+        if name != self._hovered:
+            self._hovered = name
+            self.tooltip.configure(text=self.__tooltip_text(name))
+        # matplotlib counts the pixels from the bottom of the canvas, Tk from the top
+        widget = self.figure_canvas.get_tk_widget()
+        self.tooltip.place(in_=widget, x=event.x + 12, y=widget.winfo_height() - event.y + 12)
+
+    def __tooltip_text(self, name):
+        table = self.chart.table
+        node = table.index.get(name)
+        if node is None:
+            return name
+        return "{}\n{:g}".format(name, table.subtree_sums()[node])
 
+    def __hide_tooltip(self):
+        self._hovered = None
+        self.tooltip.place_forget()
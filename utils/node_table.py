@@ -0,0 +1,368 @@
+import hashlib
+import sys
+import numpy as np
+
+
+def _children(parent):
+    """
+    Returns the children of every node in compressed form, see NodeTable.children.
+    """
+    order = np.argsort(parent, kind="stable").astype(np.int32)
+    # the roots have parent -1 and are sorted in front of everything else
+    root_count = int(np.count_nonzero(parent < 0))
+    counts = np.bincount(parent[parent >= 0], minlength=len(parent))
+    offsets = np.empty(len(parent) + 1, dtype=np.int64)
+    offsets[0] = root_count
+    np.cumsum(counts, out=offsets[1:])
+    offsets[1:] += root_count
+    return order, offsets
+
+
+class NodeTable:
+    """
+    A columnar representation of a hierarchy.
+
+    Every node is identified by its position in the table. Instead of one (value, parent) tuple per node,
+    the hierarchy is stored as parallel arrays plus a single table of interned node names.
+
+    Attributes
+    ----------
+    names: list of interned node names
+    parent: int32 array with the position of the parent of each node, -1 for the root
+    value: float64 array with the value of each node, NaN for empty values
+    depth: int16 array with the distance of each node from the root
+    """
+    def __init__(self, names, parent, value, depth):
+        if not len(names) == len(parent) == len(value) == len(depth):
+            raise ValueError("All the columns of a node table must have the same length")
+        self.names = names
+        self.parent = parent
+        self.value = value
+        self.depth = depth
+        self._index = None
+        self._children = None
+        self._levels = None
+        self._subtree_sums = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Creates a node table from a dictionary of type "node": (value, "parent").
+        The nodes keep the order of the dictionary.
+
+        Parameters
+        ----------
+        data: dict[str, tuple(value, parent)]
+
+        Returns
+        -------
+        NodeTable
+        """
+        names = [sys.intern(name) for name in data.keys()]
+        index = {name: i for i, name in enumerate(names)}
+        count = len(names)
+        parent = np.empty(count, dtype=np.int32)
+        value = np.empty(count, dtype=np.float64)
+        for i, (node_value, parent_name) in enumerate(data.values()):
+            if parent_name is None:
+                parent[i] = -1
+            elif parent_name in index:
+                parent[i] = index[parent_name]
+            else:
+                raise ValueError("Unknown parent '{}' of node '{}'".format(parent_name, names[i]))
+            value[i] = np.nan if node_value is None else node_value
+        table = cls(names, parent, value, cls.__calculate_depth(parent))
+        table._index = index
+        return table
+
+    @staticmethod
+    def __calculate_depth(parent):
+        """
+        Calculates the depth of every node one level at a time, going down from the roots to the children of
+        the nodes of the level above. Every node is visited once and the order of the nodes does not matter.
+        """
+        count = len(parent)
+        order, offsets = _children(parent)
+        depth = np.full(count, -1, dtype=np.int64)
+        nodes = order[:offsets[0]]
+        level = 0
+        while len(nodes):
+            depth[nodes] = level
+            starts = offsets[nodes]
+            sizes = offsets[nodes + 1] - starts
+            # the children of all the nodes of the level, one slice of the order per node
+            nodes = order[np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())]
+            level += 1
+        if (depth < 0).any():
+            raise ValueError("The hierarchy contains a cycle")
+        if level - 1 > np.iinfo(np.int16).max:
+            raise ValueError("The hierarchy is too deep")
+        return depth.astype(np.int16)
+
+    def to_dict(self):
+        """
+        Converts the table back into a dictionary of type "node": (value, "parent").
+
+        Returns
+        -------
+        dict[str, tuple(value, parent)]
+        """
+        names = self.names
+        parents = self.parent.tolist()
+        values = self.value.tolist()
+        data = {}
+        for i in range(len(names)):
+            value = values[i]
+            data[names[i]] = (
+                None if value != value else value,
+                None if parents[i] < 0 else names[parents[i]]
+            )
+        return data
+
+    def __len__(self):
+        return len(self.names)
+
+    def fingerprint(self):
+        """
+        Returns a hash of the names, parents and values of all the nodes as a hex string. Equal hierarchies
+        have equal fingerprints whether they were parsed or loaded from the hierarchy cache.
+        The table is treated as immutable, the fingerprint is calculated once.
+
+        Returns
+        -------
+        str
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=20)
+            digest.update(len(self).to_bytes(8, "little"))
+            digest.update(np.ascontiguousarray(self.parent, dtype="<i4").tobytes())
+            # every NaN hashes the same, whatever its payload
+            value = np.ascontiguousarray(self.value, dtype="<f8")
+            digest.update(np.where(np.isnan(value), np.nan, value).tobytes())
+            digest.update("\0".join(self.names).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def index(self):
+        """
+        A dictionary mapping every node name to its position in the table.
+        """
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    def root(self):
+        """
+        Returns the position of the first root node, -1 for an empty table.
+        """
+        roots = np.flatnonzero(self.parent < 0)
+        return int(roots[0]) if len(roots) else -1
+
+    def root_key(self):
+        """
+        Returns the name of the root node, False for an empty table like utils.get_root_node_key.
+        """
+        root = self.root()
+        return self.names[root] if root >= 0 else False
+
+    def children(self):
+        """
+        Returns the children of every node in compressed form. The children of node i are
+        order[offsets[i]:offsets[i + 1]], in table order.
+
+        Returns
+        -------
+        tuple(order, offsets)
+        """
+        if self._children is None:
+            self._children = _children(self.parent)
+        return self._children
+
+    def levels(self):
+        """
+        Returns the nodes grouped by their depth in compressed form. The nodes at depth d are
+        order[offsets[d]:offsets[d + 1]], in table order. The groups are sorted once, so going through the
+        hierarchy one level at a time does not scan the whole table for every level.
+
+        Returns
+        -------
+        tuple(order, offsets)
+        """
+        if self._levels is None:
+            depth = self.depth.astype(np.intp)
+            order = np.argsort(depth, kind="stable").astype(np.int32)
+            counts = np.bincount(depth)
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self._levels = (order, offsets)
+        return self._levels
+
+    def subtree_sums(self):
+        """
+        Returns the sum of the values of every node and all of its descendants. Empty values count as 0.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+        """
+        if self._subtree_sums is None:
+            self._subtree_sums = self.aggregate(np.nan_to_num(self.value, nan=0.0))
+        return self._subtree_sums
+
+    def ancestors(self, node):
+        """
+        Returns the positions of the nodes on the way from the root to the node, both included.
+        """
+        path = [node]
+        while self.parent[path[-1]] >= 0:
+            path.append(int(self.parent[path[-1]]))
+        path.reverse()
+        return path
+
+    def subtree(self, node):
+        """
+        Returns the node and all of its descendants as a table of its own, with the node as the root.
+        The node comes first and the descendants keep their order. The subtree is collected one level at
+        a time below the node.
+
+        Parameters
+        ----------
+        node: position of the root of the subtree
+
+        Returns
+        -------
+        NodeTable, the table itself for its root
+        """
+        if self.parent[node] < 0:
+            return self
+        inside = np.zeros(len(self), dtype=bool)
+        inside[node] = True
+        order, offsets = self.levels()
+        for level in range(int(self.depth[node]) + 1, len(offsets) - 1):
+            nodes = order[offsets[level]:offsets[level + 1]]
+            inside[nodes] = inside[self.parent[nodes]]
+        inside[node] = False
+        nodes = np.r_[node, np.flatnonzero(inside)]
+
+        position = np.full(len(self), -1, dtype=np.int64)
+        position[nodes] = np.arange(len(nodes))
+        parent = position[self.parent[nodes]]
+        parent[0] = -1
+        return NodeTable(
+            [self.names[i] for i in nodes],
+            parent.astype(np.int32),
+            self.value[nodes],
+            (self.depth[nodes] - self.depth[node]).astype(np.int16)
+        )
+
+    def reduce(self, min_share=0.0, max_children=None, max_depth=None, other_name="Other"):
+        """
+        Returns a table with only the detail a chart can show.
+
+        Siblings whose subtree sum is below min_share of the total of the hierarchy, or which are not among
+        the max_children largest siblings, are merged into one synthetic leaf per parent. The share of the
+        total is the share of the area, the angle or the width a node gets in the charts. The leaf is
+        named other_name, or "other_name (parent)" when the name is taken, and holds the total of the
+        merged subtrees. A single merged sibling is kept as it is. Nodes deeper than max_depth are dropped
+        and the nodes at max_depth become leaves holding the total of their subtree.
+        Everything is decided in one pass over the subtree sums, so the cost does not depend on the layout.
+
+        Parameters
+        ----------
+        min_share: smallest share of the total a node keeps its own place with
+        max_children: largest number of children shown per node, None for no limit
+        max_depth: deepest level shown, the root is level 0, None for no limit
+        other_name: name of the merged nodes
+
+        Returns
+        -------
+        NodeTable, the table itself when nothing is merged or dropped
+        """
+        count = len(self)
+        if count == 0:
+            return self
+        parent = self.parent.astype(np.int64)
+        has_parent = parent >= 0
+        safe_parent = np.where(has_parent, parent, 0)
+        sums = self.subtree_sums()
+        cut = self.depth > max_depth if max_depth is not None else np.zeros(count, dtype=bool)
+
+        total = sums[~has_parent].sum()
+        merged = has_parent & ~cut & (sums < min_share * total)
+        if max_children is not None:
+            # rank of every node among its siblings, the largest subtree first and ties in table order
+            order = np.lexsort((np.arange(count), -sums, parent))
+            sorted_parent = parent[order]
+            group_starts = np.flatnonzero(np.r_[True, sorted_parent[1:] != sorted_parent[:-1]])
+            group_sizes = np.diff(np.r_[group_starts, count])
+            rank = np.empty(count, dtype=np.int64)
+            rank[order] = np.arange(count) - np.repeat(group_starts, group_sizes)
+            merged |= has_parent & ~cut & (rank >= max_children)
+        merged_counts = np.bincount(parent[merged], minlength=count)
+        merged &= merged_counts[safe_parent] > 1
+
+        if not merged.any() and not cut.any():
+            return self
+
+        keep = ~merged & ~cut
+        order, offsets = self.levels()
+        for level in range(1, len(offsets) - 1):
+            nodes = order[offsets[level]:offsets[level + 1]]
+            keep[nodes] &= keep[parent[nodes]]
+
+        # one synthetic node per visible parent with merged children, empty subtrees are left out
+        merged &= keep[safe_parent]
+        other_totals = np.bincount(parent[merged], weights=sums[merged], minlength=count)
+        other_parents = np.flatnonzero(other_totals > 0)
+
+        kept = np.flatnonzero(keep)
+        position = np.full(count, -1, dtype=np.int64)
+        position[kept] = np.arange(len(kept))
+        value = self.value[kept].copy()
+        if max_depth is not None:
+            filled = self.aggregate(~np.isnan(self.value))[kept] > 0
+            leaves = self.depth[kept] == max_depth
+            value[leaves] = np.where(filled[leaves], sums[kept][leaves], np.nan)
+
+        names = [self.names[i] for i in kept]
+        taken = set(names)
+        for p in other_parents:
+            name = other_name
+            if name in taken:
+                name = "{} ({})".format(other_name, self.names[p])
+            suffix = 1
+            while name in taken:
+                suffix += 1
+                name = "{} ({}) {}".format(other_name, self.names[p], suffix)
+            taken.add(name)
+            names.append(sys.intern(name))
+
+        kept_parent = parent[kept]
+        return NodeTable(
+            names,
+            np.concatenate([np.where(kept_parent >= 0, position[kept_parent], -1), position[other_parents]]).astype(np.int32),
+            np.concatenate([value, other_totals[other_parents]]),
+            np.concatenate([self.depth[kept], self.depth[other_parents] + 1]).astype(np.int16)
+        )
+
+    def aggregate(self, values):
+        """
+        Adds up an array of per node values bottom up, one level at a time. Every level is a slice of the
+        nodes sorted by depth, so the cost is linear in the number of nodes however deep the hierarchy is.
+
+        Parameters
+        ----------
+        values: numpy.ndarray with one value per node
+
+        Returns
+        -------
+        numpy.ndarray with the sum of the values of every node and all of its descendants
+        """
+        sums = np.array(values, dtype=np.float64)
+        order, offsets = self.levels()
+        for level in range(len(offsets) - 2, 0, -1):
+            nodes = order[offsets[level]:offsets[level + 1]]
+            np.add.at(sums, self.parent[nodes], sums[nodes])
+        return sums
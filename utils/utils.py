@@ -1,4 +1,8 @@
-def get_root_node_key(data: dict):
+from utils.node_table import NodeTable
+
+def get_root_node_key(data):
+    if isinstance(data, NodeTable):
+        return data.root_key()
     for key, value in data.items():
         if value == (None, None):
             return key